@@ -0,0 +1,206 @@
+# admission.py
+"""
+Admission control for LLM calls.
+
+Token buckets limit the request rate globally, per provider API key, per
+user session and per HTTP API client, and a semaphore bounds how many provider calls are in
+flight at once. Provider calls wait for a slot instead of running into
+upstream 429s, and a 429 pauses that key's bucket for the Retry-After
+period. When the job queue is saturated, new requests are shed (served
+from cache or a near-duplicate) rather than queued behind everyone else.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import current_trace, registry
+
+DEFAULT_GLOBAL_RATE = float(os.getenv("SYLLABUS_GLOBAL_RATE", "20"))
+DEFAULT_GLOBAL_BURST = int(os.getenv("SYLLABUS_GLOBAL_BURST", "60"))
+DEFAULT_KEY_RATE = float(os.getenv("SYLLABUS_KEY_RATE", "10"))
+DEFAULT_KEY_BURST = int(os.getenv("SYLLABUS_KEY_BURST", "30"))
+DEFAULT_SESSION_RATE = float(os.getenv("SYLLABUS_SESSION_RATE_PER_MINUTE", "6")) / 60
+DEFAULT_SESSION_BURST = int(os.getenv("SYLLABUS_SESSION_BURST", "3"))
+# Programmatic clients (api.py) batch requests, so they get their own, larger allowance
+DEFAULT_API_RATE = float(os.getenv("SYLLABUS_API_RATE_PER_MINUTE", "60")) / 60
+DEFAULT_API_BURST = int(os.getenv("SYLLABUS_API_BURST", "20"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("SYLLABUS_MAX_CONCURRENT_CALLS", "16"))
+DEFAULT_MAX_QUEUE = int(os.getenv("SYLLABUS_MAX_QUEUE", "32"))
+SESSION_IDLE_SECONDS = 3600
+
+
+class TokenBucket:
+    """Thread-safe token bucket; rate tokens per second up to burst"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        else:
+            self._tokens = float(self.burst)
+        self._updated = now
+
+    def try_acquire(self):
+        """
+        Take one token if available
+
+        Returns:
+            tuple: (acquired: bool, retry_after: float seconds until a token is free)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return False, self._paused_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True, 0.0
+            return False, (1 - self._tokens) / self.rate
+
+    def reserve(self):
+        """Take one token, going into debt if needed; returns seconds the caller must wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(0.0, self._paused_until - now)
+            if self._tokens < 0 and self.rate:
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def pause(self, seconds):
+        """Hand out no tokens for seconds, e.g. after an upstream 429"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class Admission:
+    """Rate limits and a concurrency bound shared by every session in the process"""
+
+    def __init__(self, global_rate=DEFAULT_GLOBAL_RATE, global_burst=DEFAULT_GLOBAL_BURST,
+                 key_rate=DEFAULT_KEY_RATE, key_burst=DEFAULT_KEY_BURST,
+                 session_rate=DEFAULT_SESSION_RATE, session_burst=DEFAULT_SESSION_BURST,
+                 api_rate=DEFAULT_API_RATE, api_burst=DEFAULT_API_BURST,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, max_queue=DEFAULT_MAX_QUEUE):
+        self.key_rate = key_rate
+        self.key_burst = key_burst
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.api_rate = api_rate
+        self.api_burst = api_burst
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self._key_buckets = {}
+        self._session_buckets = {}
+        self._client_buckets = {}
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _key_bucket(self, key):
+        with self._lock:
+            bucket = self._key_buckets.get(key)
+            if bucket is None:
+                bucket = self._key_buckets[key] = TokenBucket(self.key_rate, self.key_burst)
+            return bucket
+
+    def _admit(self, buckets, owner, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            entry = buckets.get(owner)
+            if entry is None:
+                entry = buckets[owner] = [TokenBucket(rate, burst), now]
+            entry[1] = now
+            for idle in [key for key, (_, seen) in buckets.items() if now - seen > SESSION_IDLE_SECONDS]:
+                del buckets[idle]
+        admitted, retry_after = entry[0].try_acquire()
+        registry.inc("syllabus_admission_total", help="Generation requests by admission decision",
+                     result="admitted" if admitted else "rate_limited")
+        return admitted, retry_after
+
+    def admit_session(self, session_id):
+        """
+        Check the per-session rate before a UI session queues a new generation
+
+        Returns:
+            tuple: (admitted: bool, retry_after: float seconds)
+        """
+        return self._admit(self._session_buckets, session_id, self.session_rate, self.session_burst)
+
+    def admit_client(self, client_id):
+        """
+        Check the per-client rate (SYLLABUS_API_RATE_PER_MINUTE) before an API client queues a generation
+
+        Returns:
+            tuple: (admitted: bool, retry_after: float seconds)
+        """
+        return self._admit(self._client_buckets, client_id, self.api_rate, self.api_burst)
+
+    def saturated(self, queued):
+        """Return True when queued jobs have reached the queue bound and new work should be shed"""
+        return bool(self.max_queue) and queued >= self.max_queue
+
+    def acquire(self, key):
+        """
+        Block until a provider call on API key may start; returns a release() callable
+
+        Reserves a token from the global and the key's bucket and waits for it, then waits for a
+        concurrency slot; a call waiting on the rate limit holds no slot, so calls on other keys
+        are not blocked behind it.
+        """
+        started = time.perf_counter()
+        wait = max(self.global_bucket.reserve(), self._key_bucket(key).reserve())
+        if wait:
+            time.sleep(wait)
+        self._semaphore.acquire()
+        with self._lock:
+            self._in_flight += 1
+        waited = time.perf_counter() - started
+        trace = current_trace()
+        if trace is not None:
+            trace.mark("admission", waited)
+        released = []
+
+        def release():
+            if released:
+                return
+            released.append(True)
+            with self._lock:
+                self._in_flight -= 1
+            self._semaphore.release()
+
+        return release
+
+    @contextmanager
+    def slot(self, key):
+        """Hold a provider call slot for API key while the block runs"""
+        release = self.acquire(key)
+        try:
+            yield
+        finally:
+            release()
+
+    def throttled(self, key, retry_after):
+        """Pause key's bucket after an upstream 429"""
+        self._key_bucket(key).pause(retry_after)
+        registry.inc("syllabus_upstream_throttled_total", help="Upstream 429 responses by API key", key=key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "sessions": len(self._session_buckets),
+                "api_clients": len(self._client_buckets),
+            }
@@ -0,0 +1,282 @@
+# api.py
+"""
+Headless HTTP API for programmatic clients such as an LMS integration.
+
+An ASGI (Starlette) service that runs next to the Streamlit UI on the same
+generation core: the app module's result cache, near-duplicate lookup,
+admission control, background job pool and provider router. Requests for a
+syllabus another client or a UI session is already generating join that
+job. Responses are JSON with the markdown plus the structured syllabus
+schema (syllabus_model.Syllabus.to_dict()).
+
+Endpoints:
+    POST /syllabi        {"subject": "...", "duration": "8 Weeks" | 8, "mode": "sync" | "stream" | "async"}
+    GET  /syllabi/{id}   a job id (from async mode) or a syllabus id (content hash)
+    GET  /healthz
+    GET  /metrics        Prometheus text format
+
+Usage:
+    uvicorn api:application --host 0.0.0.0 --port 8000
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+import app as core
+from documents import get_document_store
+from jobs import FAILED
+from metrics import registry
+from syllabus_model import parse_duration_weeks, parse_syllabus, validate_syllabus
+
+MODES = ("sync", "stream", "async")
+# The range the UI offers
+MIN_WEEKS = min(parse_duration_weeks(option) for option in core.DURATION_OPTIONS)
+MAX_WEEKS = max(parse_duration_weeks(option) for option in core.DURATION_OPTIONS)
+# A whole number of weeks, optionally followed by "Weeks" as in the UI's "8 Weeks"
+DURATION_RE = re.compile(r"\s*([0-9]+)(?:\s+weeks?)?\s*", re.IGNORECASE)
+MAX_SUBJECT_LENGTH = 200
+# How often sync and streaming requests check their job for progress
+POLL_SECONDS = float(os.getenv("SYLLABUS_API_POLL_SECONDS", "0.05"))
+CLIENT_HEADER = "x-client-id"
+
+# Cached resources are used outside a Streamlit script run; silence that warning
+for _name in list(logging.root.manager.loggerDict):
+    if _name.startswith("streamlit"):
+        logging.getLogger(_name).setLevel(logging.ERROR)
+
+
+class RequestError(Exception):
+    """A request the API answers with an error status instead of a syllabus"""
+
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+    def response(self):
+        headers = {"Retry-After": str(max(1, round(self.retry_after)))} if self.retry_after else None
+        return JSONResponse({"error": self.message}, status_code=self.status, headers=headers)
+
+
+def syllabus_payload(markdown, duration=None, **extra):
+    """
+    Build the JSON body for one syllabus
+
+    Returns:
+        dict: id (content hash, usable with GET /syllabi/{id}), markdown, structured syllabus
+            and validation issues, plus any extra fields
+    """
+    syllabus = parse_syllabus(markdown)
+    return {
+        "id": get_document_store().put(markdown),
+        "markdown": markdown,
+        "syllabus": syllabus.to_dict(),
+        "issues": validate_syllabus(syllabus, duration),
+        **extra,
+    }
+
+
+def parse_weeks(duration):
+    """
+    Return the number of weeks in an int or a string like "8" or "8 Weeks"
+
+    Raises:
+        RequestError: 422 for anything else, e.g. "1e3", "-3", 8.5 or [8]
+    """
+    if isinstance(duration, int) and not isinstance(duration, bool):
+        return duration
+    match = DURATION_RE.fullmatch(duration) if isinstance(duration, str) else None
+    if match is None:
+        raise RequestError(422, "'duration' must be a whole number of weeks, e.g. 8 or \"8 Weeks\"")
+    return int(match.group(1))
+
+
+def parse_request(body):
+    """
+    Validate a POST /syllabi body
+
+    Returns:
+        tuple: (subject: str, duration: str like "8 Weeks", mode: str)
+    """
+    if not isinstance(body, dict):
+        raise RequestError(400, "Request body must be a JSON object")
+    subject = str(body.get("subject") or "").strip()
+    if not subject:
+        raise RequestError(400, "'subject' is required")
+    if len(subject) > MAX_SUBJECT_LENGTH:
+        raise RequestError(400, f"'subject' must be at most {MAX_SUBJECT_LENGTH} characters")
+    weeks = parse_weeks(body.get("duration"))
+    if not MIN_WEEKS <= weeks <= MAX_WEEKS:
+        raise RequestError(422, f"'duration' must be between {MIN_WEEKS} and {MAX_WEEKS} weeks")
+    mode = body.get("mode", "sync")
+    if mode not in MODES:
+        raise RequestError(400, f"'mode' must be one of {', '.join(MODES)}")
+    return subject, f"{weeks} Weeks", mode
+
+
+def lookup_cached(subject, duration):
+    """Return (markdown, extra response fields) for a cached or near-duplicate syllabus, or (None, None)"""
+    cached = core.read_cache(core.generation_cache_key(subject, duration), subject, duration,
+                             core.uses_week_parallel(duration))
+    if cached is not None:
+        return cached, {"cached": True}
+    similar, match = core.find_similar_syllabus(subject, duration)
+    if similar is not None:
+        return similar, {"cached": True, "similar_to": match.subject, "similarity": round(match.score, 3)}
+    return None, None
+
+
+def admit(client, subject, duration):
+    """
+    Apply admission control to an API client: load shedding as in the UI, then the per-client API rate
+
+    Returns:
+        tuple: (markdown, extra) of a close paraphrase served under load (similar_to names the cached
+            course it came from), or (None, None) when admitted
+    """
+    admission = core.get_admission()
+    manager = core.get_job_manager()
+    if admission.saturated(manager.stats()["queued"]):
+        content, match = core.find_shed_syllabus(subject, duration)
+        if content is not None:
+            return content, {"cached": True, "served_under_load": True, "similar_to": match.subject,
+                             "similarity": round(match.score, 3)}
+        raise RequestError(503, "The generator is at capacity", retry_after=manager.eta_for_new())
+    admitted, retry_after = admission.admit_client(client)
+    if not admitted:
+        raise RequestError(429, "Per-client request rate exceeded", retry_after=retry_after)
+    return None, None
+
+
+def job_status(job):
+    manager = core.get_job_manager()
+    status = {"id": job.id, "status": job.status}
+    position = manager.position(job.id)
+    if position:
+        status["position"] = position
+        status["eta_seconds"] = round(manager.eta(job.id), 1)
+    return status
+
+
+def job_result(job, duration=None):
+    """Return (status_code, body) for a finished job"""
+    if job.status == FAILED:
+        return 500, {**job_status(job), "error": job.error}
+    success, markdown, error_message = job.result
+    if not success or not markdown:
+        return 502, {**job_status(job), "error": error_message or "No syllabus content received"}
+    return 200, {**syllabus_payload(markdown, duration), "job_id": job.id, "status": job.status}
+
+
+def client_id(request):
+    return request.headers.get(CLIENT_HEADER) or (request.client.host if request.client else "")
+
+
+async def wait_for(job):
+    while not job.finished:
+        await asyncio.sleep(POLL_SECONDS)
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_job(job, duration):
+    """Relay a job's partial output as server-sent events, then the final syllabus"""
+    sent = 0
+    while True:
+        finished = job.finished
+        partial = job.partial_text
+        if len(partial) > sent:
+            yield sse("chunk", {"text": partial[sent:]})
+            sent = len(partial)
+        if finished:
+            break
+        await asyncio.sleep(POLL_SECONDS)
+    status, body = await asyncio.to_thread(job_result, job, duration)
+    if status == 200 and sent < len(body["markdown"]) and body["markdown"].startswith(partial):
+        # Week-by-week jobs publish nothing until the stitched syllabus is ready; a repaired
+        # syllabus differs from what was streamed and is only in the done event
+        yield sse("chunk", {"text": body["markdown"][sent:]})
+    yield sse("done" if status == 200 else "error", body)
+
+
+async def stream_cached(markdown, duration, extra):
+    yield sse("chunk", {"text": markdown})
+    yield sse("done", await asyncio.to_thread(syllabus_payload, markdown, duration, **extra))
+
+
+async def create_syllabus(request):
+    mode = "invalid"
+    try:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise RequestError(400, "Request body must be valid JSON")
+        subject, duration, mode = parse_request(body)
+        # The cache, similarity index and admission touch SQLite; keep them off the event loop
+        markdown, extra = await asyncio.to_thread(lookup_cached, subject, duration)
+        client = client_id(request)
+        if markdown is None:
+            markdown, extra = await asyncio.to_thread(admit, client, subject, duration)
+    except RequestError as e:
+        registry.inc("syllabus_api_requests_total", help="API syllabus requests by mode and status",
+                     mode=mode, status=str(e.status))
+        return e.response()
+
+    registry.inc("syllabus_api_requests_total", help="API syllabus requests by mode and status",
+                 mode=mode, status="cached" if markdown is not None else "generated")
+    if markdown is not None:
+        if mode == "stream":
+            return StreamingResponse(stream_cached(markdown, duration, extra), media_type="text/event-stream")
+        payload = await asyncio.to_thread(syllabus_payload, markdown, duration, **extra)
+        return JSONResponse({**payload, "status": "done"})
+
+    job_id = core.submit_generation(subject, duration, owner=f"api:{client}", refine=False)
+    job = core.get_job_manager().get(job_id)
+    if mode == "async":
+        return JSONResponse(job_status(job), status_code=202, headers={"Location": f"/syllabi/{job_id}"})
+    if mode == "stream":
+        return StreamingResponse(stream_job(job, duration), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    await wait_for(job)
+    status, body = await asyncio.to_thread(job_result, job, duration)
+    return JSONResponse(body, status_code=status)
+
+
+async def get_syllabus(request):
+    item_id = request.path_params["id"]
+    job = core.get_job_manager().get(item_id)
+    if job is not None:
+        if not job.finished:
+            return JSONResponse(job_status(job))
+        status, body = await asyncio.to_thread(job_result, job)
+        return JSONResponse(body, status_code=status)
+    markdown = await asyncio.to_thread(get_document_store().get, item_id)
+    if markdown is None:
+        return JSONResponse({"error": "Unknown or expired syllabus id"}, status_code=404)
+    payload = await asyncio.to_thread(syllabus_payload, markdown)
+    return JSONResponse({**payload, "status": "done"})
+
+
+async def healthz(request):
+    return JSONResponse({"status": "ok", "jobs": core.get_job_manager().stats()})
+
+
+async def metrics(request):
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+application = Starlette(routes=[
+    Route("/syllabi", create_syllabus, methods=["POST"]),
+    Route("/syllabi/{id}", get_syllabus, methods=["GET"]),
+    Route("/healthz", healthz, methods=["GET"]),
+    Route("/metrics", metrics, methods=["GET"]),
+])
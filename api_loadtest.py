@@ -0,0 +1,212 @@
+# api_loadtest.py
+"""
+Load test for the HTTP API against the local mock LLM server.
+
+Starts the mock OpenRouter server, runs `uvicorn api:application` in a
+child process pointed at it (fresh cache, admission rate limits lifted so
+the service itself is measured), then drives each request mode from client
+threads. Per scenario it reports throughput, latency percentiles and the
+server's CPU time, and from those requests per second per fully busy core.
+
+Usage:
+    python api_loadtest.py --requests 200 --concurrency 32 -o api_results.json
+"""
+import argparse
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmark import SUBJECTS, git_commit, run_load
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+STARTUP_TIMEOUT_SECONDS = 30
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_service(port, env, log):
+    """Run the API in a child uvicorn process (output to log) and wait until /healthz answers"""
+    import requests
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:application", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=PROJECT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API service exited with code {process.returncode}; see {log.name}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/healthz", timeout=1).ok:
+                return process
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"API service did not start in time; see {log.name}")
+
+
+def service_cpu_seconds(process):
+    """Stop the service and return the CPU seconds it used (user + system)"""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    process.terminate()
+    process.wait(timeout=15)
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+
+
+def build_scenarios(base_url, duration):
+    """Return {name: (call, setup)} driving each API mode over pooled keep-alive sessions"""
+    import requests
+
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def subject(i, prefix):
+        # Distinct subjects so every request misses the cache
+        return f"{prefix} {SUBJECTS[i % len(SUBJECTS)]} {i}"
+
+    def post(body, **kwargs):
+        return session().post(f"{base_url}/syllabi", json=body, timeout=120, **kwargs)
+
+    def sync(i):
+        response = post({"subject": subject(i, "Sync"), "duration": duration, "mode": "sync"})
+        return response.status_code == 200 and bool(response.json()["syllabus"]["weeks"]), None
+
+    def stream(i):
+        started = time.perf_counter()
+        ttft = None
+        with post({"subject": subject(i, "Stream"), "duration": duration, "mode": "stream"}, stream=True) as response:
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                    if event == "chunk" and ttft is None:
+                        ttft = time.perf_counter() - started
+            return response.status_code == 200 and event == "done", ttft
+
+    def async_job(i):
+        response = post({"subject": subject(i, "Async"), "duration": duration, "mode": "async"})
+        if response.status_code != 202:
+            return False, None
+        location = f"{base_url}{response.headers['Location']}"
+        while True:
+            status = session().get(location, timeout=30)
+            data = status.json()
+            if data.get("status") in ("done", "failed") or status.status_code >= 400:
+                return status.status_code == 200 and data.get("status") == "done", None
+            time.sleep(0.05)
+
+    def cached(i):
+        response = post({"subject": SUBJECTS[i % len(SUBJECTS)], "duration": duration})
+        return response.status_code == 200 and response.json().get("cached", False), None
+
+    def warm_cache():
+        for name in SUBJECTS:
+            post({"subject": name, "duration": duration})
+
+    return {
+        "POST /syllabi sync": (sync, None),
+        "POST /syllabi stream (SSE)": (stream, None),
+        "POST /syllabi async + GET poll": (async_job, None),
+        "POST /syllabi cache hit": (cached, warm_cache),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the HTTP API against the mock LLM server")
+    parser.add_argument("-n", "--requests", type=int, default=100, help="Requests per scenario")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", default="4 Weeks", help="Course duration requested")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock time to first byte in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Mock generation speed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Background job workers in the service (default: concurrency)")
+    parser.add_argument("-k", "--scenario", action="append", help="Run only scenarios containing this text")
+    parser.add_argument("-o", "--output", default="api_results.json")
+    args = parser.parse_args(argv)
+
+    from mock_llm import MockLLMServer
+
+    server = MockLLMServer(latency=args.latency, tokens_per_second=args.tokens_per_second).start()
+    cache_dir = tempfile.mkdtemp(prefix="syllabus-api-")
+    workers = args.workers or args.concurrency
+    env = {
+        **os.environ,
+        "OPENROUTER_URL": server.url,
+        "OPENROUTER_API_KEY": "mock-key",
+        "SYLLABUS_CACHE_PATH": os.path.join(cache_dir, "cache.sqlite3"),
+        "SYLLABUS_JOB_WORKERS": str(workers),
+        "SYLLABUS_HTTP_POOL_SIZE": str(workers),
+        "SYLLABUS_METRICS_PORT": "0",
+        # Measure the service, not the configured upstream rate limits (a rate of 0 is unlimited)
+        "SYLLABUS_GLOBAL_RATE": "0",
+        "SYLLABUS_KEY_RATE": "0",
+        "SYLLABUS_API_RATE_PER_MINUTE": "0",
+        "SYLLABUS_MAX_QUEUE": "0",
+        "SYLLABUS_DRAFT_THEN_REFINE": "0",
+        # Numbered subjects are near-duplicates of each other; make every request a real generation
+        "SYLLABUS_SIMILARITY_THRESHOLD": "1.01",
+    }
+    for name in ("GEMINI_API_KEY", "OPENAI_API_KEY", "DEEPSEEK_API_KEY", "SYLLABUS_LOCAL_MODEL_PATH"):
+        env.pop(name, None)
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": vars(args),
+        "scenarios": {},
+    }
+    log = open(os.path.join(cache_dir, "service.log"), "w", encoding="utf-8")
+    try:
+        # CPU the service spends starting up and shutting down, subtracted from every scenario
+        idle_cpu = service_cpu_seconds(start_service(free_port(), env, log))
+        results["service_idle_cpu_seconds"] = round(idle_cpu, 3)
+        for name in build_scenarios("", args.duration):
+            if args.scenario and not any(text in name for text in args.scenario):
+                continue
+            # A fresh service per scenario so its CPU time covers only that scenario
+            port = free_port()
+            process = start_service(port, env, log)
+            try:
+                call, setup = build_scenarios(f"http://127.0.0.1:{port}", args.duration)[name]
+                if setup:
+                    setup()
+                report = run_load(call, args.requests, args.concurrency)
+            finally:
+                cpu = max(0.0, service_cpu_seconds(process) - idle_cpu)
+            report["service_cpu_seconds"] = round(cpu, 3)
+            ok = args.requests - report["errors"]
+            report["rps_per_core"] = round(ok / cpu, 1) if cpu else None
+            results["scenarios"][name] = report
+            ttft = f" ttft p50 {report['ttft_p50']:.3f}s" if "ttft_p50" in report else ""
+            print(f"{name:32s} {report['throughput_rps']:7.2f} req/s  p50 {report['latency_p50'] or 0:.3f}s  "
+                  f"p95 {report['latency_p95'] or 0:.3f}s{ttft}  errors {report['errors']}  "
+                  f"cpu {cpu:.2f}s  {report['rps_per_core']} req/s/core")
+    finally:
+        server.stop()
+        log.close()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 1 if any(report["errors"] for report in results["scenarios"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
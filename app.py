@@ -1,9 +1,22 @@
 import os
+import time
 import streamlit as st
-import requests
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from dotenv import load_dotenv
 
-OPENROUTER_API_KEY = st.secrets.get("OPENROUTER_API_KEY", None)
+# Load API key from .env
+load_dotenv()
+
+def get_secret(name):
+    """Read a secret from Streamlit secrets, falling back to the environment / .env"""
+    try:
+        return st.secrets.get(name) or os.getenv(name)
+    except FileNotFoundError:
+        return os.getenv(name)
+
+OPENROUTER_API_KEY = get_secret("OPENROUTER_API_KEY")
+# A local GGUF model keeps the app serving without network access
+LOCAL_MODEL_PATH = get_secret("SYLLABUS_LOCAL_MODEL_PATH")
 
 def main():
     if not OPENROUTER_API_KEY:
@@ -23,130 +36,686 @@ from ui_enhancer import (
     warning_card,
     footer
 )
+from admission import Admission
+from cache import get_cache, make_cache_key
+from export import FORMATS, available_formats, export_filename, render
+import week_parallel
+from documents import get_document_store
+from drafts import changed_parts, retitle, unified_diff
+from regenerate import list_blocks, regenerate_block
+from repair import repair_syllabus
+from jobs import FAILED, JobManager
+from prompts import OUTLINE_TEMPLATE, REFINE_TEMPLATE, REPAIR_TEMPLATE, SYLLABUS_TEMPLATE, SYSTEM_PROMPT, WEEK_TEMPLATE
+from metrics import annotate, bind_trace, current_trace, record_render, registry, start_metrics_server, traced, trace_request
+from similarity import get_subject_index
+from syllabus_model import find_issues, parse_duration_weeks, parse_syllabus, validate_syllabus
+from syllabus_view import show_syllabus
+from token_budget import complete_with_continuation, max_tokens_for, stream_with_continuation
 
-# Load API key from .env
-load_dotenv()
-api_key = st.secrets["OPENROUTER_API_KEY"]
+api_key = OPENROUTER_API_KEY
 
-def generate_syllabus(subject, duration):
+MAX_TOKENS = 2000
+TEMPERATURE = 0.7
+# Courses at least this long are generated week-by-week in parallel instead of in one completion
+WEEK_PARALLEL_MIN_WEEKS = 12
+# Seconds between progress refreshes while a background job runs
+JOB_POLL_SECONDS = 0.5
+# Cached syllabi older than this are served but regenerated in the background
+CACHE_REFRESH_SECONDS = int(os.getenv("SYLLABUS_CACHE_REFRESH_SECONDS", str(24 * 3600)))
+DURATION_OPTIONS = ["4 Weeks", "6 Weeks", "8 Weeks", "12 Weeks", "14 Weeks"]
+# When the job queue is full, paraphrases this close are served instead of queueing
+SHED_SIMILARITY_THRESHOLD = float(os.getenv("SYLLABUS_SHED_SIMILARITY_THRESHOLD", "0.8"))
+# Draft-then-refine: show a fast draft (related cached syllabus or a cheaper model), then swap in a refined one
+DRAFT_THEN_REFINE = os.getenv("SYLLABUS_DRAFT_THEN_REFINE", "1") != "0"
+DRAFT_SIMILARITY_THRESHOLD = float(os.getenv("SYLLABUS_DRAFT_SIMILARITY_THRESHOLD", "0.5"))
+DRAFT_MODEL = os.getenv("SYLLABUS_DRAFT_MODEL", "")
+
+def build_messages(subject, duration):
+    """Build the chat messages sent to the LLM for a syllabus request"""
+    return SYLLABUS_TEMPLATE.messages(subject=subject, duration=duration)
+
+@st.cache_resource
+def get_http_client():
+    """Return the pooled HTTP client shared across reruns and sessions"""
+    # Imported here so the first page render doesn't pay for requests
+    from http_client import HttpClient
+    return HttpClient()
+
+@st.cache_resource
+def get_admission():
+    """Return the rate limits and concurrency bound shared by every session"""
+    admission = Admission()
+    registry.gauge("syllabus_admission", lambda: {(("stat", name),): value for name, value in admission.stats().items()},
+                   help="Provider calls in flight and admission limits")
+    return admission
+
+@st.cache_resource
+def get_router():
+    """Return the provider router shared across reruns and sessions"""
+    from providers import Router, build_providers
+    keys = {"OPENROUTER_API_KEY": OPENROUTER_API_KEY, "SYLLABUS_LOCAL_MODEL_PATH": LOCAL_MODEL_PATH}
+    return Router(build_providers(keys, get_http_client(), preferred="openrouter"),
+                  admission=get_admission())
+
+@st.cache_resource
+def get_draft_router():
+    """Return the router for fast drafts, or None when no SYLLABUS_DRAFT_MODEL is configured"""
+    if not DRAFT_MODEL:
+        return None
+    from providers import Router, build_providers
+    keys = {"OPENROUTER_API_KEY": OPENROUTER_API_KEY}
+    # Only the cheap model: a draft from a full-size provider or the slow local fallback isn't fast
+    return Router(build_providers(keys, get_http_client(), models={"openrouter": DRAFT_MODEL}, names=("openrouter",)),
+                  admission=get_admission())
+
+def request_completion(messages, max_tokens=MAX_TOKENS, tag="", router=None):
     """
-    Generate syllabus using OpenRouter API
+    Send one chat completion request to the fastest healthy provider
+    
+    A reply cut off by the token limit is continued from where it stopped.
+    
+    Args:
+        messages (list): Chat messages to send
+        max_tokens (int): Completion token limit for this call
+        tag (str): Label for the token usage log, e.g. the course duration
+        router (Router): Providers to use instead of the default router
+    
+    Returns:
+        tuple: (success: bool, content: str, error_message: str)
+    """
+    router = router or get_router()
+    
+    def complete(request, limit, info):
+        return router.complete(request, limit, TEMPERATURE, info)
+    
+    info = {}
+    result = complete_with_continuation(complete, messages, max_tokens, tag=tag, info=info)
+    trace = current_trace()
+    if trace is not None:
+        trace.record_call(info)
+    return result
+
+def primary_model():
+    """Return the provider and model whose output is cached, e.g. openrouter:openai/gpt-3.5-turbo"""
+    primary = get_router().primary
+    return primary.key if primary is not None else ""
+
+def uses_week_parallel(duration):
+    """Return True if the UI generates this duration week-by-week instead of in one completion"""
+    return parse_duration_weeks(duration) >= WEEK_PARALLEL_MIN_WEEKS
+
+def syllabus_request(subject, duration):
+    """
+    Return (messages, max_tokens, cache_key) for a single-completion syllabus request
+    
+    The key carries the refine template's tag as well: refine_syllabus stores its result under it.
+    """
+    messages = build_messages(subject, duration)
+    max_tokens = max_tokens_for(messages, parse_duration_weeks(duration))
+    cache_key = make_cache_key(messages, model=primary_model(), temperature=TEMPERATURE, max_tokens=max_tokens,
+                               template=SYLLABUS_TEMPLATE.tag, repair=REPAIR_TEMPLATE.tag,
+                               refine=REFINE_TEMPLATE.tag)
+    return messages, max_tokens, cache_key
+
+def week_parallel_cache_key(subject, duration):
+    """Return the cache key of a week-by-week generated syllabus"""
+    return make_cache_key(build_messages(subject, duration), model=primary_model(),
+                          temperature=TEMPERATURE, mode="week-parallel", template=SYLLABUS_TEMPLATE.tag,
+                          outline=OUTLINE_TEMPLATE.tag, week=WEEK_TEMPLATE.tag, repair=REPAIR_TEMPLATE.tag)
+
+def generation_cache_key(subject, duration):
+    """Return the cache key the UI reads for subject and duration"""
+    if uses_week_parallel(duration):
+        return week_parallel_cache_key(subject, duration)
+    return syllabus_request(subject, duration)[2]
+
+def check_syllabus(subject, duration, syllabus, provider=None):
+    """
+    Validate a freshly generated syllabus and repair its broken parts
+    
+    Only missing or malformed weeks and sections are regenerated (see repair.py), not the whole
+    syllabus. Results are counted per provider and model in syllabus_validation_total.
+    
+    Args:
+        subject (str): The subject for the syllabus
+        duration (str): The duration of the course
+        syllabus (str): Generated syllabus markdown
+        provider (str): Provider and model that wrote it; defaults to the current trace's
+    
+    Returns:
+        str: The syllabus, repaired where possible
+    """
+    trace = current_trace()
+    provider = provider or (trace.attributes.get("provider") if trace is not None else None) or "none"
+    issues = find_issues(parse_syllabus(syllabus), duration)
+    for issue in issues:
+        registry.inc("syllabus_validation_issues_total", help="Problems found in generated syllabi by kind",
+                     kind=issue.kind, provider=provider)
+    result = "valid"
+    if issues:
+        syllabus, repaired, remaining = repair_syllabus(bind_trace(request_completion), SYSTEM_PROMPT,
+                                                        subject, duration, syllabus)
+        result = "invalid" if remaining else "repaired"
+        annotate(repaired=", ".join(repaired) or None)
+    registry.inc("syllabus_validation_total", help="Generated syllabi by validation result",
+                 result=result, provider=provider)
+    annotate(validation=result)
+    return syllabus
+
+def store_syllabus(subject, duration, cache_key, syllabus, trace=None):
+    """
+    Cache a generated syllabus if the primary model wrote all of it
+    
+    Keys name the primary model, so output the router took from another provider is served
+    but not cached under them.
+    
+    Args:
+        trace (Trace): The request's trace; defaults to the current one
+    """
+    trace = trace or current_trace()
+    if trace is None or trace.providers != {primary_model()}:
+        annotate(cache_write="skipped")
+        return
+    get_cache().set(cache_key, syllabus)
+    get_subject_index().add(subject, duration, cache_key)
+
+@traced("refresh")
+def refresh_syllabus(subject, duration, by_week=False):
+    """
+    Generate a syllabus without reading the cache and store the fresh copy
     
     Args:
         subject (str): The subject for the syllabus
         duration (str): The duration of the course
+        by_week (bool): Generate it as an outline plus concurrent weeks
     
     Returns:
         tuple: (success: bool, content: str, error_message: str)
     """
-    try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "http://localhost:8501",
-                "X-Title": "Course Syllabus Generator"
-            },
-            json={
-                "model": "openai/gpt-3.5-turbo",
-
-                "messages": [
-                    {
-                        "role": "system", 
-                        "content": "You are an experienced university professor who designs comprehensive, structured course syllabi. Create detailed week-by-week breakdowns with clear learning objectives, topics, and outcomes."
-                    },
-                    {
-                        "role": "user", 
-                        "content": f"""Generate a detailed {duration} syllabus for the subject '{subject}'. 
-
-Please format the response EXACTLY as follows:
-
-# {subject} - {duration} Course Syllabus
-
-## Course Overview
-[Brief description of the course and what students will learn]
-
-## Course Objectives
-- [Objective 1]
-- [Objective 2]
-- [Objective 3]
-
-## Learning Outcomes
-By the end of this course, students will be able to:
-- [Outcome 1]
-- [Outcome 2]
-- [Outcome 3]
-
-## Weekly Breakdown
-
-### Week 1: [Topic Name]
-**Learning Objectives:**
-- [Objective 1]
-- [Objective 2]
-
-**Topics Covered:**
-- [Topic 1]
-- [Topic 2]
-- [Topic 3]
-
-**Activities:**
-- [Activity 1]
-- [Activity 2]
-
-**Assessment:** [Brief description]
-
----
-
-[Continue this format for each week]
-
-## Assessment Methods
-- **Assignments:** [Percentage]% - [Description]
-- **Midterm Exam:** [Percentage]% - [Description]  
-- **Final Project:** [Percentage]% - [Description]
-- **Participation:** [Percentage]% - [Description]
-
-## Required Materials
-- [Material 1]
-- [Material 2]
-- [Material 3]
-
-## Recommended Resources
-- [Resource 1]
-- [Resource 2]
-- [Resource 3]
-
-## Course Policies
-- **Attendance:** [Policy]
-- **Late Submissions:** [Policy]
-- **Academic Integrity:** [Policy]
-
-Make sure to use this exact formatting with proper markdown headers, bullet points, and clear section divisions."""
-                    }
-                ],
-                "max_tokens": 2000,
-                "temperature": 0.7
-            }
+    if by_week:
+        cache_key = week_parallel_cache_key(subject, duration)
+        success, syllabus, error_message = week_parallel.generate_syllabus_by_week(
+            bind_trace(request_completion), SYSTEM_PROMPT, subject, duration
         )
-        
-        # Check if request was successful
-        if response.status_code == 200:
-            data = response.json()
-            
-            if "choices" in data and len(data["choices"]) > 0:
-                syllabus = data["choices"][0]["message"]["content"]
-                return True, syllabus, ""
+    else:
+        messages, max_tokens, cache_key = syllabus_request(subject, duration)
+        success, syllabus, error_message = request_completion(messages, max_tokens, tag=duration)
+    if success:
+        syllabus = check_syllabus(subject, duration, syllabus)
+        store_syllabus(subject, duration, cache_key, syllabus)
+    return success, syllabus, error_message
+
+def read_cache(cache_key, subject, duration, by_week=False):
+    """
+    Return a cached syllabus, or None on a miss
+    
+    Entries older than CACHE_REFRESH_SECONDS are still served, but a background
+    job regenerates them (stale-while-revalidate).
+    """
+    cache = get_cache()
+    cached = cache.get(cache_key)
+    if cached is None:
+        annotate(cache="miss")
+        return None
+    age = cache.get_entry_age(cache_key)
+    if age is not None and age > CACHE_REFRESH_SECONDS:
+        annotate(cache="stale")
+        get_job_manager().submit(f"refresh:{cache_key}", lambda job: refresh_syllabus(subject, duration, by_week))
+    else:
+        annotate(cache="hit")
+    return cached
+
+@traced("single")
+def generate_syllabus(subject, duration, use_cache=True):
+    """
+    Generate syllabus using the configured LLM providers
+    
+    Args:
+        subject (str): The subject for the syllabus
+        duration (str): The duration of the course
+        use_cache (bool): Serve and store results in the persistent result cache
+    
+    Returns:
+        tuple: (success: bool, content: str, error_message: str)
+    """
+    if not use_cache:
+        messages, max_tokens, _ = syllabus_request(subject, duration)
+        success, syllabus, error_message = request_completion(messages, max_tokens, tag=duration)
+        return success, check_syllabus(subject, duration, syllabus) if success else syllabus, error_message
+    
+    cached = read_cache(syllabus_request(subject, duration)[2], subject, duration)
+    if cached is not None:
+        return True, cached, ""
+    return refresh_syllabus(subject, duration)
+
+@traced("by_week")
+def generate_syllabus_by_week(subject, duration, use_cache=True):
+    """
+    Generate a long syllabus as an outline plus concurrently generated weeks
+    
+    Args:
+        subject (str): The subject for the syllabus
+        duration (str): The duration of the course
+        use_cache (bool): Serve and store results in the persistent result cache
+    
+    Returns:
+        tuple: (success: bool, content: str, error_message: str)
+    """
+    if not use_cache:
+        success, syllabus, error_message = week_parallel.generate_syllabus_by_week(
+            bind_trace(request_completion), SYSTEM_PROMPT, subject, duration
+        )
+        return success, check_syllabus(subject, duration, syllabus) if success else syllabus, error_message
+    
+    cached = read_cache(week_parallel_cache_key(subject, duration), subject, duration, by_week=True)
+    if cached is not None:
+        return True, cached, ""
+    return refresh_syllabus(subject, duration, by_week=True)
+
+@traced("stream")
+def stream_syllabus(subject, duration, use_cache=True):
+    """
+    Stream a syllabus from the fastest provider as it is generated
+    
+    Args:
+        subject (str): The subject for the syllabus
+        duration (str): The duration of the course
+        use_cache (bool): Serve and store results in the persistent result cache
+    
+    Returns:
+        tuple: (success: bool, chunks: iterator of str, error_message: str); once exhausted, a
+            generated stream returns (StopIteration.value) the syllabus after validation and repair
+    """
+    messages, max_tokens, cache_key = syllabus_request(subject, duration)
+    if use_cache:
+        cached = read_cache(cache_key, subject, duration)
+        if cached is not None:
+            return True, iter([cached]), ""
+
+    def stream(request, limit, info):
+        return get_router().stream(request, limit, TEMPERATURE, info)
+
+    info = {}
+    trace = current_trace()
+    success, provider_chunks, error_message = stream_with_continuation(
+        stream, messages, max_tokens, tag=duration, info=info
+    )
+    if not success:
+        if trace is not None:
+            trace.record_call(info)
+        return False, iter(()), error_message
+
+    def chunks():
+        parts = []
+        for content in provider_chunks:
+            parts.append(content)
+            yield content
+        if trace is not None:
+            trace.record_call(info)
+        if not parts:
+            return ""
+        syllabus = check_syllabus(subject, duration, "".join(parts), provider=info.get("provider"))
+        if use_cache:
+            store_syllabus(subject, duration, cache_key, syllabus, trace)
+        return syllabus
+
+    return True, chunks(), ""
+
+@traced("regenerate")
+def regenerate_part(subject, duration, syllabus, label, instructions=""):
+    """
+    Regenerate one week or section of a syllabus, keeping the rest unchanged
+    
+    Args:
+        subject (str): The subject for the syllabus
+        duration (str): The duration of the course
+        syllabus (str): The current syllabus markdown
+        label (str): Part to regenerate, e.g. "Week 3" or "Assessment Methods"
+        instructions (str): Optional feedback on what to change
+    
+    Returns:
+        tuple: (success: bool, content: str, error_message: str) with the full updated syllabus
+    """
+    return regenerate_block(request_completion, SYSTEM_PROMPT, subject, duration, syllabus, label, instructions)
+
+def read_similar(match):
+    """
+    Read the cached syllabus of a near-duplicate match like an exact hit
+    
+    Entries written under an older prompt template or model no longer have the key the subject
+    would get now, and are not served. Stale ones are refreshed in the background (read_cache).
+    """
+    if match.key != generation_cache_key(match.subject, match.duration):
+        return None
+    return read_cache(match.key, match.subject, match.duration, uses_week_parallel(match.duration))
+
+def find_similar_syllabus(subject, duration, threshold=None):
+    """
+    Look up a cached syllabus generated for a paraphrase of subject
+    
+    A course at another level or in another place of a sequence ("Calculus II" for "Calculus I")
+    never matches; see similarity.level_tokens.
+    
+    Args:
+        subject (str): The subject for the syllabus
+        duration (str): The duration of the course
+        threshold (float): Minimum similarity; defaults to SYLLABUS_SIMILARITY_THRESHOLD
+    
+    Returns:
+        tuple: (content: str | None, match: Match | None) with the nearest subject and its score;
+            the content is retitled for subject
+    """
+    content, match = get_subject_index().lookup(subject, duration, read_similar, threshold)
+    registry.inc("syllabus_similarity_lookups_total", help="Near-duplicate subject lookups by result",
+                 result="hit" if content is not None else "miss")
+    if content is None:
+        return None, match
+    return retitle(content, subject, duration), match
+
+def find_draft(subject, duration):
+    """
+    Return an instant draft from the nearest cached syllabus of a related subject
+    
+    A draft is rewritten before it is final, so a neighbouring level of the course may seed it.
+    
+    Returns:
+        tuple: (draft: str | None, match: Match | None); the draft is retitled for subject
+    """
+    content, match = get_subject_index().lookup(subject, duration, read_similar, DRAFT_SIMILARITY_THRESHOLD,
+                                                match_level=False)
+    if content is None:
+        return None, None
+    return retitle(content, subject, duration), match
+
+@traced("draft")
+def draft_syllabus(subject, duration):
+    """
+    Generate a quick first version with the cheaper SYLLABUS_DRAFT_MODEL
+    
+    Returns:
+        tuple: (success: bool, content: str, error_message: str)
+    """
+    router = get_draft_router()
+    if router is None:
+        return False, "", "No draft model is configured"
+    messages = build_messages(subject, duration)
+    return request_completion(messages, max_tokens_for(messages, parse_duration_weeks(duration)),
+                              tag=duration, router=router)
+
+@traced("refine")
+def refine_syllabus(subject, duration, draft):
+    """
+    Have the main model rewrite a draft into the final syllabus and cache the result
+    
+    Args:
+        subject (str): The subject for the syllabus
+        duration (str): The duration of the course
+        draft (str): Draft syllabus markdown to improve
+    
+    Returns:
+        tuple: (success: bool, content: str, error_message: str)
+    """
+    messages = REFINE_TEMPLATE.messages(draft, subject=subject, duration=duration)
+    success, syllabus, error_message = request_completion(
+        messages, max_tokens_for(messages, parse_duration_weeks(duration)), tag=duration
+    )
+    if success:
+        syllabus = check_syllabus(subject, duration, syllabus)
+        # Stored under the key the UI reads, so the next request for this course is a plain cache hit
+        store_syllabus(subject, duration, generation_cache_key(subject, duration), syllabus)
+    return success, syllabus, error_message
+
+@st.cache_resource
+def get_job_manager():
+    """Return the background job pool shared by every session"""
+    manager = JobManager()
+    registry.gauge("syllabus_jobs", lambda: {(("state", state),): count for state, count in manager.stats().items()},
+                   help="Generation jobs by state")
+    return manager
+
+@st.cache_resource
+def get_metrics_server():
+    """Start the Prometheus /metrics sidecar once per process (None if disabled or the port is taken)"""
+    registry.gauge("syllabus_document_store", lambda: {(("stat", name),): value
+                                                       for name, value in get_document_store().stats().items()},
+                   help="Shared document store size and per-session state footprint in bytes")
+    return start_metrics_server()
+
+def run_generation_job(job, subject, duration):
+    """Generate a syllabus inside a background job, publishing partial output as it streams"""
+    by_week = uses_week_parallel(duration)
+    with trace_request("by_week" if by_week else "stream", subject, duration, request_id=job.id) as trace:
+        trace.mark("queue_wait", job.started_at - job.created_at)
+        if by_week:
+            # Long courses: outline first, then every week concurrently, so nothing hits the token cap
+            result = generate_syllabus_by_week(subject, duration)
+        else:
+            success, syllabus_chunks, error_message = stream_syllabus(subject, duration)
+            if success:
+                while True:
+                    try:
+                        job.append(next(syllabus_chunks))
+                    except StopIteration as done:
+                        # A repaired syllabus differs from the streamed text
+                        result = True, done.value or job.partial_text, ""
+                        break
             else:
-                return False, "", "No syllabus content received from the API"
+                result = False, "", error_message
+        trace.set_result(result[0], result[2])
+        return result
+
+def run_refine_job(job, subject, duration, draft=None):
+    """Publish a fast draft on the job, then refine it; falls back to a normal generation without a draft"""
+    by_week = uses_week_parallel(duration)
+    cached = read_cache(generation_cache_key(subject, duration), subject, duration, by_week)
+    if cached is not None:
+        return True, cached, ""
+    job.draft = draft or job.draft
+    if job.draft is None:
+        success, content, _ = draft_syllabus(subject, duration)
+        if not success:
+            return run_generation_job(job, subject, duration)
+        job.draft = content
+    with trace_request("refine", subject, duration, request_id=job.id) as trace:
+        trace.mark("queue_wait", job.started_at - job.created_at)
+        result = refine_syllabus(subject, duration, job.draft)
+        trace.set_result(result[0], result[2])
+        return result
+
+def submit_generation(subject, duration, draft=None, owner=None, refine=DRAFT_THEN_REFINE):
+    """
+    Queue a generation job, joining an identical one that is already in flight
+    
+    With refine (draft-then-refine) enabled and a draft available (given here, or from the draft
+    model), the job shows the draft right away and replaces it with a refined version. Courses
+    generated week-by-week are never refined: one refine completion would bypass the per-week
+    token budget.
+    
+    Args:
+        owner (str): Fair-queueing group; defaults to the Streamlit session id
+    """
+    manager = get_job_manager()
+    owner = get_session_id() if owner is None else owner
+    refine = refine and not uses_week_parallel(duration) and (draft or get_draft_router() is not None)
+    # Refine and plain jobs never share a job: a draft set on a plain job would never be refined
+    key = make_cache_key(build_messages(subject, duration), model=primary_model(), temperature=TEMPERATURE,
+                         template=SYLLABUS_TEMPLATE.tag, mode="refine" if refine else "single")
+    if refine:
+        job_id = manager.submit(key, run_refine_job, subject, duration, draft, owner=owner)
+        job = manager.get(job_id)
+        if job is not None and job.draft is None and draft:
+            # Visible while the job still waits in the queue
+            job.draft = draft
+        return job_id
+    return manager.submit(key, run_generation_job, subject, duration, owner=owner)
+
+def find_shed_syllabus(subject, duration):
+    """
+    Look up the close paraphrase served instead of queueing while the generator is saturated
+    
+    The threshold is lower than for an ordinary lookup, but another level of the same course
+    ("Calculus II" for "Calculus I") is still never served, as in find_similar_syllabus.
+    
+    Returns:
+        tuple: (content: str | None, match: Match | None); the content is retitled for subject,
+            and match names the cached course it came from
+    """
+    content, match = find_similar_syllabus(subject, duration, threshold=SHED_SIMILARITY_THRESHOLD)
+    registry.inc("syllabus_admission_total", help="Generation requests by admission decision",
+                 result="shed_served" if content is not None else "shed_rejected")
+    if content is None:
+        return None, None
+    return content, match
+
+def admit_generation(subject, duration):
+    """
+    Decide whether a cache miss may queue a new generation
+    
+    When the job queue is saturated the request is shed: a close paraphrase is served if one
+    is cached, otherwise the user is asked to retry. Each session is also held
+    to its own request rate.
+    
+    Returns:
+        tuple: (admitted: bool, content: str | None, match: Match | None, error_message: str)
+    """
+    admission = get_admission()
+    manager = get_job_manager()
+    if admission.saturated(manager.stats()["queued"]):
+        content, match = find_shed_syllabus(subject, duration)
+        if content is not None:
+            return False, content, match, ""
+        wait = max(1, round(manager.eta_for_new()))
+        return False, None, None, f"The generator is at capacity right now. Please try again in about {wait} seconds."
+    admitted, retry_after = admission.admit_session(get_session_id())
+    if not admitted:
+        return False, None, None, (f"You're generating syllabi faster than the per-user limit. "
+                                   f"Please try again in {max(1, round(retry_after))} seconds.")
+    return True, None, None, ""
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_generation_progress():
+    """Render the active job's progress; reruns the app once it finishes"""
+    job = get_job_manager().get(st.session_state.active_job)
+    if job is not None and not job.finished:
+        partial = job.partial_text
+        if job.draft and not partial:
+            with create_syllabus_container():
+                st.markdown("### 📝 Draft Syllabus")
+                st.caption("✨ A refined version is being written in the background and will replace this draft")
+                st.markdown(job.draft)
+        elif partial:
+            with create_syllabus_container():
+                st.markdown("### 📚 Your Generated Syllabus")
+                st.markdown(partial)
         else:
-            return False, "", f"API request failed with status code: {response.status_code}"
-            
-    except requests.exceptions.RequestException as e:
-        return False, "", f"Network error: {str(e)}"
-    except KeyError as e:
-        return False, "", f"Unexpected API response format: {str(e)}"
-    except Exception as e:
-        return False, "", f"Unexpected error: {str(e)}"
+            loading_animation()
+            position = get_job_manager().position(job.id)
+            if position:
+                eta = get_job_manager().eta(job.id)
+                st.caption(f"⏳ Waiting for a free worker (position {position} in queue, starts in about {eta:.0f} s)")
+        return
+    
+    st.session_state.active_job = None
+    if job is None:
+        st.session_state.job_error = "The generation job expired before it finished"
+    elif job.status == FAILED:
+        st.session_state.job_error = f"Unexpected error: {job.error}"
+    else:
+        success, syllabus_content, error_message = job.result
+        if success and syllabus_content:
+            set_current_syllabus(syllabus_content)
+            if job.draft and job.draft != syllabus_content:
+                st.session_state.draft_hash = get_document_store().put(job.draft)
+            st.session_state.last_subject = st.session_state.job_subject
+            st.session_state.last_duration = st.session_state.job_duration
+            st.session_state.just_generated = True
+            st.session_state.last_request_id = job.id
+        else:
+            st.session_state.job_error = error_message or "No syllabus content received from the API"
+    st.rerun()
+
+def show_draft_changes(draft, syllabus_content):
+    """Summarize what the refined syllabus changed compared with the draft shown earlier"""
+    changed = changed_parts(draft, syllabus_content)
+    if changed:
+        st.info("✨ Refined from the draft. Updated: " + ", ".join(f"**{label}**" for label in changed))
+    else:
+        st.info("✨ Refined from the draft; wording changes only")
+    diff = unified_diff(draft, syllabus_content)
+    if diff:
+        with st.expander("🔍 What changed since the draft", expanded=False):
+            st.code(diff, language="diff")
+
+def show_regenerate_controls(syllabus_content):
+    """Let the user regenerate a single week or section of the current syllabus"""
+    labels = list_blocks(syllabus_content)
+    if not labels:
+        return
+    
+    with st.expander("🔁 Regenerate part of this syllabus", expanded=False):
+        label = st.selectbox("Week or section to regenerate:", labels, key="regen_label")
+        instructions = st.text_input(
+            "What should change? (optional)",
+            placeholder="e.g., More hands-on activities",
+            key="regen_instructions"
+        )
+        if st.button("🔁 Regenerate", key="regen_button"):
+            with st.spinner(f"Regenerating {label}..."):
+                success, updated, error_message = regenerate_part(
+                    st.session_state.last_subject, st.session_state.last_duration,
+                    syllabus_content, label, instructions
+                )
+            if success:
+                set_current_syllabus(updated)
+                st.session_state.regenerated_label = label
+                st.session_state.similar_match = None
+                st.session_state.just_generated = True
+                st.rerun()
+            else:
+                error_card(error_message)
+
+def show_export_controls(subject, duration, syllabus_hash, label="📥 Download Syllabus"):
+    """Offer the syllabus in every available export format, rendered only when downloaded"""
+    col_dl1, col_dl2, col_dl3 = st.columns([1, 1, 1])
+    with col_dl2:
+        fmt = st.selectbox(
+            "Download format",
+            available_formats(),
+            format_func=lambda value: FORMATS[value].label,
+            key="export_format"
+        )
+        title = f"{subject} ({duration})"
+        st.download_button(
+            label=label,
+            # Deferred: rendered on click (and cached by content hash), not on every rerun
+            data=lambda: render(get_document_store().get(syllabus_hash) or "", fmt, title),
+            file_name=export_filename(subject, fmt),
+            mime=FORMATS[fmt].mime,
+            use_container_width=True,
+            help="Download your syllabus in the selected format"
+        )
+
+def set_current_syllabus(content):
+    """Make content this session's syllabus; session state keeps only its hash"""
+    st.session_state.syllabus_hash = get_document_store().put(content)
+
+def get_current_syllabus():
+    """Return this session's syllabus from the shared document store ("" if none)"""
+    return get_document_store().get(st.session_state.syllabus_hash) or ""
+
+def get_session_id():
+    """Return the Streamlit session id of the current script run ("" outside a session)"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else ""
+
+def track_session_footprint():
+    """Record this session's state size for the document store's footprint stats"""
+    get_document_store().track_session(get_session_id(), st.session_state.to_dict())
+
+def get_catalog():
+    """Return every predefined (subject, duration) pair offered by the UI"""
+    subjects = [s for s in get_subject_options() if s not in ("Select a subject...", "Custom (enter below)")]
+    return [(subject, duration) for subject in subjects for duration in DURATION_OPTIONS]
 
 def get_subject_options():
     """Return list of available subject options"""
@@ -174,17 +743,34 @@ def get_subject_options():
 
 def initialize_session_state():
     """Initialize session state variables"""
-    if 'generated_syllabus' not in st.session_state:
-        st.session_state.generated_syllabus = ""
+    if 'syllabus_hash' not in st.session_state:
+        st.session_state.syllabus_hash = None
     if 'last_subject' not in st.session_state:
         st.session_state.last_subject = ""
     if 'last_duration' not in st.session_state:
         st.session_state.last_duration = ""
+    if 'active_job' not in st.session_state:
+        st.session_state.active_job = None
+    if 'job_error' not in st.session_state:
+        st.session_state.job_error = ""
+    if 'just_generated' not in st.session_state:
+        st.session_state.just_generated = False
+    if 'similar_match' not in st.session_state:
+        st.session_state.similar_match = None
+    if 'regenerated_label' not in st.session_state:
+        st.session_state.regenerated_label = ""
+    if 'last_request_id' not in st.session_state:
+        st.session_state.last_request_id = None
+    if 'served_under_load' not in st.session_state:
+        st.session_state.served_under_load = False
+    if 'draft_hash' not in st.session_state:
+        st.session_state.draft_hash = None
 
 def main():
     """Main application function"""
     # Initialize session state
     initialize_session_state()
+    get_metrics_server()
     
     # Apply global styles
     apply_global_styles()
@@ -201,8 +787,8 @@ def main():
     show_title()
     
     # Input validation for API key
-    if not OPENROUTER_API_KEY:
-        error_card("Please set your OPENROUTER_API_KEY in the .env file")
+    if not OPENROUTER_API_KEY and not LOCAL_MODEL_PATH:
+        error_card("Please set your OPENROUTER_API_KEY (or SYLLABUS_LOCAL_MODEL_PATH) in the .env file")
         st.stop()
     
     # Show info card
@@ -241,7 +827,7 @@ def main():
             
             duration = st.selectbox(
                 "Course Duration",
-                ["4 Weeks", "6 Weeks", "8 Weeks", "12 Weeks","14 Weeks"],
+                DURATION_OPTIONS,
                 help="Select the total duration of your course"
             )
             
@@ -256,70 +842,103 @@ def main():
                     help="Click to generate your customized syllabus"
                 )
     
-    # Generation logic
+    # Generation logic: run in a background job so reruns from other widgets don't discard the work
     if generate_clicked and subject:
-        # Show custom loading animation
-        loading_placeholder = st.empty()
-        with loading_placeholder:
-            loading_animation()
-        
-        # Generate syllabus
-        success, syllabus_content, error_message = generate_syllabus(subject, duration)
-        
-        # Clear loading animation
-        loading_placeholder.empty()
-        
-        if success:
-            # Store in session state
-            st.session_state.generated_syllabus = syllabus_content
+        # Paraphrases of an already generated subject ("Intro to ML") are served from its cached syllabus
+        similar_content, match = find_similar_syllabus(subject, duration)
+        st.session_state.similar_match = match if similar_content is not None else None
+        if similar_content is not None:
+            set_current_syllabus(similar_content)
             st.session_state.last_subject = subject
             st.session_state.last_duration = duration
-            
-            # Show success message
-            success_card(subject, duration)
-            
-            # Display the syllabus in a styled container
-            with create_syllabus_container():
-                st.markdown("### 📚 Your Generated Syllabus")
-                st.markdown(syllabus_content)
-            
-            # Add download option
-            col_dl1, col_dl2, col_dl3 = st.columns([1, 1, 1])
-            with col_dl2:
-                st.download_button(
-                    label="📥 Download Syllabus",
-                    data=syllabus_content,
-                    file_name=f"{subject.replace(' ', '_').replace('/', '_')}_syllabus.txt",
-                    mime="text/plain",
-                    use_container_width=True,
-                    help="Download your syllabus as a text file"
-                )
+            st.session_state.just_generated = True
         else:
-            error_card(error_message)
-            
-    elif generate_clicked and not subject:
+            admitted, shed_content, shed_match, admission_error = admit_generation(subject, duration)
+            if admitted:
+                draft = find_draft(subject, duration)[0] if DRAFT_THEN_REFINE and not uses_week_parallel(duration) else None
+                st.session_state.active_job = submit_generation(subject, duration, draft)
+                st.session_state.job_subject = subject
+                st.session_state.job_duration = duration
+            elif shed_content is not None:
+                # Under load, the closest cached syllabus now beats a long wait in the queue
+                set_current_syllabus(shed_content)
+                st.session_state.similar_match = shed_match
+                st.session_state.served_under_load = True
+                st.session_state.last_subject = subject
+                st.session_state.last_duration = duration
+                st.session_state.just_generated = True
+            else:
+                st.session_state.job_error = admission_error
+    
+    syllabus_content = get_current_syllabus()
+    
+    if generate_clicked and not subject:
         warning_card("Please select or enter a subject before generating the syllabus.")
     
+    # Poll the in-flight job and render its partial output
+    elif st.session_state.active_job:
+        show_generation_progress()
+    
+    elif st.session_state.job_error:
+        error_card(st.session_state.job_error)
+        st.session_state.job_error = ""
+    
+    # Show the syllabus that just finished generating
+    elif st.session_state.just_generated:
+        st.session_state.just_generated = False
+        subject = st.session_state.last_subject
+        duration = st.session_state.last_duration
+        request_id = st.session_state.last_request_id
+        st.session_state.last_request_id = None
+        
+        # Show success message
+        success_card(subject, duration)
+        match = st.session_state.similar_match
+        if match is not None and match.subject != subject:
+            st.info(f"♻️ Served from the cached syllabus for **{match.subject}** "
+                    f"(similarity {match.score:.0%})")
+        if st.session_state.served_under_load:
+            st.info("⚡ High demand right now, so the closest existing syllabus was served instead of waiting in the queue. "
+                    "Generate again later for one written for this course.")
+            st.session_state.served_under_load = False
+        if st.session_state.regenerated_label:
+            st.info(f"🔁 Regenerated **{st.session_state.regenerated_label}**; the rest of the syllabus is unchanged")
+            st.session_state.regenerated_label = ""
+        if st.session_state.draft_hash:
+            show_draft_changes(get_document_store().get(st.session_state.draft_hash) or "", syllabus_content)
+            st.session_state.draft_hash = None
+        parse_started = time.perf_counter()
+        issues = validate_syllabus(parse_syllabus(syllabus_content), duration)
+        parse_seconds = time.perf_counter() - parse_started
+        if issues:
+            warning_card("The syllabus may be incomplete: " + "; ".join(issues))
+        
+        # Display the syllabus in a styled container
+        render_started = time.perf_counter()
+        with create_syllabus_container():
+            show_syllabus(st.session_state.syllabus_hash, heading="### 📚 Your Generated Syllabus")
+        if request_id:
+            kind = "by_week" if uses_week_parallel(duration) else "stream"
+            record_render(request_id, kind, parse_seconds, time.perf_counter() - render_started)
+        
+        # Add download option
+        show_export_controls(subject, duration, st.session_state.syllabus_hash)
+        show_regenerate_controls(syllabus_content)
+    
     # Display previously generated syllabus if exists
-    elif st.session_state.generated_syllabus and not generate_clicked:
+    elif syllabus_content:
         st.markdown("### 📚 Previously Generated Syllabus")
         
         # Show info about the previous generation
         st.info(f"📖 Last generated: **{st.session_state.last_subject}** ({st.session_state.last_duration})")
         
         with create_syllabus_container():
-            st.markdown(st.session_state.generated_syllabus)
+            show_syllabus(st.session_state.syllabus_hash)
         
         # Add download option for previous syllabus
-        col_dl1, col_dl2, col_dl3 = st.columns([1, 1, 1])
-        with col_dl2:
-            st.download_button(
-                label="📥 Download Previous Syllabus",
-                data=st.session_state.generated_syllabus,
-                file_name=f"{st.session_state.last_subject.replace(' ', '_').replace('/', '_')}_syllabus.txt",
-                mime="text/plain",
-                use_container_width=True
-            )
+        show_export_controls(st.session_state.last_subject, st.session_state.last_duration,
+                             st.session_state.syllabus_hash, label="📥 Download Previous Syllabus")
+        show_regenerate_controls(syllabus_content)
 
     # Add helpful information
     st.markdown("<br><br>", unsafe_allow_html=True)
@@ -334,13 +953,13 @@ def main():
         
         3. **🚀 Generate**: Click the "Generate Syllabus" button to create your customized syllabus
         
-        4. **📥 Download**: Once generated, use the download button to save your syllabus as a text file
+        4. **📥 Download**: Once generated, pick a format (Markdown, HTML, JSON, PDF or Word) and download your syllabus
         
         ### ✨ Features:
         - **AI-Powered Generation**: Advanced AI creates detailed, structured syllabi
         - **Week-by-Week Breakdown**: Complete course structure with learning objectives
         - **Comprehensive Content**: Includes assessments, resources, and policies
-        - **Multiple Formats**: Downloadable text format for easy sharing
+        - **Multiple Formats**: Download as Markdown, HTML, JSON, PDF or Word
         - **Session Memory**: Your last generated syllabus is saved during the session
         
         ### 📋 What's Included:
@@ -374,6 +993,7 @@ def main():
 
     # Footer
     footer()
+    track_session_footprint()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,184 @@
+# batch.py
+"""
+Batch syllabus generation for whole course catalogs.
+
+Usage:
+    python batch.py catalog.csv -o syllabi.jsonl --concurrency 8 --rate 2
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from syllabus_model import parse_duration_weeks
+
+DEFAULT_LEVEL = "Undergraduate"
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls evenly at a fixed rate"""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the caller may start its next call"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def normalize_row(row):
+    """Map a CSV/JSONL row onto the generator arguments and a stable row id"""
+    subject = (row.get("subject") or row.get("course_name") or "").strip()
+    if not subject:
+        raise ValueError("Row is missing a subject")
+    normalized = {
+        "subject": subject,
+        "duration": parse_duration_weeks(row.get("duration", "")),
+        "level": (row.get("level") or DEFAULT_LEVEL).strip(),
+        "custom_goals": (row.get("custom_goals") or "").strip() or None,
+    }
+    row_id = str(row.get("id") or "").strip()
+    if not row_id:
+        digest = json.dumps(normalized, sort_keys=True).encode("utf-8")
+        row_id = hashlib.sha1(digest).hexdigest()[:16]
+    normalized["id"] = row_id
+    return normalized
+
+
+def read_rows(path):
+    """Read catalog rows from a .csv or .jsonl file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+
+def load_completed_ids(output_path):
+    """Return ids of rows already written successfully to output_path"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated final line; that row is simply redone
+                continue
+            if record.get("status") == "ok":
+                completed.add(record.get("id"))
+    return completed
+
+
+def _default_generate(row):
+    from syllabus_generator import ERROR_PREFIX, generate_syllabus
+
+    content = generate_syllabus(row["subject"], row["duration"], row["level"], row["custom_goals"])
+    if content.startswith(ERROR_PREFIX):
+        raise RuntimeError(content)
+    return content
+
+
+def generate_many(rows, output_path, concurrency=4, rate_per_second=None, generate=None, progress=None):
+    """
+    Generate syllabi for many rows concurrently and append them to a JSONL file
+
+    Rows already recorded as successful in output_path are skipped, so an
+    interrupted run resumes where it stopped.
+
+    Args:
+        rows (iterable of dict): Rows with subject, duration, level and optional custom_goals/id
+        output_path (str): JSONL file that receives one record per finished row
+        concurrency (int): Maximum number of in-flight generations
+        rate_per_second (float): Maximum generation starts per second, or None for no limit
+        generate (callable): Function taking a normalized row and returning markdown
+        progress (callable): Called with (done, total, record) after each row
+
+    Returns:
+        dict: Counts of ok, error and skipped rows
+    """
+    generate = generate or _default_generate
+    limiter = RateLimiter(rate_per_second)
+    completed = load_completed_ids(output_path)
+    pending = []
+    seen = set()
+    summary = {"ok": 0, "error": 0, "skipped": 0}
+    for index, row in enumerate(rows, start=1):
+        # Reject a malformed catalog up front, before any generation is paid for
+        try:
+            normalized = normalize_row(row)
+        except ValueError as e:
+            raise ValueError(f"Row {index}: {e}") from e
+        if normalized["id"] in completed:
+            summary["skipped"] += 1
+            continue
+        if normalized["id"] in seen:
+            continue
+        seen.add(normalized["id"])
+        pending.append(normalized)
+
+    def run(row):
+        limiter.acquire()
+        started = time.perf_counter()
+        record = dict(row)
+        try:
+            record["syllabus"] = generate(row)
+            record["status"] = "ok"
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+        record["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        return record
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = [executor.submit(run, row) for row in pending]
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            # Records are written from this thread only, one flushed line per finished row
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            summary[record["status"]] += 1
+            if progress:
+                progress(done, len(pending), record)
+    return summary
+
+
+def _print_progress(done, total, record):
+    status = "ok" if record["status"] == "ok" else f"error: {record['error']}"
+    print(f"[{done}/{total}] {record['subject']} ({record['duration']} weeks) - {status} "
+          f"({record['elapsed_seconds']}s)", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate syllabi for every row of a CSV or JSONL catalog")
+    parser.add_argument("input", help="CSV or JSONL file with subject, duration, level[, custom_goals, id] columns")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: <input>.syllabi.jsonl)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Maximum concurrent generations")
+    parser.add_argument("-r", "--rate", type=float, default=None, help="Maximum generation starts per second")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.input)[0] + ".syllabi.jsonl"
+    summary = generate_many(read_rows(args.input), output, concurrency=args.concurrency,
+                            rate_per_second=args.rate, progress=_print_progress)
+    print(f"Done: {summary['ok']} ok, {summary['error']} failed, {summary['skipped']} already completed -> {output}",
+          file=sys.stderr)
+    return 1 if summary["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+# benchmark.py
+"""
+Offline performance benchmarks against local mock LLM backends.
+
+Each scenario runs in its own child process, so the peak RSS reported for
+it is that scenario's alone rather than the high-water mark of every
+scenario before it.
+
+Usage:
+    python benchmark.py --requests 40 --concurrency 8 -o bench_results.json
+    python benchmark.py --compare bench_results.json   # fail on p95 regressions
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DURATIONS = ["4 Weeks", "6 Weeks", "8 Weeks"]
+SUBJECTS = [
+    "Data Structures and Algorithms", "Artificial Intelligence", "Machine Learning",
+    "Python Programming", "Web Development", "Database Management Systems",
+]
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def peak_rss_mb():
+    # ru_maxrss is the process-wide high-water mark, in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_load(call, requests, concurrency):
+    """
+    Run call(i) requests times across concurrency threads
+
+    call returns (ok, ttft_seconds_or_None).
+
+    Returns:
+        dict: Throughput, latency percentiles, time-to-first-token and error count
+    """
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            ok, ttft = call(i)
+        except Exception:
+            ok, ttft = False, None
+        return ok, time.perf_counter() - started, ttft
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies = [latency for ok, latency, _ in results if ok]
+    ttfts = [ttft for ok, _, ttft in results if ok and ttft is not None]
+    report = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(1 for ok, _, _ in results if not ok),
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(requests / wall, 2) if wall else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    for q in (0.5, 0.95, 0.99):
+        value = percentile(latencies, q)
+        report[f"latency_p{int(q * 100)}"] = round(value, 4) if value is not None else None
+    if ttfts:
+        report["ttft_p50"] = round(percentile(ttfts, 0.5), 4)
+        report["ttft_p95"] = round(percentile(ttfts, 0.95), 4)
+    return report
+
+
+def _job(i):
+    return SUBJECTS[i % len(SUBJECTS)], DURATIONS[(i // len(SUBJECTS)) % len(DURATIONS)]
+
+
+def build_scenarios(mock_behavior):
+    """Import the app against the mock backends and return {name: call}"""
+    import app
+    import batch
+    import syllabus_generator
+    from mock_llm import MockGeminiProvider
+    from providers import Router
+
+    # Cached resources are used from worker threads without a ScriptRunContext; silence that warning
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+    gemini_router = Router([MockGeminiProvider(**mock_behavior)])
+    syllabus_generator.get_router = lambda: gemini_router
+
+    def generate(i):
+        subject, duration = _job(i)
+        ok, _, _ = app.generate_syllabus(subject, duration, use_cache=False)
+        return ok, None
+
+    def stream(i):
+        subject, duration = _job(i)
+        started = time.perf_counter()
+        ok, chunks, _ = app.stream_syllabus(subject, duration, use_cache=False)
+        ttft = None
+        for _ in chunks:
+            if ttft is None:
+                ttft = time.perf_counter() - started
+        return ok, ttft
+
+    def by_week(i):
+        ok, _, _ = app.generate_syllabus_by_week(SUBJECTS[i % len(SUBJECTS)], "12 Weeks", use_cache=False)
+        return ok, None
+
+    def gemini(i):
+        subject, duration = _job(i)
+        weeks = int(duration.split()[0])
+        content = syllabus_generator.generate_syllabus(subject, weeks, "Undergraduate", use_cache=False)
+        return not content.startswith(syllabus_generator.ERROR_PREFIX), None
+
+    def cached(i):
+        subject, duration = _job(i % 6)
+        ok, _, _ = app.generate_syllabus(subject, duration)
+        return ok, None
+
+    def warm_cache():
+        for i in range(6):
+            cached(i)
+
+    def batch_rows(i):
+        # One generate_many run of 10 rows per request, through the mock Gemini router
+        rows = [{"subject": SUBJECTS[n % len(SUBJECTS)], "duration": DURATIONS[n % len(DURATIONS)],
+                 "id": f"{i}-{n}"} for n in range(10)]
+        with tempfile.TemporaryDirectory() as tmp:
+            summary = batch.generate_many(rows, os.path.join(tmp, "out.jsonl"), concurrency=10)
+        return summary["error"] == 0, None
+
+    return {
+        "app.generate_syllabus": (generate, None),
+        "app.stream_syllabus": (stream, None),
+        "app.generate_syllabus_by_week[12 Weeks]": (by_week, None),
+        "syllabus_generator.generate_syllabus": (gemini, None),
+        "cache_hit.app.generate_syllabus": (cached, warm_cache),
+        "batch.generate_many[10 rows]": (batch_rows, None),
+    }
+
+
+def run_scenario(name, args):
+    """Run one scenario in a fresh interpreter and return its report"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "report.json")
+        command = [sys.executable, os.path.abspath(__file__), "--worker", name, "--worker-output", output,
+                   "-n", str(args.requests), "-c", str(args.concurrency), "--latency", str(args.latency),
+                   "--tokens-per-second", str(args.tokens_per_second), "--fail-rate", str(args.fail_rate)]
+        subprocess.run(command, check=True)
+        with open(output, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def run_worker(args, mock_behavior):
+    """Child process side of run_scenario; the parent's environment points it at the mock server"""
+    call, setup = build_scenarios(mock_behavior)[args.worker]
+    if setup:
+        setup()
+    report = run_load(call, args.requests, args.concurrency)
+    with open(args.worker_output, "w", encoding="utf-8") as f:
+        json.dump(report, f)
+    return 0
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, max_regression):
+    """Print per-scenario deltas; return names whose p95 latency regressed beyond max_regression"""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before.get("latency_p95") or not result.get("latency_p95"):
+            continue
+        change = result["latency_p95"] / before["latency_p95"] - 1
+        flag = "REGRESSION" if change > max_regression else ""
+        print(f"{name:45s} p95 {before['latency_p95']:.4f}s -> {result['latency_p95']:.4f}s "
+              f"({change:+.1%}) {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark syllabus generation against mock LLM backends")
+    parser.add_argument("-n", "--requests", type=int, default=24, help="Requests per scenario")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock time to first byte in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Mock generation speed")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("-k", "--scenario", action="append", help="Run only scenarios containing this text")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 slowdown, e.g. 0.2 = 20%%")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    mock_behavior = {"latency": args.latency, "tokens_per_second": args.tokens_per_second,
+                     "fail_rate": args.fail_rate}
+    if args.worker:
+        return run_worker(args, mock_behavior)
+    cache_dir = tempfile.mkdtemp(prefix="syllabus-bench-")
+    from mock_llm import MockLLMServer
+
+    server = MockLLMServer(**mock_behavior).start()
+    # Point the app at the mock server and a throwaway cache before anything imports them
+    os.environ["OPENROUTER_URL"] = server.url
+    os.environ["OPENROUTER_API_KEY"] = "mock-key"
+    os.environ["SYLLABUS_CACHE_PATH"] = os.path.join(cache_dir, "cache.sqlite3")
+    for name in ("GEMINI_API_KEY", "OPENAI_API_KEY", "DEEPSEEK_API_KEY"):
+        os.environ.pop(name, None)
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": vars(args),
+        "scenarios": {},
+    }
+    try:
+        for name in build_scenarios(mock_behavior):
+            if args.scenario and not any(text in name for text in args.scenario):
+                continue
+            report = run_scenario(name, args)
+            results["scenarios"][name] = report
+            ttft = f" ttft p50 {report['ttft_p50']:.3f}s" if "ttft_p50" in report else ""
+            print(f"{name:45s} {report['throughput_rps']:7.2f} req/s  p50 {report['latency_p50'] or 0:.3f}s  "
+                  f"p95 {report['latency_p95'] or 0:.3f}s  p99 {report['latency_p99'] or 0:.3f}s{ttft}  "
+                  f"errors {report['errors']}  peak rss {report['peak_rss_mb']} MB")
+    finally:
+        server.stop()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) regressed beyond {args.max_regression:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+# cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_CACHE_PATH = os.getenv("SYLLABUS_CACHE_PATH", os.path.join(".cache", "syllabus_cache.sqlite3"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("SYLLABUS_CACHE_MAX_ENTRIES", "1000"))
+DEFAULT_MAX_BYTES = int(os.getenv("SYLLABUS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+DEFAULT_TTL_SECONDS = int(os.getenv("SYLLABUS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def normalize_text(text):
+    """Collapse whitespace so cosmetic prompt edits map to the same key"""
+    return " ".join(str(text).split())
+
+
+def make_cache_key(prompt, **params):
+    """
+    Build a content-addressed cache key
+
+    Args:
+        prompt (str | list): Prompt text or chat messages sent to the model
+        **params: Model parameters that change the output (model, temperature, ...)
+
+    Returns:
+        str: Hex SHA-256 digest of the normalized prompt and parameters
+    """
+    if isinstance(prompt, (list, tuple)):
+        prompt = [
+            {"role": m.get("role", ""), "content": normalize_text(m.get("content", ""))}
+            for m in prompt
+        ]
+    else:
+        prompt = normalize_text(prompt)
+    payload = json.dumps({"prompt": prompt, "params": params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SyllabusCache:
+    """On-disk SQLite cache with TTL expiry and LRU eviction under a size cap"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation keeps this safe across Streamlit's script threads
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss or expired entry"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return row[0] if row is not None else None
+
+    def set(self, key, value):
+        """Store value under key and evict least recently used entries over the cap"""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(conn, now)
+
+    def get_entry_age(self, key):
+        """Return seconds since key was stored, or None if it is not cached"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT created_at FROM entries WHERE key = ?", (key,)).fetchone()
+        return time.time() - row[0] if row is not None else None
+
+    def _evict(self, conn, now):
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,))
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall()
+        stale = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def delete(self, key):
+        """Remove a single entry"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters and current store size"""
+        with self._connect() as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache shared by the UI and the generator module"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SyllabusCache()
+        return _default_cache
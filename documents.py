@@ -0,0 +1,227 @@
+# documents.py
+"""
+Content-addressed store for the syllabi that sessions display.
+
+Sessions keep only the sha256 of their current syllabus in
+st.session_state; the text is stored here once per distinct document, no
+matter how many sessions show it. Recently used documents stay in memory
+up to a byte cap and the rest are read back from a table next to the
+result cache. The size of each session's state is tracked so the
+per-session footprint can be reported.
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from cache import DEFAULT_CACHE_PATH
+
+DEFAULT_MEMORY_BYTES = int(os.getenv("SYLLABUS_DOCUMENT_MEMORY_BYTES", str(16 * 1024 * 1024)))
+DEFAULT_RETENTION_SECONDS = int(os.getenv("SYLLABUS_DOCUMENT_RETENTION_SECONDS", str(7 * 24 * 3600)))
+SESSION_IDLE_SECONDS = 3600
+# Memory hits update last_access on disk in batches: before every prune, and at most this often otherwise
+TOUCH_FLUSH_SECONDS = 60
+
+
+def content_hash(text):
+    """Return the sha256 hex digest a document is stored under"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def value_size(value):
+    """Approximate bytes held by one session state value"""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(value_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(value_size(k) + value_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+def state_size(state):
+    """Return the approximate bytes of a session state mapping"""
+    return sum(value_size(key) + value_size(value) for key, value in state.items())
+
+
+class DocumentStore:
+    """
+    Deduplicated documents by content hash: in-memory LRU under a byte cap, backed by SQLite
+
+    A document that is read keeps its place on disk, even when every read is a memory hit:
+
+    >>> import tempfile
+    >>> store = DocumentStore(os.path.join(tempfile.mkdtemp(), "cache.db"), retention_seconds=1)
+    >>> hot, cold = store.put("hot syllabus"), store.put("cold syllabus")
+    >>> for _ in range(3):
+    ...     time.sleep(0.4)
+    ...     _ = store.get(hot)
+    >>> _ = store.put("new syllabus")  # prunes documents not used in the last second
+    >>> store._memory.clear()
+    >>> store.get(hot), store.get(cold)
+    ('hot syllabus', None)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_memory_bytes=DEFAULT_MEMORY_BYTES,
+                 retention_seconds=DEFAULT_RETENTION_SECONDS):
+        self.path = path
+        self.max_memory_bytes = max_memory_bytes
+        self.retention_seconds = retention_seconds
+        self.hits = 0
+        self.disk_reads = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._sessions = {}
+        # digest -> time of memory hits not yet written to last_access
+        self._touched = {}
+        self._touches_flushed = time.time()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS documents (
+                    digest TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_last_access ON documents (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _remember(self, digest, text):
+        size = len(text.encode("utf-8"))
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+                return
+            self._memory[digest] = text
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.encode("utf-8"))
+
+    def _flush_touches(self, conn):
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._touches_flushed = time.time()
+        if touched:
+            conn.executemany("UPDATE documents SET last_access = MAX(last_access, ?) WHERE digest = ?",
+                             [(accessed, digest) for digest, accessed in touched.items()])
+
+    def put(self, text):
+        """
+        Store text once and return its content hash
+
+        Args:
+            text (str): Document content
+
+        Returns:
+            str: The digest to keep in session state
+        """
+        digest = content_hash(text)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO documents (digest, content, size, last_access) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(digest) DO UPDATE SET last_access = excluded.last_access",
+                (digest, text, len(text.encode("utf-8")), now),
+            )
+            self._flush_touches(conn)
+            if self.retention_seconds:
+                conn.execute("DELETE FROM documents WHERE last_access < ?", (now - self.retention_seconds,))
+        self._remember(digest, text)
+        return digest
+
+    def get(self, digest):
+        """Return the document for digest, or None if it is unknown or past retention"""
+        if not digest:
+            return None
+        now = time.time()
+        with self._lock:
+            text = self._memory.get(digest)
+            if text is not None:
+                self._memory.move_to_end(digest)
+                self.hits += 1
+                self._touched[digest] = now
+                flush = now - self._touches_flushed > TOUCH_FLUSH_SECONDS
+        if text is not None:
+            if flush:
+                with self._connect() as conn:
+                    self._flush_touches(conn)
+            return text
+        with self._connect() as conn:
+            row = conn.execute("SELECT content FROM documents WHERE digest = ?", (digest,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE documents SET last_access = ? WHERE digest = ?", (now, digest))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_reads += 1
+        self._remember(digest, row[0])
+        return row[0]
+
+    def track_session(self, session_id, state):
+        """Record the current size of one session's state for the footprint report"""
+        now = time.time()
+        size = state_size(state)
+        with self._lock:
+            self._sessions[session_id] = (size, now)
+            for idle in [key for key, (_, seen) in self._sessions.items() if now - seen > SESSION_IDLE_SECONDS]:
+                del self._sessions[idle]
+        return size
+
+    def stats(self):
+        """Return document counts and sizes plus per-session state footprint"""
+        with self._connect() as conn:
+            stored, stored_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM documents"
+            ).fetchone()
+        with self._lock:
+            sizes = [size for size, _ in self._sessions.values()]
+            return {
+                "memory_documents": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "stored_documents": stored,
+                "stored_bytes": stored_bytes,
+                "hits": self.hits,
+                "disk_reads": self.disk_reads,
+                "misses": self.misses,
+                "sessions": len(sizes),
+                "session_bytes_total": sum(sizes),
+                "session_bytes_max": max(sizes, default=0),
+                "session_bytes_mean": sum(sizes) / len(sizes) if sizes else 0,
+            }
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_document_store():
+    """Return the process-wide document store shared by every session"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = DocumentStore()
+        return _default_store
@@ -0,0 +1,49 @@
+# drafts.py
+"""
+Helpers for draft-then-refine generation.
+
+A draft is shown as soon as one exists: a related cached syllabus, retitled
+for the requested course, or a cheaper model's completion. A stronger model
+then rewrites it in the background. Once the final version replaces the draft,
+the weeks and sections that changed are listed and a line diff is offered.
+"""
+import difflib
+import re
+
+from regenerate import find_block, list_blocks
+
+TITLE_RE = re.compile(r"^#\s+.*$", re.MULTILINE)
+
+
+def retitle(markdown, subject, duration):
+    """Point a related course's syllabus at subject and duration by replacing its title line"""
+    title = f"# {subject} - {duration} Course Syllabus"
+    if TITLE_RE.search(markdown):
+        return TITLE_RE.sub(title, markdown, count=1)
+    return f"{title}\n\n{markdown}"
+
+
+def _block_text(markdown, label):
+    span = find_block(markdown, label)
+    if span is None:
+        return None
+    return " ".join(markdown[span[0]:span[1]].split())
+
+
+def changed_parts(draft, final):
+    """
+    List the weeks and sections that differ between the draft and the final syllabus
+
+    Returns:
+        list: Labels such as "Week 3" or "Course Overview", in the final document's order;
+            parts only in the draft come last
+    """
+    labels = list(dict.fromkeys(list_blocks(final) + list_blocks(draft)))
+    return [label for label in labels if _block_text(draft, label) != _block_text(final, label)]
+
+
+def unified_diff(draft, final, context=2):
+    """Return a unified line diff from the draft to the final syllabus ("" if identical)"""
+    lines = difflib.unified_diff(draft.splitlines(), final.splitlines(), "draft", "final",
+                                 n=context, lineterm="")
+    return "\n".join(lines)
@@ -0,0 +1,410 @@
+# export.py
+"""
+Export syllabi as Markdown, HTML, JSON, PDF or DOCX.
+
+Formats are rendered only when requested and the bytes are kept in a small
+in-process cache keyed by a hash of the content, so Streamlit reruns and
+repeated downloads don't render again. PDF and DOCX need optional packages
+(`fpdf2`, `python-docx`); formats whose package is missing are left out of
+available_formats().
+
+Bulk export writes one zip to disk, rendering and writing one document at
+a time so a large catalog is never held in memory:
+
+Usage:
+    python export.py syllabi.jsonl -o syllabi.zip -f pdf -f docx   # batch.py output
+    python export.py --from-cache -o catalog.zip -f html           # cached UI catalog
+"""
+import argparse
+import hashlib
+import html
+import importlib.util
+import io
+import json
+import os
+import re
+import sys
+import threading
+import zipfile
+from collections import OrderedDict, namedtuple
+
+from syllabus_model import parse_syllabus
+
+# Bump when a renderer's output changes so cached renders are not reused
+RENDER_VERSION = 1
+DEFAULT_CACHE_BYTES = int(os.getenv("SYLLABUS_EXPORT_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+BULLET_RE = re.compile(r"^(\s*)(?:[-*+]|\d+[.)])\s+(.*)$")
+RULE_RE = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$")
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+ITALIC_RE = re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])")
+
+Format = namedtuple("Format", ["label", "extension", "mime", "requires"])
+
+FORMATS = {
+    "md": Format("Markdown", ".md", "text/markdown", None),
+    "html": Format("HTML", ".html", "text/html", None),
+    "json": Format("JSON", ".json", "application/json", None),
+    "pdf": Format("PDF", ".pdf", "application/pdf", "fpdf"),
+    "docx": Format("Word (DOCX)", ".docx",
+                   "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"),
+}
+
+# pip package that provides each optional module
+OPTIONAL_PACKAGES = {"fpdf": "fpdf2", "docx": "python-docx"}
+
+HTML_STYLE = (
+    "body{font-family:Inter,Arial,sans-serif;max-width:48rem;margin:2rem auto;padding:0 1rem;"
+    "color:#2c3e50;line-height:1.5}h1,h2,h3{color:#2c3e50}h2{border-bottom:2px solid #4CAF50;"
+    "padding-bottom:.2rem}hr{border:0;border-top:1px solid #e1e8ed}"
+)
+
+
+class ExportError(Exception):
+    """Raised when a format is unknown or its optional package is not installed"""
+
+
+def available_formats():
+    """Return the format ids whose renderer can run in this environment"""
+    return [fmt for fmt, spec in FORMATS.items()
+            if spec.requires is None or importlib.util.find_spec(spec.requires) is not None]
+
+
+def check_format(fmt):
+    """Raise ExportError unless fmt is known and its optional package is installed"""
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown export format: {fmt!r}")
+    requires = FORMATS[fmt].requires
+    if requires and importlib.util.find_spec(requires) is None:
+        package = OPTIONAL_PACKAGES[requires]
+        raise ExportError(f"{FORMATS[fmt].label} export needs the optional package '{package}' "
+                          f"(pip install {package})")
+
+
+def export_filename(subject, fmt):
+    """Return a download file name such as 'Machine_Learning_syllabus.pdf'"""
+    stem = re.sub(r"[^\w\-]+", "_", subject.strip()).strip("_") or "syllabus"
+    return f"{stem}_syllabus{FORMATS[fmt].extension}"
+
+
+def iter_blocks(markdown):
+    """
+    Split template markdown into ("heading", level, text), ("bullet", depth, text),
+    ("paragraph", 0, text) and ("rule", 0, "") blocks for the document renderers
+    """
+    paragraph = []
+    for line in markdown.splitlines():
+        heading = HEADING_RE.match(line)
+        bullet = BULLET_RE.match(line)
+        block = None
+        if heading:
+            block = ("heading", len(heading.group(1)), heading.group(2))
+        elif RULE_RE.match(line):
+            block = ("rule", 0, "")
+        elif bullet:
+            block = ("bullet", len(bullet.group(1).expandtabs(4)) // 2, bullet.group(2))
+        elif line.strip():
+            paragraph.append(line.strip())
+            continue
+        if paragraph:
+            yield "paragraph", 0, " ".join(paragraph)
+            paragraph = []
+        if block:
+            yield block
+    if paragraph:
+        yield "paragraph", 0, " ".join(paragraph)
+
+
+def inline_runs(text):
+    """Split text on **bold** markers into (text, bold) runs"""
+    runs = []
+    for i, part in enumerate(BOLD_RE.split(text)):
+        if part:
+            runs.append((part, i % 2 == 1))
+    return runs
+
+
+def _inline_html(text):
+    text = html.escape(text, quote=False)
+    text = BOLD_RE.sub(r"<strong>\1</strong>", text)
+    return ITALIC_RE.sub(r"<em>\1</em>", text)
+
+
+def render_markdown(markdown, title):
+    return markdown.encode("utf-8")
+
+
+def render_html(markdown, title):
+    out = []
+    depth = -1
+    for kind, level, text in iter_blocks(markdown):
+        if kind == "bullet":
+            while depth < level:
+                out.append("<ul>")
+                depth += 1
+            while depth > level:
+                out.append("</ul>")
+                depth -= 1
+            out.append(f"<li>{_inline_html(text)}</li>")
+            continue
+        while depth >= 0:
+            out.append("</ul>")
+            depth -= 1
+        if kind == "heading":
+            out.append(f"<h{level}>{_inline_html(text)}</h{level}>")
+        elif kind == "rule":
+            out.append("<hr>")
+        else:
+            out.append(f"<p>{_inline_html(text)}</p>")
+    out.extend("</ul>" for _ in range(depth + 1))
+    document = (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        f"<title>{html.escape(title or 'Course Syllabus')}</title>\n<style>{HTML_STYLE}</style>\n"
+        "</head>\n<body>\n" + "\n".join(out) + "\n</body>\n</html>\n"
+    )
+    return document.encode("utf-8")
+
+
+def render_json(markdown, title):
+    data = {"title": title, "markdown": markdown, "syllabus": parse_syllabus(markdown).to_dict()}
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _latin1(text):
+    # The built-in PDF fonts only cover Latin-1; emoji and other symbols become '?'
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+def render_pdf(markdown, title):
+    from fpdf import FPDF
+
+    pdf = FPDF(format="A4")
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_title(_latin1(title or "Course Syllabus"))
+    pdf.add_page()
+    sizes = {1: 18, 2: 14, 3: 12}
+    for kind, level, text in iter_blocks(markdown):
+        pdf.set_x(pdf.l_margin)
+        if kind == "heading":
+            pdf.set_font("Helvetica", "B", sizes.get(level, 11))
+            pdf.ln(2)
+            pdf.multi_cell(0, sizes.get(level, 11) * 0.5, _latin1(BOLD_RE.sub(r"\1", text)),
+                           new_x="LMARGIN", new_y="NEXT")
+        elif kind == "rule":
+            pdf.ln(2)
+            pdf.line(pdf.l_margin, pdf.get_y(), pdf.w - pdf.r_margin, pdf.get_y())
+            pdf.ln(2)
+        else:
+            pdf.set_font("Helvetica", "", 10)
+            if kind == "bullet":
+                pdf.set_x(pdf.l_margin + 4 + 5 * level)
+                text = "- " + text
+            pdf.multi_cell(0, 5, _latin1(text), markdown=True, new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
+
+
+def render_docx(markdown, title):
+    import docx
+
+    document = docx.Document()
+    document.core_properties.title = title or "Course Syllabus"
+    for kind, level, text in iter_blocks(markdown):
+        if kind == "heading":
+            document.add_heading(BOLD_RE.sub(r"\1", text), level=min(level - 1, 9))
+            continue
+        if kind == "rule":
+            continue
+        if kind == "bullet":
+            paragraph = document.add_paragraph(style="List Bullet 2" if level else "List Bullet")
+        else:
+            paragraph = document.add_paragraph()
+        for run_text, bold in inline_runs(text):
+            paragraph.add_run(run_text).bold = bold
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+RENDERERS = {
+    "md": render_markdown,
+    "html": render_html,
+    "json": render_json,
+    "pdf": render_pdf,
+    "docx": render_docx,
+}
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered bytes bounded by total size"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def set(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._bytes -= len(self._items.pop(key))
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+_render_cache = RenderCache()
+
+
+def render_key(markdown, fmt, title=""):
+    """Return the content hash a render is cached under"""
+    digest = hashlib.sha256(f"{RENDER_VERSION}\0{fmt}\0{title}\0".encode("utf-8"))
+    digest.update(markdown.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def render(markdown, fmt, title="", cache=_render_cache):
+    """
+    Render a syllabus in one export format, reusing a cached render of the same content
+
+    Args:
+        markdown (str): The syllabus markdown
+        fmt (str): Format id, one of FORMATS
+        title (str): Document title, e.g. "Machine Learning (12 Weeks)"
+        cache (RenderCache): Render cache, or None to skip caching (bulk export)
+
+    Returns:
+        bytes: The rendered document
+    """
+    check_format(fmt)
+    key = render_key(markdown, fmt, title)
+    if cache is not None:
+        data = cache.get(key)
+        if data is not None:
+            return data
+    data = RENDERERS[fmt](markdown, title)
+    if cache is not None:
+        cache.set(key, data)
+    return data
+
+
+def get_render_cache():
+    """Return the process-wide render cache"""
+    return _render_cache
+
+
+def write_zip(documents, path, formats, progress=None):
+    """
+    Write documents to a zip file on disk, one rendered file at a time
+
+    Args:
+        documents (iterable): (name, title, markdown) tuples, consumed lazily
+        path (str): Output zip path; written to a temporary file and renamed when complete
+        formats (list): Format ids to export every document in
+        progress (callable): Optional; called with (count, name) after each document
+
+    Returns:
+        dict: {"documents": int, "files": int, "bytes": int} for the finished archive
+    """
+    for fmt in formats:
+        # Fail before writing anything if a format can't be rendered here
+        check_format(fmt)
+    summary = {"documents": 0, "files": 0, "bytes": 0}
+    used_names = set()
+    tmp_path = f"{path}.partial"
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, title, markdown in documents:
+                stem = base = re.sub(r"[^\w\-]+", "_", name).strip("_") or "syllabus"
+                suffix = 2
+                while stem in used_names:
+                    stem, suffix = f"{base}_{suffix}", suffix + 1
+                used_names.add(stem)
+                for fmt in formats:
+                    # Bulk renders bypass the cache so a large catalog doesn't evict interactive downloads
+                    data = render(markdown, fmt, title, cache=None)
+                    archive.writestr(f"{stem}{FORMATS[fmt].extension}", data)
+                    summary["files"] += 1
+                summary["documents"] += 1
+                if progress:
+                    progress(summary["documents"], name)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    summary["bytes"] = os.path.getsize(path)
+    return summary
+
+
+def read_batch_documents(path):
+    """Yield (name, title, markdown) for every successful record of a batch.py JSONL output"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("status") != "ok" or not record.get("syllabus"):
+                continue
+            duration = f"{record['duration']} Weeks" if str(record["duration"]).isdigit() else record["duration"]
+            name = f"{record.get('id', '')}_{record['subject']}".strip("_")
+            yield name, f"{record['subject']} ({duration})", record["syllabus"]
+
+
+def read_cached_documents():
+    """Yield (name, title, markdown) for every catalog pair the app has in its result cache"""
+    from warmup import _load_app
+
+    app = _load_app()
+    cache = app.get_cache()
+    for subject, duration in app.get_catalog():
+        markdown = cache.get(app.generation_cache_key(subject, duration))
+        if markdown is not None:
+            yield f"{subject}_{duration}", f"{subject} ({duration})", markdown
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export many syllabi into one zip file")
+    parser.add_argument("input", nargs="?", help="batch.py JSONL output to export")
+    parser.add_argument("--from-cache", action="store_true", help="Export the UI catalog from the result cache")
+    parser.add_argument("-o", "--output", required=True, help="Zip file to write")
+    parser.add_argument("-f", "--format", action="append", choices=sorted(FORMATS), dest="formats",
+                        help="Format to include (repeatable, default: md)")
+    args = parser.parse_args(argv)
+    if bool(args.input) == args.from_cache:
+        parser.error("give either an input JSONL file or --from-cache")
+
+    documents = read_cached_documents() if args.from_cache else read_batch_documents(args.input)
+    try:
+        summary = write_zip(documents, args.output, args.formats or ["md"],
+                            progress=lambda count, name: print(f"[{count}] {name}", file=sys.stderr))
+    except ExportError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(f"Done: {summary['documents']} syllabi, {summary['files']} files, {summary['bytes']} bytes -> {args.output}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# http_client.py
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_SIZE = int(os.getenv("SYLLABUS_HTTP_POOL_SIZE", "10"))
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("SYLLABUS_HTTP_CONNECT_TIMEOUT", "5"))
+DEFAULT_READ_TIMEOUT = float(os.getenv("SYLLABUS_HTTP_READ_TIMEOUT", "60"))
+DEFAULT_MAX_RETRIES = int(os.getenv("SYLLABUS_HTTP_MAX_RETRIES", "3"))
+DEFAULT_BACKOFF_BASE = float(os.getenv("SYLLABUS_HTTP_BACKOFF_BASE", "0.5"))
+DEFAULT_BACKOFF_MAX = float(os.getenv("SYLLABUS_HTTP_BACKOFF_MAX", "8"))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Seconds spent opening new connections (TCP + TLS) in the current thread's request
+_connect_time = threading.local()
+
+
+class _TimedConnectionMixin:
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + time.perf_counter() - started
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record how long connection setup took"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                                   "https": _TimedHTTPSConnectionPool}
+
+
+class HttpClient:
+    """Keep-alive requests session with a bounded pool, timeouts and retry with backoff"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        # pool_block makes callers wait for a free connection instead of opening unbounded extras
+        adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def backoff_delay(self, attempt, response=None):
+        """Return seconds to wait before retry number attempt (0-based)"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        # Full jitter keeps concurrent sessions from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post(self, url, **kwargs):
+        """
+        POST with connection reuse, timeouts and retries on 429/5xx or connection failures
+
+        Args:
+            url (str): Request URL
+            **kwargs: Passed through to requests.Session.post
+
+        Returns:
+            requests.Response: The final response, which may still carry an error status.
+                response.connect_seconds is the time spent opening connections (0 when a
+                pooled connection was reused) and response.attempts the number of tries.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        _connect_time.seconds = 0.0
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, **kwargs)
+            except requests.exceptions.ConnectionError:
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self.backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                response.connect_seconds = _connect_time.seconds
+                response.attempts = attempt + 1
+                return response
+            delay = self.backoff_delay(attempt, response)
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        """Close every pooled connection"""
+        self.session.close()
@@ -0,0 +1,192 @@
+# jobs.py
+"""
+Background generation jobs that outlive Streamlit reruns.
+
+submit() returns a job id immediately and a bounded worker pool runs the
+job. Identical requests that are already queued or running are coalesced
+onto the same job (single-flight), so concurrent sessions asking for the
+same syllabus share one LLM call. Queued jobs are dispatched round-robin
+across owners (sessions), so one busy session can't starve the others.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = int(os.getenv("SYLLABUS_JOB_WORKERS", "8"))
+DEFAULT_RETENTION_SECONDS = int(os.getenv("SYLLABUS_JOB_RETENTION_SECONDS", "3600"))
+# Assumed job duration until real ones have been measured
+INITIAL_SERVICE_SECONDS = 20.0
+SERVICE_TIME_SMOOTHING = 0.2
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """State of one background job; partial output can be appended while it runs"""
+
+    def __init__(self, key, owner=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.owner = owner
+        self.status = QUEUED
+        self.result = None
+        self.error = ""
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Interim result shown until the job finishes, e.g. a draft being refined
+        self.draft = None
+        self._parts = []
+        self._lock = threading.Lock()
+
+    def append(self, text):
+        """Record a chunk of partial output for pollers"""
+        with self._lock:
+            self._parts.append(text)
+
+    @property
+    def partial_text(self):
+        with self._lock:
+            return "".join(self._parts)
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """Bounded worker pool with single-flight de-duplication and per-owner fair queueing"""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, retention_seconds=DEFAULT_RETENTION_SECONDS):
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="syllabus-job")
+        self._jobs = {}
+        self._in_flight = {}
+        # owner -> deque of (job, fn, args, kwargs); owners are served in rotation
+        self._queues = OrderedDict()
+        self._service_seconds = INITIAL_SERVICE_SECONDS
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, owner=None, **kwargs):
+        """
+        Queue fn(job, *args, **kwargs) unless an identical job is already in flight
+
+        Args:
+            key (str): De-duplication key; equal keys share one in-flight job
+            fn (callable): Work to run; its return value becomes job.result
+            owner (str): Fairness group, e.g. the session id; queued jobs are taken
+                round-robin across owners
+
+        Returns:
+            str: Id of the new or already running job
+        """
+        with self._lock:
+            self._prune()
+            existing = self._in_flight.get(key)
+            if existing is not None:
+                return existing.id
+            job = Job(key, owner)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            self._queues.setdefault(owner, deque()).append((job, fn, args, kwargs))
+        # Each submission schedules one dispatch; the dispatch picks whichever job is fairest then
+        self._executor.submit(self._run_next)
+        return job.id
+
+    def _dispatch_order(self):
+        # Round-robin over owners in rotation order; caller holds the lock
+        queues = [list(queue) for queue in self._queues.values()]
+        order = []
+        depth = 0
+        while any(depth < len(queue) for queue in queues):
+            order.extend(queue[depth][0] for queue in queues if depth < len(queue))
+            depth += 1
+        return order
+
+    def _run_next(self):
+        with self._lock:
+            owner, queue = next(iter(self._queues.items()))
+            job, fn, args, kwargs = queue.popleft()
+            del self._queues[owner]
+            if queue:
+                # Owner goes to the back of the rotation with its remaining jobs
+                self._queues[owner] = queue
+        self._run(job, fn, args, kwargs)
+
+    def _run(self, job, fn, args, kwargs):
+        job.started_at = time.time()
+        job.status = RUNNING
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+                self._service_seconds += SERVICE_TIME_SMOOTHING * (
+                    job.finished_at - job.started_at - self._service_seconds
+                )
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Return the Job for job_id, or None if it is unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def position(self, job_id):
+        """Return the 1-based position in dispatch order of a queued job, or 0 once it has started"""
+        with self._lock:
+            order = [job.id for job in self._dispatch_order()]
+        return order.index(job_id) + 1 if job_id in order else 0
+
+    def _wait_at(self, position):
+        with self._lock:
+            service_seconds = self._service_seconds
+            running = sum(1 for job in self._jobs.values() if job.status == RUNNING)
+        # A worker frees up every service_seconds / max_workers on average; a job starts once
+        # enough running and earlier queued jobs have finished to reach it
+        must_finish = max(0, running + position - self.max_workers)
+        return must_finish * service_seconds / self.max_workers
+
+    def eta(self, job_id):
+        """Estimated seconds until a queued job starts, from its position and recent job durations"""
+        position = self.position(job_id)
+        return self._wait_at(position) if position else 0.0
+
+    def eta_for_new(self):
+        """Estimated seconds a job submitted now would wait before starting"""
+        return self._wait_at(self.stats()["queued"] + 1)
+
+    def stats(self):
+        """Return queued, running and retained job counts"""
+        with self._lock:
+            return {
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "running": sum(1 for job in self._jobs.values() if job.status == RUNNING),
+                "retained": len(self._jobs),
+            }
@@ -0,0 +1,387 @@
+# metrics.py
+"""
+Per-request tracing and Prometheus metrics.
+
+Each generation runs inside a Trace that collects phase timings (queue
+wait, connect, time to first token, total, parse, render), token counts,
+cache outcome, provider and HTTP status. Finished traces update the
+in-process registry and are logged as one JSON line on the
+`syllabus.trace` logger. A small sidecar HTTP server exposes the registry
+in Prometheus text format at /metrics.
+
+Usage:
+    SYLLABUS_METRICS_PORT=9108 streamlit run app.py
+    curl -s localhost:9108/metrics
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_METRICS_HOST = os.getenv("SYLLABUS_METRICS_HOST", "127.0.0.1")
+DEFAULT_METRICS_PORT = int(os.getenv("SYLLABUS_METRICS_PORT", "9108"))
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+logger = logging.getLogger("syllabus.trace")
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (f'{name}="{value.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for name, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe counters, histograms and callback gauges rendered as Prometheus text"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1, help="", **labels):
+        """Add amount to the counter name{labels}"""
+        with self._lock:
+            self._help.setdefault(name, help)
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, value, help="", **labels):
+        """Record value in the histogram name{labels}"""
+        with self._lock:
+            self._help.setdefault(name, help)
+            series = self._histograms.setdefault(name, {})
+            key = _label_key(labels)
+            counts = series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def gauge(self, name, callback, help=""):
+        """Register a gauge read at scrape time; callback() returns {((label, value), ...): number}"""
+        with self._lock:
+            self._help[name] = help
+            self._gauges[name] = callback
+
+    def value(self, name, **labels):
+        """Return a counter's current value (0 if unseen)"""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: list(c) for key, c in series.items()}
+                          for name, series in self._histograms.items()}
+            gauges = dict(self._gauges)
+            help_text = dict(self._help)
+        for name, series in sorted(counters.items()):
+            lines += [f"# HELP {name} {help_text.get(name, '')}", f"# TYPE {name} counter"]
+            lines += [f"{name}{_format_labels(key)} {value}" for key, value in sorted(series.items())]
+        for name, series in sorted(histograms.items()):
+            lines += [f"# HELP {name} {help_text.get(name, '')}", f"# TYPE {name} histogram"]
+            for key, counts in sorted(series.items()):
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', repr(bound))])} {count}")
+                lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {counts[-1]}")
+                lines.append(f"{name}_sum{_format_labels(key)} {counts[-2]:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {counts[-1]}")
+        for name, callback in sorted(gauges.items()):
+            try:
+                values = callback()
+            except Exception:
+                continue
+            lines += [f"# HELP {name} {help_text.get(name, '')}", f"# TYPE {name} gauge"]
+            lines += [f"{name}{_format_labels(_label_key(dict(labels)))} {value}"
+                      for labels, value in sorted(values.items())]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+_current_trace = ContextVar("syllabus_trace", default=None)
+
+
+class Trace:
+    """Timings and attributes of one generation request"""
+
+    def __init__(self, kind, subject="", duration="", request_id=None):
+        self.id = request_id or uuid.uuid4().hex
+        self.kind = kind
+        self.subject = subject
+        self.duration = duration
+        self.phases = {}
+        self.attributes = {}
+        # Keys of every provider that answered a call of this request
+        self.providers = set()
+        self.success = None
+        self.error = ""
+        self.finished = False
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as phase name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, time.perf_counter() - started)
+
+    def mark(self, name, seconds):
+        """Record a phase duration measured elsewhere; repeated marks add up"""
+        if seconds is not None:
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def set(self, **attributes):
+        """Attach attributes (cache, provider, http_status, ...); None values are ignored"""
+        with self._lock:
+            self.attributes.update({name: value for name, value in attributes.items() if value is not None})
+
+    def record_call(self, info):
+        """
+        Add what one provider request reported in its info dict
+
+        Requests of a week-by-week generation run concurrently: connect time and tokens
+        add up, ttft is kept from the first request and provider/status from the last.
+        """
+        self.mark("connect", info.get("connect"))
+        with self._lock:
+            if "ttft" not in self.phases and info.get("ttft") is not None:
+                self.phases["ttft"] = info["ttft"]
+            for name in ("prompt_tokens", "completion_tokens"):
+                self.attributes[name] = self.attributes.get(name, 0) + (info.get(name) or 0)
+            self.attributes["calls"] = self.attributes.get("calls", 0) + (info.get("calls") or 1)
+            self.providers.update(info.get("providers") or ([info["provider"]] if info.get("provider") else []))
+            self.attributes.update({name: info[name] for name in ("provider", "http_status", "finish_reason")
+                                    if info.get(name) is not None})
+
+    def set_result(self, success, error_message=""):
+        self.success = bool(success)
+        self.error = error_message or ""
+
+    def to_dict(self):
+        return {
+            "event": "generation",
+            "request_id": self.id,
+            "kind": self.kind,
+            "subject": self.subject,
+            "duration": self.duration,
+            "success": self.success,
+            "error": self.error,
+            "started_at": round(self.started_at, 3),
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            **self.attributes,
+        }
+
+    def finish(self):
+        """Record the trace in the registry and log it; later calls are ignored"""
+        if self.finished:
+            return
+        self.finished = True
+        if "total" not in self.phases:
+            self.phases["total"] = time.perf_counter() - self._started
+        if self.success is None:
+            self.success = not self.error
+        attributes = self.attributes
+        status = "ok" if self.success else "error"
+        registry.inc("syllabus_requests_total", help="Generation requests by outcome, cache result and provider",
+                     kind=self.kind, status=status, cache=attributes.get("cache", "none"),
+                     provider=attributes.get("provider", "none"))
+        for name, seconds in self.phases.items():
+            registry.observe("syllabus_phase_seconds", seconds, help="Time spent per request phase",
+                             phase=name, kind=self.kind)
+        for kind in ("prompt", "completion"):
+            if attributes.get(f"{kind}_tokens"):
+                registry.inc("syllabus_tokens_total", attributes[f"{kind}_tokens"],
+                             help="Prompt and completion tokens", type=kind, duration=self.duration)
+        if attributes.get("http_status") is not None:
+            registry.inc("syllabus_http_responses_total", help="Final upstream HTTP status per request",
+                         status=attributes["http_status"], provider=attributes.get("provider", "none"))
+        logger.info(json.dumps(self.to_dict(), ensure_ascii=False))
+
+
+def current_trace():
+    """Return the trace of the request running in this context, or None"""
+    return _current_trace.get()
+
+
+def bind_trace(fn):
+    """Return fn bound to the current trace, for calls made from worker threads"""
+    trace = _current_trace.get()
+    if trace is None:
+        return fn
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current_trace.set(trace)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_trace.reset(token)
+
+    return wrapper
+
+
+def annotate(**attributes):
+    """Set attributes on the current trace, if any"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.set(**attributes)
+
+
+@contextmanager
+def trace_request(kind, subject="", duration="", request_id=None):
+    """
+    Run the enclosed block as one traced request
+
+    Nested calls join the outer trace, so a request is recorded once at its entry point.
+
+    Yields:
+        Trace: The active trace
+    """
+    existing = _current_trace.get()
+    if existing is not None:
+        yield existing
+        return
+    trace = Trace(kind, subject, duration, request_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    except Exception as e:
+        trace.set_result(False, str(e))
+        raise
+    finally:
+        _current_trace.reset(token)
+        trace.finish()
+
+
+def traced(kind):
+    """
+    Decorate fn(subject, duration, ...) -> (success, content, error_message) to run as a traced request
+
+    When content is an iterator (streaming), the trace finishes once it is exhausted.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(subject, duration, *args, **kwargs):
+            if _current_trace.get() is not None:
+                return fn(subject, duration, *args, **kwargs)
+            trace = Trace(kind, subject, duration)
+            token = _current_trace.set(trace)
+            try:
+                success, content, error_message = fn(subject, duration, *args, **kwargs)
+            except Exception as e:
+                trace.set_result(False, str(e))
+                trace.finish()
+                raise
+            finally:
+                _current_trace.reset(token)
+            trace.set_result(success, error_message)
+            if success and not isinstance(content, str):
+                return success, _finish_after(trace, content), error_message
+            trace.finish()
+            return success, content, error_message
+
+        return wrapper
+    return decorator
+
+
+def _finish_after(trace, chunks):
+    try:
+        return (yield from chunks)
+    except Exception as e:
+        trace.set_result(False, str(e))
+        raise
+    finally:
+        trace.finish()
+
+
+def record_render(request_id, kind, parse_seconds=None, render_seconds=None):
+    """Record the UI-side parse/render phases of a request that already finished generating"""
+    phases = {"parse": parse_seconds, "render": render_seconds}
+    for name, seconds in phases.items():
+        if seconds is not None:
+            registry.observe("syllabus_phase_seconds", seconds, help="Time spent per request phase",
+                             phase=name, kind=kind)
+    logger.info(json.dumps({
+        "event": "render",
+        "request_id": request_id,
+        "kind": kind,
+        "phases": {name: round(seconds, 4) for name, seconds in phases.items() if seconds is not None},
+    }))
+
+
+def _make_handler(metrics_registry):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = metrics_registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+class MetricsServer:
+    """Background HTTP server exposing a registry at /metrics"""
+
+    def __init__(self, host=DEFAULT_METRICS_HOST, port=DEFAULT_METRICS_PORT, metrics_registry=None):
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(metrics_registry or registry))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="metrics-server")
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def start_metrics_server(host=DEFAULT_METRICS_HOST, port=DEFAULT_METRICS_PORT):
+    """Start the /metrics sidecar; returns None if disabled (port 0) or the port is taken"""
+    if not port:
+        return None
+    try:
+        return MetricsServer(host, port).start()
+    except OSError as e:
+        logger.warning("Metrics server not started on %s:%s: %s", host, port, e)
+        return None
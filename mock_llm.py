@@ -0,0 +1,257 @@
+# mock_llm.py
+"""
+Local stand-ins for the LLM providers, used by benchmark.py.
+
+MockLLMServer speaks OpenRouter's /api/v1/chat/completions protocol
+(plain JSON and SSE streaming) with configurable latency, token rate and
+failure rate. MockGeminiProvider simulates the Gemini backend in-process.
+
+Usage:
+    python mock_llm.py --port 8001 --latency 0.3 --tokens-per-second 200
+    OPENROUTER_URL=http://127.0.0.1:8001/api/v1/chat/completions streamlit run app.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from providers import GEMINI_MODEL, Provider
+
+TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+def _week_block(number, title):
+    return (f"### Week {number}: {title}\n"
+            "**Learning Objectives:**\n- Explain the core ideas of this week\n- Apply them to a worked example\n\n"
+            "**Topics Covered:**\n- Key concepts\n- Worked examples\n- Common pitfalls\n\n"
+            "**Activities:**\n- Guided lab session\n- Small group discussion\n\n"
+            "**Assessment:** Short quiz on this week's material")
+
+
+def _closing_sections():
+    return ("## Assessment Methods\n"
+            "- **Assignments:** 30% - Weekly problem sets\n"
+            "- **Midterm Exam:** 20% - Covers the first half of the course\n"
+            "- **Final Project:** 35% - Individual capstone project\n"
+            "- **Participation:** 15% - Attendance and discussion\n\n"
+            "## Required Materials\n- Course textbook\n- Lecture notes\n- Laptop\n\n"
+            "## Recommended Resources\n- Online documentation\n- Practice exercises\n- Study group\n\n"
+            "## Course Policies\n"
+            "- **Attendance:** Attendance is expected at every session\n"
+            "- **Late Submissions:** 10% deduction per day late\n"
+            "- **Academic Integrity:** All work must be your own\n")
+
+
+def fake_syllabus(messages):
+    """Return template-conformant markdown that fits what the prompt asks for"""
+    if len(messages) >= 3 and messages[-2].get("role") == "assistant":
+        # Continuation request: carry on from where the cut-off reply stopped
+        full, partial = fake_syllabus(messages[:-2]), messages[-2]["content"]
+        return full[len(partial):] if full.startswith(partial) else full
+    prompt = messages[-1]["content"] if messages else ""
+    week = re.search(r"^- (?:Week|Part) to (?:write|rewrite): Week (\d+)", prompt, re.MULTILINE)
+    if week:
+        return _week_block(int(week.group(1)), f"Topic {week.group(1)}")
+    section = re.search(r"^- Part to rewrite: (.+)$", prompt, re.MULTILINE)
+    if section:
+        match = re.search(rf"^## {re.escape(section.group(1))}\n.*?(?=^## |\Z)", _closing_sections(),
+                          re.MULTILINE | re.DOTALL)
+        return match.group(0).strip() if match else f"## {section.group(1)}\n- Revised content"
+    subject = re.search(r"subject '([^']+)'|(?:Title|Subject): (.+)", prompt)
+    subject = next((g for g in subject.groups() if g), "Course").strip() if subject else "Course"
+    weeks = re.search(r"(\d+) [Ww]eeks", prompt)
+    weeks = int(weeks.group(1)) if weeks else 4
+    header = (f"# {subject} - {weeks} Weeks Course Syllabus\n\n"
+              f"## Course Overview\nAn introduction to {subject} covering theory and practice.\n\n"
+              "## Course Objectives\n- Build foundations\n- Develop practical skills\n- Prepare for advanced study\n\n"
+              "## Learning Outcomes\nBy the end of this course, students will be able to:\n"
+              "- Explain key concepts\n- Solve typical problems\n- Complete an independent project\n\n"
+              "## Weekly Breakdown\n")
+    if "outline" in prompt:
+        titles = "\n".join(f"### Week {n}: Topic {n}" for n in range(1, weeks + 1))
+        return f"{header}{titles}\n\n{_closing_sections()}"
+    body = "\n\n---\n\n".join(_week_block(n, f"Topic {n}") for n in range(1, weeks + 1))
+    return f"{header}\n{body}\n\n---\n\n{_closing_sections()}"
+
+
+def tokenize(text):
+    """Split text into word-sized pseudo tokens"""
+    return TOKEN_RE.findall(text)
+
+
+class MockBehavior:
+    """Timing and failure settings shared by the mock server and the Gemini stub"""
+
+    def __init__(self, latency=0.2, tokens_per_second=200.0, fail_rate=0.0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.fail_rate = fail_rate
+
+    def tokens(self, messages, max_tokens):
+        tokens = tokenize(fake_syllabus(messages))
+        if max_tokens and len(tokens) > max_tokens:
+            return tokens[:max_tokens], "length"
+        return tokens, "stop"
+
+    def delay_per_token(self):
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def should_fail(self):
+        return self.fail_rate and random.random() < self.fail_rate
+
+
+def _make_handler(behavior):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("chat/completions"):
+                self._send_json(404, {"error": {"message": "Not found"}})
+                return
+            time.sleep(behavior.latency)
+            if behavior.should_fail():
+                self._send_json(random.choice((429, 500, 503)), {"error": {"message": "Mock failure"}})
+                return
+
+            messages = body.get("messages", [])
+            tokens, finish_reason = behavior.tokens(messages, body.get("max_tokens"))
+            usage = {
+                "prompt_tokens": sum(len(tokenize(m.get("content", ""))) for m in messages),
+                "completion_tokens": len(tokens),
+            }
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            delay = behavior.delay_per_token()
+
+            if not body.get("stream"):
+                time.sleep(delay * len(tokens))
+                self._send_json(200, {
+                    "id": "mock", "model": body.get("model"), "usage": usage,
+                    "choices": [{"index": 0, "finish_reason": finish_reason,
+                                 "message": {"role": "assistant", "content": "".join(tokens)}}],
+                })
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            self.wfile.write(b": OPENROUTER PROCESSING\n\n")
+            for token in tokens:
+                time.sleep(delay)
+                event = {"choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            final = {"choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}], "usage": usage}
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+    return Handler
+
+
+class MockLLMServer:
+    """Threaded local server implementing OpenRouter's chat completions endpoint"""
+
+    def __init__(self, host="127.0.0.1", port=0, **behavior):
+        self.behavior = MockBehavior(**behavior)
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self.behavior))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v1/chat/completions"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class MockGeminiProvider(Provider):
+    """In-process Gemini stand-in with the same latency model as the mock server"""
+
+    name = "gemini"
+
+    def __init__(self, model=GEMINI_MODEL, **behavior):
+        super().__init__(model)
+        self.behavior = MockBehavior(**behavior)
+
+    def _record(self, messages, tokens, finish_reason, info):
+        if info is not None:
+            info["finish_reason"] = finish_reason
+            info["usage"] = {"prompt_tokens": sum(len(tokenize(m.get("content", ""))) for m in messages),
+                             "completion_tokens": len(tokens)}
+
+    def complete(self, messages, max_tokens, temperature, info=None):
+        time.sleep(self.behavior.latency)
+        if self.behavior.should_fail():
+            return False, "", "Gemini error: mock failure"
+        tokens, finish_reason = self.behavior.tokens(messages, max_tokens)
+        time.sleep(self.behavior.delay_per_token() * len(tokens))
+        self._record(messages, tokens, finish_reason, info)
+        return True, "".join(tokens), ""
+
+    def stream(self, messages, max_tokens, temperature, info=None):
+        time.sleep(self.behavior.latency)
+        if self.behavior.should_fail():
+            return False, iter(()), "Gemini error: mock failure"
+        tokens, finish_reason = self.behavior.tokens(messages, max_tokens)
+
+        def chunks():
+            for token in tokens:
+                time.sleep(self.behavior.delay_per_token())
+                yield token
+            self._record(messages, tokens, finish_reason, info)
+
+        return True, chunks(), ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a mock OpenRouter chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first byte")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Generation speed")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with 429/5xx")
+    args = parser.parse_args(argv)
+
+    server = MockLLMServer(args.host, args.port, latency=args.latency,
+                           tokens_per_second=args.tokens_per_second, fail_rate=args.fail_rate)
+    print(f"Mock LLM server listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
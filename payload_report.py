@@ -0,0 +1,81 @@
+# payload_report.py
+"""
+Per-rerun payload size of the Streamlit page.
+
+Runs app.py headless with Streamlit's AppTest and reports the serialized
+size of the elements one script run sends to the browser, split into
+markdown, inline <style> CSS and everything else, plus the bytes the
+session keeps in st.session_state on the server.
+
+Usage:
+    python payload_report.py --runs 3 --budget-bytes 8000
+"""
+import argparse
+import os
+import sys
+
+DEFAULT_BUDGET_BYTES = int(os.getenv("SYLLABUS_PAYLOAD_BUDGET_BYTES", "0"))
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _walk(node):
+    proto = getattr(node, "proto", None)
+    if proto is not None and hasattr(proto, "SerializeToString"):
+        yield node, len(proto.SerializeToString())
+    children = getattr(node, "children", None) or {}
+    for child in children.values() if isinstance(children, dict) else children:
+        yield from _walk(child)
+
+
+def measure(script="app.py", runs=1):
+    """
+    Run script runs times (the first run plus reruns) and size the final element tree
+
+    Returns:
+        dict: elements, total_bytes, markdown_bytes, style_bytes, style_blocks and session_state_bytes
+    """
+    from streamlit.testing.v1 import AppTest
+
+    from documents import get_document_store
+
+    app = AppTest.from_file(os.path.join(PROJECT_DIR, script), default_timeout=30)
+    for _ in range(runs):
+        app.run()
+    if app.exception:
+        raise RuntimeError(f"{script} raised: {app.exception[0].message}")
+
+    report = {"elements": 0, "total_bytes": 0, "markdown_bytes": 0, "style_bytes": 0, "style_blocks": 0,
+              "session_state_bytes": get_document_store().stats()["session_bytes_max"]}
+    for node, size in _walk(app._tree):
+        report["elements"] += 1
+        report["total_bytes"] += size
+    for markdown in app.markdown:
+        report["markdown_bytes"] += len(markdown.value.encode("utf-8"))
+        if "<style" in markdown.value:
+            report["style_blocks"] += 1
+            report["style_bytes"] += len(markdown.value.encode("utf-8"))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the bytes one Streamlit rerun sends to the browser")
+    parser.add_argument("--script", default="app.py")
+    parser.add_argument("--runs", type=int, default=2, help="Script runs before measuring (>= 2 measures a rerun)")
+    parser.add_argument("--budget-bytes", type=int, default=DEFAULT_BUDGET_BYTES, help="Fail above this size (0 = off)")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, PROJECT_DIR)
+    report = measure(args.script, args.runs)
+    print(f"Elements per run:   {report['elements']}")
+    print(f"Serialized bytes:   {report['total_bytes']}")
+    print(f"Markdown bytes:     {report['markdown_bytes']}")
+    print(f"Inline CSS bytes:   {report['style_bytes']} in {report['style_blocks']} <style> block(s)")
+    print(f"Session state:      {report['session_state_bytes']} bytes")
+    if args.budget_bytes and report["total_bytes"] > args.budget_bytes:
+        print(f"OVER BUDGET ({args.budget_bytes} bytes)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+# prompts.py
+"""
+Versioned prompt templates for syllabus generation.
+
+Each template is a fixed system message and a static instruction prefix,
+compiled once at import, followed by the request's fields (subject,
+duration, level, goals) at the very end. Every request therefore starts
+with the same tokens, which lets provider-side prompt/prefix caching
+reuse them. A template's tag goes into cache keys: bump its version when
+the wording changes so results generated from the old prompt are not
+served.
+"""
+
+SYSTEM_PROMPT = "You are an experienced university professor who designs comprehensive, structured course syllabi. Create detailed week-by-week breakdowns with clear learning objectives, topics, and outcomes."
+
+DETAILS_HEADING = "Course details:"
+
+
+class PromptTemplate:
+    """Static system and instruction prefix followed by the request's fields"""
+
+    def __init__(self, name, version, instructions, fields, required=(), system=SYSTEM_PROMPT, body_heading=None,
+                 sections=()):
+        """
+        Args:
+            name (str): Template name used in the cache key tag
+            version (int): Bump whenever the wording changes
+            instructions (str): Static instructions; must not contain request fields
+            fields (tuple): (key, label) pairs rendered in this order after the prefix
+            required (tuple): Keys that must be given to render
+            system (str): System message
+            body_heading (str): Heading of a free-text body (e.g. a draft) placed after the fields
+            sections (tuple): (key, heading) pairs of multi-line values placed after the fields, in this order
+        """
+        self.name = name
+        self.version = version
+        self.fields = tuple(fields)
+        self.required = tuple(required)
+        self.system = system
+        self.body_heading = body_heading
+        self.sections = tuple(sections)
+        self.prefix = f"{instructions.strip()}\n\n{DETAILS_HEADING}\n"
+
+    @property
+    def tag(self):
+        """Cache key component identifying this template and version"""
+        return f"{self.name}/v{self.version}"
+
+    def render(self, body=None, **values):
+        """Return the user message: the static prefix, one line per non-empty field, the sections, then the body"""
+        missing = [key for key in self.required if not values.get(key)]
+        if missing:
+            raise ValueError(f"Missing prompt fields: {', '.join(missing)}")
+        lines = [f"- {label}: {values[key]}" for key, label in self.fields if values.get(key)]
+        text = self.prefix + "\n".join(lines)
+        for key, heading in self.sections:
+            if values.get(key):
+                text += f"\n\n{heading}:\n{values[key]}"
+        if body:
+            text += f"\n\n{self.body_heading}:\n{body}"
+        return text
+
+    def messages(self, body=None, **values):
+        """Return the chat messages for one request"""
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.render(body, **values)},
+        ]
+
+
+# Format blocks shared by the full syllabus and the outline
+FRONT_MATTER = """# [Subject] - [Duration] Course Syllabus
+
+## Course Overview
+[Brief description of the course and what students will learn]
+
+## Course Objectives
+- [Objective 1]
+- [Objective 2]
+- [Objective 3]
+
+## Learning Outcomes
+By the end of this course, students will be able to:
+- [Outcome 1]
+- [Outcome 2]
+- [Outcome 3]"""
+
+# One week block; fill in with WEEK_FORMAT.format(number=..., title=...)
+WEEK_FORMAT = """### Week {number}: {title}
+**Learning Objectives:**
+- [Objective 1]
+- [Objective 2]
+
+**Topics Covered:**
+- [Topic 1]
+- [Topic 2]
+- [Topic 3]
+
+**Activities:**
+- [Activity 1]
+- [Activity 2]
+
+**Assessment:** [Brief description]"""
+
+CLOSING_SECTIONS = """## Assessment Methods
+- **Assignments:** [Percentage]% - [Description]
+- **Midterm Exam:** [Percentage]% - [Description]
+- **Final Project:** [Percentage]% - [Description]
+- **Participation:** [Percentage]% - [Description]
+
+## Required Materials
+- [Material 1]
+- [Material 2]
+- [Material 3]
+
+## Recommended Resources
+- [Resource 1]
+- [Resource 2]
+- [Resource 3]
+
+## Course Policies
+- **Attendance:** [Policy]
+- **Late Submissions:** [Policy]
+- **Academic Integrity:** [Policy]"""
+
+# The app's full syllabus format (single completion)
+SYLLABUS_TEMPLATE = PromptTemplate("syllabus", 2, f"""
+Generate a detailed syllabus for the course given under "Course details" at the end of this message.
+
+Please format the response EXACTLY as follows:
+
+{FRONT_MATTER}
+
+## Weekly Breakdown
+
+{WEEK_FORMAT.format(number=1, title="[Topic Name]")}
+
+---
+
+[Continue this format for each week of the course]
+
+{CLOSING_SECTIONS}
+
+Make sure to use this exact formatting with proper markdown headers, bullet points, and clear section divisions.
+""", fields=(("subject", "Subject"), ("duration", "Duration")), required=("subject", "duration"))
+
+# syllabus_generator's shorter weekly plan with student level and optional goals
+PLAN_TEMPLATE = PromptTemplate("plan", 2, """
+Generate a weekly course syllabus for the course given under "Course details" at the end of this message.
+
+Include:
+1. Weekly topic breakdown, from Week 1 to the final week
+2. Learning objectives per week
+3. One assignment idea per week
+
+Return the output in clear markdown format.
+""", fields=(("title", "Title"), ("duration", "Duration"), ("level", "Student Level"),
+             ("goals", "Include these topics or goals")), required=("title", "duration"))
+
+# Draft-then-refine: a stronger model rewrites a fast draft (from a cheaper model or a related cached syllabus)
+REFINE_TEMPLATE = PromptTemplate("refine", 1, """
+Below the course details is a draft syllabus. It was written quickly, possibly by a smaller model or for a closely related course. Rewrite it into the final syllabus for the course in the details:
+- Make every section and week specific to this course, with accurate, well-sequenced topics
+- Use exactly as many weeks as the course duration
+- Keep the draft's markdown structure: the same headings, section order and week format
+- Keep parts that are already good as they are; correct, deepen or replace the rest
+
+Return only the complete final syllabus in markdown, without commentary.
+""", fields=(("subject", "Subject"), ("duration", "Duration")), required=("subject", "duration"),
+    body_heading="Draft syllabus")
+
+# Week-by-week generation, phase one: front matter, week titles and closing sections only
+OUTLINE_TEMPLATE = PromptTemplate("outline", 1, f"""
+Create the outline of the syllabus for the course given under "Course details" at the end of this message: the front matter, a title for every week and the closing sections. The details of each week are written separately.
+
+Please format the response EXACTLY as follows:
+
+{FRONT_MATTER}
+
+## Weekly Breakdown
+### Week 1: [Topic Name]
+### Week 2: [Topic Name]
+[One heading line per week, through the last week, with no other content]
+
+{CLOSING_SECTIONS}
+
+List exactly as many weeks as the number of weeks in the details and use this exact markdown formatting.
+""", fields=(("subject", "Subject"), ("duration", "Duration"), ("weeks", "Number of weeks")),
+    required=("subject", "duration", "weeks"))
+
+# Week-by-week generation, phase two: one week's details with the outline's schedule as context
+WEEK_TEMPLATE = PromptTemplate("week", 2, f"""
+You are writing one week of the syllabus for the course given under "Course details" at the end of this message. The full course schedule follows the details for context.
+
+Write ONLY the week given as "Week to write" in the details, with that week's number and title in its heading. If it is given without a title, pick a title for that week that fits its place in the schedule. Format the week EXACTLY as follows:
+
+{WEEK_FORMAT.format(number="[Number]", title="[Title]")}
+""", fields=(("subject", "Subject"), ("duration", "Duration"), ("week", "Week to write")),
+    required=("subject", "duration", "week"), sections=(("schedule", "Full course schedule"),))
+
+_PART_FORMAT = f"""
+A week keeps its heading line and is formatted EXACTLY as follows:
+
+{WEEK_FORMAT.format(number="[Number]", title="[Title]")}
+
+A section starts with its heading line and keeps the same markdown structure as its current version. The percentages in Assessment Methods must add up to 100%.
+
+Return only the rewritten part in markdown, without commentary."""
+
+# Rewrite one week or section in place (regenerate.py), the rest of the syllabus kept as context
+BLOCK_TEMPLATE = PromptTemplate("block", 1, f"""
+Below the course details is a syllabus in which one part, given as "Part to rewrite" in the details, is marked "[... <part>: being rewritten ...]". Its current version and any instructor feedback follow the syllabus.
+
+Write a new version of that part that fits the rest of the syllabus without repeating other weeks or sections.
+{_PART_FORMAT}
+""", fields=(("subject", "Subject"), ("duration", "Duration"), ("part", "Part to rewrite")),
+    required=("subject", "duration", "part"),
+    sections=(("syllabus", "Syllabus"), ("current", "Current version"),
+              ("notes", "Instructor feedback on the current version")))
+
+# Regenerate one broken part found by validation (repair.py); same layout as BLOCK_TEMPLATE
+REPAIR_TEMPLATE = PromptTemplate("repair", 1, f"""
+Below the course details is a syllabus that failed validation. One part, given as "Part to rewrite" in the details, is marked "[... <part>: being rewritten ...]"; its current version (possibly only a heading) and the problem to fix follow the syllabus.
+
+Write that part in full so that the problem is fixed and it fits the rest of the syllabus without repeating other weeks or sections.
+{_PART_FORMAT}
+""", fields=(("subject", "Subject"), ("duration", "Duration"), ("part", "Part to rewrite")),
+    required=("subject", "duration", "part"),
+    sections=(("syllabus", "Syllabus"), ("current", "Current version"), ("notes", "Problem to fix")))
+
+# Problem descriptions sent with REPAIR_TEMPLATE; they are part of its wording, so bump its version with them
+REPAIR_NOTES = {
+    "missing_week": "This week is missing from the syllabus. Write it so that it continues the sequence "
+                    "of the weeks before it.",
+    "missing_section": "This section is missing from the syllabus. Write it in full.",
+    "empty_week": "This week has no content; it was cut off. Write it in full.",
+    "assessment_total": "{message}. They must add up to exactly 100%.",
+}
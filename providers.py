@@ -0,0 +1,714 @@
+# providers.py
+"""
+LLM provider backends behind one interface, plus a latency-aware router.
+
+HTTP and SDK dependencies (requests, google.generativeai, llama_cpp) are
+imported on first use so that importing this module stays cheap at app
+start-up.
+
+Every provider exposes complete() and stream() returning the app's
+(success, content_or_chunks, error_message) tuples. The Router keeps
+rolling latency and error statistics per provider, sends each request to
+the fastest healthy backend and hedges to a second provider when the
+first is slower than its usual p95. A local model on CPU, when one is
+configured, is only used as a fallback: it ranks after every healthy
+remote backend and takes over when they fail or are deprioritised. It is
+never a hedge target; its few contexts are kept for requests that have no
+other backend left.
+"""
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_WINDOW = int(os.getenv("SYLLABUS_ROUTER_WINDOW", "50"))
+DEFAULT_HEDGE_AFTER = float(os.getenv("SYLLABUS_HEDGE_AFTER_SECONDS", "8"))
+DEFAULT_MAX_ERROR_RATE = float(os.getenv("SYLLABUS_MAX_ERROR_RATE", "0.5"))
+MIN_SAMPLES = 5
+DEFAULT_LOCAL_CONTEXT = int(os.getenv("SYLLABUS_LOCAL_MODEL_CONTEXT", "4096"))
+DEFAULT_LOCAL_PARALLEL = int(os.getenv("SYLLABUS_LOCAL_MODEL_PARALLEL", "1"))
+DEFAULT_LOCAL_THREADS = int(os.getenv("SYLLABUS_LOCAL_MODEL_THREADS", "0"))
+DEFAULT_LOCAL_BATCH = int(os.getenv("SYLLABUS_LOCAL_MODEL_BATCH", "512"))
+# Longest wait for a free local context before the call fails
+DEFAULT_LOCAL_WAIT = float(os.getenv("SYLLABUS_LOCAL_MODEL_WAIT_SECONDS", "60"))
+CANCEL_POLL_SECONDS = 0.25
+# Pause for an API key after a 429 without a Retry-After header
+THROTTLE_PAUSE_SECONDS = 5
+
+GEMINI_FINISH_REASONS = {"STOP": "stop", "MAX_TOKENS": "length"}
+
+# Set by the Router for each attempt; the event is set once another attempt of the same request has won
+_attempt_cancelled = contextvars.ContextVar("llm_attempt_cancelled", default=None)
+
+
+def attempt_cancelled():
+    """Return True if the router no longer needs the current attempt's result"""
+    cancelled = _attempt_cancelled.get()
+    return cancelled is not None and cancelled.is_set()
+
+
+def iter_sse_content(response, info=None):
+    """Yield content deltas from an OpenAI-style server-sent events response, recording finish_reason/usage in info"""
+    for line in response.iter_lines(decode_unicode=True):
+        # Blank keep-alives and ": OPENROUTER PROCESSING" comments carry no data
+        if not line or not line.startswith("data:"):
+            continue
+        payload = line[len("data:"):].strip()
+        if payload == "[DONE]":
+            break
+        data = json.loads(payload)
+        if "error" in data:
+            raise RuntimeError(data["error"].get("message", "Stream error"))
+        if info is not None and data.get("usage"):
+            info["usage"] = data["usage"]
+        choices = data.get("choices") or []
+        if choices:
+            if info is not None and choices[0].get("finish_reason"):
+                info["finish_reason"] = choices[0]["finish_reason"]
+            content = choices[0].get("delta", {}).get("content")
+            if content:
+                yield content
+
+
+class Provider:
+    """Base class for LLM backends"""
+
+    name = "provider"
+    # Remote providers go through admission control; a fallback ranks after every healthy non-fallback
+    remote = True
+    fallback = False
+
+    def __init__(self, model):
+        self.model = model
+
+    @property
+    def key(self):
+        return f"{self.name}:{self.model}"
+
+    def complete(self, messages, max_tokens, temperature, info=None):
+        """
+        Return (success, content, error_message) for one chat completion
+
+        If info is a dict it receives "finish_reason" ("stop", "length", ...) and,
+        when the backend reports it, "usage" with prompt_tokens/completion_tokens.
+        """
+        raise NotImplementedError
+
+    def stream(self, messages, max_tokens, temperature, info=None):
+        """Return (success, chunks, error_message); info is filled as for complete() once chunks is exhausted"""
+        raise NotImplementedError
+
+
+class OpenAICompatibleProvider(Provider):
+    """Any backend speaking the OpenAI chat completions protocol (OpenRouter, OpenAI, DeepSeek)"""
+
+    def __init__(self, name, url, api_key, model, http_client, extra_headers=None):
+        super().__init__(model)
+        self.name = name
+        self.url = url
+        self.api_key = api_key
+        self.http_client = http_client
+        self.extra_headers = extra_headers or {}
+
+    def headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            **self.extra_headers,
+        }
+
+    @staticmethod
+    def _record_response(response, info):
+        if info is not None:
+            info["http_status"] = response.status_code
+            info["connect"] = getattr(response, "connect_seconds", None)
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                info["retry_after"] = float(retry_after)
+
+    def _payload(self, messages, max_tokens, temperature, stream=False):
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def complete(self, messages, max_tokens, temperature, info=None):
+        import requests
+
+        try:
+            response = self.http_client.post(
+                self.url, headers=self.headers(), json=self._payload(messages, max_tokens, temperature)
+            )
+            self._record_response(response, info)
+            if response.status_code != 200:
+                return False, "", f"API request failed with status code: {response.status_code}"
+            data = response.json()
+            if "choices" in data and len(data["choices"]) > 0:
+                if info is not None:
+                    info["finish_reason"] = data["choices"][0].get("finish_reason")
+                    info["usage"] = data.get("usage")
+                return True, data["choices"][0]["message"]["content"], ""
+            return False, "", "No syllabus content received from the API"
+        except requests.exceptions.RequestException as e:
+            return False, "", f"Network error: {str(e)}"
+        except KeyError as e:
+            return False, "", f"Unexpected API response format: {str(e)}"
+        except Exception as e:
+            return False, "", f"Unexpected error: {str(e)}"
+
+    def stream(self, messages, max_tokens, temperature, info=None):
+        import requests
+
+        try:
+            response = self.http_client.post(
+                self.url, headers=self.headers(),
+                json=self._payload(messages, max_tokens, temperature, stream=True), stream=True
+            )
+        except requests.exceptions.RequestException as e:
+            return False, iter(()), f"Network error: {str(e)}"
+        self._record_response(response, info)
+        if response.status_code != 200:
+            response.close()
+            return False, iter(()), f"API request failed with status code: {response.status_code}"
+
+        def chunks():
+            try:
+                yield from iter_sse_content(response, info)
+            finally:
+                response.close()
+
+        return True, chunks(), ""
+
+
+class GeminiProvider(Provider):
+    """Google Gemini through google.generativeai, imported on first use"""
+
+    name = "gemini"
+
+    def __init__(self, api_key, model="gemini-pro"):
+        super().__init__(model)
+        self.api_key = api_key
+        self._client = None
+        self._lock = threading.Lock()
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                import google.generativeai as genai
+
+                genai.configure(api_key=self.api_key)
+                self._client = genai.GenerativeModel(self.model)
+            return self._client
+
+    @staticmethod
+    def _prompt(messages):
+        return "\n\n".join(message["content"] for message in messages)
+
+    @staticmethod
+    def _record(response, info):
+        if info is None:
+            return
+        try:
+            reason = response.candidates[0].finish_reason.name
+            info["finish_reason"] = GEMINI_FINISH_REASONS.get(reason, reason.lower())
+            usage = response.usage_metadata
+            info["usage"] = {"prompt_tokens": usage.prompt_token_count,
+                             "completion_tokens": usage.candidates_token_count}
+        except (AttributeError, IndexError):
+            pass
+
+    def complete(self, messages, max_tokens, temperature, info=None):
+        try:
+            response = self.client().generate_content(
+                self._prompt(messages),
+                generation_config={"max_output_tokens": max_tokens, "temperature": temperature},
+            )
+            self._record(response, info)
+            return True, response.text, ""
+        except Exception as e:
+            return False, "", f"Gemini error: {str(e)}"
+
+    def stream(self, messages, max_tokens, temperature, info=None):
+        try:
+            response = self.client().generate_content(
+                self._prompt(messages),
+                generation_config={"max_output_tokens": max_tokens, "temperature": temperature},
+                stream=True,
+            )
+        except Exception as e:
+            return False, iter(()), f"Gemini error: {str(e)}"
+
+        def chunks():
+            chunk = None
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+            if chunk is not None:
+                self._record(chunk, info)
+
+        return True, chunks(), ""
+
+
+class LocalModelPool:
+    """
+    Memory-mapped llama.cpp contexts for one GGUF model, shared by every session
+
+    The weights are mapped read-only, so each extra context costs only its KV
+    cache; up to size requests decode in parallel, each in its own context.
+    """
+
+    def __init__(self, path, size=DEFAULT_LOCAL_PARALLEL, n_ctx=DEFAULT_LOCAL_CONTEXT,
+                 n_threads=DEFAULT_LOCAL_THREADS, n_batch=DEFAULT_LOCAL_BATCH, wait_timeout=DEFAULT_LOCAL_WAIT):
+        self.path = path
+        self.size = max(1, size)
+        self.wait_timeout = wait_timeout
+        self.n_ctx = n_ctx
+        # Split the cores between parallel contexts unless a thread count is given
+        self.n_threads = n_threads or max(1, (os.cpu_count() or 1) // self.size)
+        self.n_batch = n_batch
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        from llama_cpp import Llama
+
+        return Llama(model_path=self.path, n_ctx=self.n_ctx, n_threads=self.n_threads, n_batch=self.n_batch,
+                     use_mmap=True, verbose=False)
+
+    def _take(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            return self._wait_idle()
+        try:
+            return self._load()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _wait_idle(self):
+        # Poll so that an attempt the router cancelled stops waiting and never takes the context
+        deadline = time.monotonic() + self.wait_timeout
+        while not attempt_cancelled():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"no local model context free within {self.wait_timeout:g}s")
+            try:
+                return self._idle.get(timeout=min(remaining, CANCEL_POLL_SECONDS))
+            except queue.Empty:
+                pass
+        raise TimeoutError("cancelled while waiting for a local model context")
+
+    @contextmanager
+    def context(self):
+        """Hold one model context for the duration of the block"""
+        llm = self._take()
+        try:
+            yield llm
+        finally:
+            self._idle.put(llm)
+
+    def warm(self):
+        """Load the first context (and map the weights) ahead of the first request"""
+        with self.context():
+            pass
+
+    def warm_in_background(self):
+        threading.Thread(target=self._warm_quietly, name="local-model-warmup", daemon=True).start()
+
+    def _warm_quietly(self):
+        try:
+            self.warm()
+        except Exception:
+            pass
+
+
+_local_pools = {}
+_local_pools_lock = threading.Lock()
+
+
+def get_local_pool(path, **options):
+    """Return the process-wide context pool for the model at path"""
+    with _local_pools_lock:
+        pool = _local_pools.get(path)
+        if pool is None:
+            pool = _local_pools[path] = LocalModelPool(path, **options)
+        return pool
+
+
+class LocalProvider(Provider):
+    """Quantized GGUF model on local CPU cores through llama-cpp-python, used as a fallback"""
+
+    name = "local"
+    remote = False
+    fallback = True
+
+    def __init__(self, path, pool=None):
+        super().__init__(os.path.basename(path))
+        self.pool = pool or get_local_pool(path)
+
+    @staticmethod
+    def _record(data, info):
+        if info is not None:
+            info["finish_reason"] = data["choices"][0].get("finish_reason")
+            info["usage"] = data.get("usage")
+
+    def complete(self, messages, max_tokens, temperature, info=None):
+        try:
+            with self.pool.context() as llm:
+                data = llm.create_chat_completion(messages=messages, max_tokens=max_tokens, temperature=temperature)
+            self._record(data, info)
+            return True, data["choices"][0]["message"]["content"], ""
+        except ImportError:
+            return False, "", "Local model error: llama-cpp-python is not installed"
+        except Exception as e:
+            return False, "", f"Local model error: {str(e)}"
+
+    def stream(self, messages, max_tokens, temperature, info=None):
+        try:
+            context = self.pool.context()
+            llm = context.__enter__()
+        except ImportError:
+            return False, iter(()), "Local model error: llama-cpp-python is not installed"
+        except Exception as e:
+            return False, iter(()), f"Local model error: {str(e)}"
+
+        def chunks():
+            # The context stays checked out until the stream is exhausted or closed
+            try:
+                for data in llm.create_chat_completion(messages=messages, max_tokens=max_tokens,
+                                                       temperature=temperature, stream=True):
+                    choice = data["choices"][0]
+                    if info is not None and choice.get("finish_reason"):
+                        info["finish_reason"] = choice["finish_reason"]
+                    content = choice.get("delta", {}).get("content")
+                    if content:
+                        yield content
+            finally:
+                context.__exit__(None, None, None)
+
+        return True, chunks(), ""
+
+
+class ProviderStats:
+    """Rolling latency and error window for one provider"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.first_token = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, ok, latency=None, first_token=None):
+        with self._lock:
+            self.outcomes.append(ok)
+            if ok and latency is not None:
+                self.latencies.append(latency)
+            if ok and first_token is not None:
+                self.first_token.append(first_token)
+
+    @staticmethod
+    def _percentile(values, q):
+        if not values:
+            return None
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def percentile(self, q, kind="complete"):
+        with self._lock:
+            values = list(self.first_token if kind == "stream" else self.latencies)
+        return self._percentile(values, q)
+
+    @property
+    def error_rate(self):
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    @property
+    def samples(self):
+        return len(self.outcomes)
+
+    def snapshot(self):
+        return {
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "ttft_p50": self.percentile(0.5, "stream"),
+            "error_rate": round(self.error_rate, 3),
+            "samples": self.samples,
+        }
+
+
+class Router:
+    """Send each request to the fastest healthy provider, hedging slow calls to a second one"""
+
+    def __init__(self, providers, hedge_after=DEFAULT_HEDGE_AFTER, max_error_rate=DEFAULT_MAX_ERROR_RATE,
+                 window=DEFAULT_WINDOW, admission=None):
+        self.providers = list(providers)
+        # Optional admission.Admission; calls then wait for a rate/concurrency slot per API key
+        self.admission = admission
+        self.hedge_after = hedge_after
+        self.max_error_rate = max_error_rate
+        self.stats = {provider.key: ProviderStats(window) for provider in self.providers}
+        self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-router")
+
+    @property
+    def primary(self):
+        """
+        The first listed (preferred) provider that is not a fallback; only its output is cached
+
+        A fallback such as the local model never qualifies, so an outage can't fill the shared
+        cache with its lower-quality syllabi for the whole TTL.
+        """
+        return next((provider for provider in self.providers if not provider.fallback), None)
+
+    def healthy(self, provider):
+        stats = self.stats[provider.key]
+        return stats.samples < MIN_SAMPLES or stats.error_rate < self.max_error_rate
+
+    def ranked(self, kind="complete"):
+        """Return providers ordered fastest-first, healthy ones before unhealthy ones"""
+        def sort_key(indexed):
+            index, provider = indexed
+            p50 = self.stats[provider.key].percentile(0.5, kind)
+            # Providers without samples sort first (p50 0) so every backend gets measured
+            return (not self.healthy(provider), provider.fallback, p50 or 0.0, index)
+
+        return [provider for _, provider in sorted(enumerate(self.providers), key=sort_key)]
+
+    def hedge_delay(self, provider):
+        """Seconds to wait on provider before hedging to the next one"""
+        p95 = self.stats[provider.key].percentile(0.95)
+        if p95 is None or self.stats[provider.key].samples < MIN_SAMPLES:
+            return self.hedge_after
+        return min(p95, self.hedge_after)
+
+    def _acquire(self, provider):
+        if self.admission is None or not provider.remote:
+            return lambda: None
+        return self.admission.acquire(provider.name)
+
+    def _check_throttled(self, provider, info):
+        if self.admission is not None and info is not None and info.get("http_status") == 429:
+            self.admission.throttled(provider.name, info.get("retry_after", THROTTLE_PAUSE_SECONDS))
+
+    def _timed_complete(self, provider, messages, max_tokens, temperature, info):
+        release = self._acquire(provider)
+        try:
+            if attempt_cancelled():
+                # A hedge that lost while it waited for its slot gives the slot back unused
+                return False, "", "cancelled: another provider answered first"
+            started = time.perf_counter()
+            result = provider.complete(messages, max_tokens, temperature, info)
+        finally:
+            release()
+        self.stats[provider.key].record(result[0], time.perf_counter() - started)
+        self._check_throttled(provider, info)
+        return result
+
+    def _attempt(self, cancelled, provider, messages, max_tokens, temperature, info):
+        _attempt_cancelled.set(cancelled)
+        return self._timed_complete(provider, messages, max_tokens, temperature, info)
+
+    def complete(self, messages, max_tokens, temperature, info=None):
+        """
+        Run one chat completion on the best available provider
+
+        Args:
+            messages (list): Chat messages to send
+            max_tokens (int): Completion token limit
+            temperature (float): Sampling temperature
+            info (dict): Optional; receives the winning call's finish_reason, usage and provider
+
+        Only a remote provider is launched as a hedge; a fallback runs when nothing else is left.
+
+        Returns:
+            tuple: (success: bool, content: str, error_message: str)
+        """
+        candidates = self.ranked()
+        if not candidates:
+            return False, "", "No LLM provider is configured"
+        pending = {}
+        errors = []
+        hedged = False
+        cancelled = threading.Event()
+
+        def launch(hedge=False):
+            provider = next(p for p in candidates if not p.fallback) if hedge else candidates[0]
+            candidates.remove(provider)
+            # Each attempt fills its own dict so a losing hedge can't overwrite the winner's metadata
+            attempt = {"provider": provider.key}
+            # Run in a copy of the caller's context so per-request tracing sees the attempt
+            future = self._executor.submit(contextvars.copy_context().run, self._attempt, cancelled,
+                                           provider, messages, max_tokens, temperature, attempt)
+            pending[future] = (provider, attempt)
+            return provider
+
+        primary = launch()
+        while pending:
+            can_hedge = not hedged and any(not provider.fallback for provider in candidates)
+            timeout = self.hedge_delay(primary) if can_hedge else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # The primary is past its usual p95: race a second remote provider against it
+                hedged = True
+                launch(hedge=True)
+                continue
+            for future in done:
+                provider, attempt = pending.pop(future)
+                success, content, error_message = future.result()
+                if info is not None:
+                    # On failure the last attempt's status is kept; a later success overwrites it
+                    info.update(attempt)
+                if success:
+                    # Losing attempts that haven't started are dropped; the rest give up their slot
+                    cancelled.set()
+                    for loser in pending:
+                        loser.cancel()
+                    return True, content, ""
+                errors.append(f"{provider.name}: {error_message}")
+            if not pending and candidates:
+                primary = launch()
+        return False, "", "; ".join(errors)
+
+    def stream(self, messages, max_tokens, temperature, info=None):
+        """
+        Stream a chat completion from the best provider, falling back before the first chunk
+
+        info, if given, receives the provider plus finish_reason/usage once the stream ends.
+
+        Returns:
+            tuple: (success: bool, chunks: iterator of str, error_message: str)
+        """
+        errors = []
+        for provider in self.ranked("stream"):
+            release = self._acquire(provider)
+            started = time.perf_counter()
+            try:
+                success, chunks, error_message = provider.stream(messages, max_tokens, temperature, info)
+            except Exception:
+                release()
+                raise
+            if success:
+                if info is not None:
+                    info["provider"] = provider.key
+                # The slot is held until the stream is exhausted or closed
+                return True, self._timed_stream(provider, chunks, started, info, release), ""
+            release()
+            self._check_throttled(provider, info)
+            self.stats[provider.key].record(False)
+            errors.append(f"{provider.name}: {error_message}")
+        return False, iter(()), "; ".join(errors) or "No LLM provider is configured"
+
+    def _timed_stream(self, provider, chunks, started, info=None, release=None):
+        first_token = None
+        try:
+            for chunk in chunks:
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                    if info is not None:
+                        info["ttft"] = first_token
+                yield chunk
+        except Exception:
+            self.stats[provider.key].record(False)
+            raise
+        finally:
+            if release is not None:
+                release()
+        self.stats[provider.key].record(True, time.perf_counter() - started, first_token)
+
+    def snapshot(self):
+        """Return rolling latency/error statistics keyed by provider:model"""
+        return {key: stats.snapshot() for key, stats in self.stats.items()}
+
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+DEEPSEEK_URL = "https://api.deepseek.com/chat/completions"
+
+OPENROUTER_MODEL = "openai/gpt-3.5-turbo"
+OPENAI_MODEL = "gpt-3.5-turbo"
+DEEPSEEK_MODEL = "deepseek-chat"
+GEMINI_MODEL = "gemini-pro"
+
+
+def build_providers(keys=None, http_client=None, preferred=None, models=None, names=None):
+    """
+    Build every provider that has an API key configured
+
+    Args:
+        keys (dict): API keys overriding the environment (OPENROUTER_API_KEY, ...)
+        http_client (HttpClient): Shared pooled client for HTTP providers
+        preferred (str): Provider name to list first while no latency samples exist
+        models (dict): Model overrides by provider name, e.g. {"openrouter": "openai/gpt-4o-mini"}
+        names (tuple): Build only these providers (e.g. ("openrouter",)); default all configured ones
+
+    A local model is added as the fallback when SYLLABUS_LOCAL_MODEL_PATH points at a
+    GGUF file; its weights start loading in the background right away.
+
+    Returns:
+        list: Configured Provider instances
+    """
+    keys = {**os.environ, **{k: v for k, v in (keys or {}).items() if v}}
+    if http_client is None:
+        from http_client import HttpClient
+
+        http_client = HttpClient()
+    models = {"openrouter": OPENROUTER_MODEL, "openai": OPENAI_MODEL, "deepseek": DEEPSEEK_MODEL,
+              "gemini": GEMINI_MODEL, **(models or {})}
+    wanted = set(names) if names is not None else {"openrouter", "openai", "deepseek", "gemini", "local"}
+    providers = []
+    if "openrouter" in wanted and keys.get("OPENROUTER_API_KEY"):
+        providers.append(OpenAICompatibleProvider(
+            "openrouter", keys.get("OPENROUTER_URL", OPENROUTER_URL), keys["OPENROUTER_API_KEY"],
+            models["openrouter"], http_client,
+            extra_headers={"HTTP-Referer": "http://localhost:8501", "X-Title": "Course Syllabus Generator"},
+        ))
+    if "openai" in wanted and keys.get("OPENAI_API_KEY"):
+        providers.append(OpenAICompatibleProvider("openai", OPENAI_URL, keys["OPENAI_API_KEY"],
+                                                  models["openai"], http_client))
+    if "deepseek" in wanted and keys.get("DEEPSEEK_API_KEY"):
+        providers.append(OpenAICompatibleProvider("deepseek", DEEPSEEK_URL, keys["DEEPSEEK_API_KEY"],
+                                                  models["deepseek"], http_client))
+    if "gemini" in wanted and keys.get("GEMINI_API_KEY"):
+        providers.append(GeminiProvider(keys["GEMINI_API_KEY"], models["gemini"]))
+    local_path = keys.get("SYLLABUS_LOCAL_MODEL_PATH")
+    if "local" in wanted and local_path and os.path.isfile(local_path):
+        local = LocalProvider(local_path)
+        local.pool.warm_in_background()
+        providers.append(local)
+    if preferred:
+        providers.sort(key=lambda provider: provider.name != preferred)
+    return providers
+
+
+_default_router = None
+_default_router_lock = threading.Lock()
+
+
+def get_router():
+    """Return a process-wide router built from environment API keys"""
+    global _default_router
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = Router(build_providers(preferred="gemini"))
+        return _default_router
@@ -0,0 +1,169 @@
+# regenerate.py
+"""
+Regenerate one part of an existing syllabus.
+
+A part is a single week block (`### Week N: ...`) or a top-level section
+(`## Assessment Methods`, `## Required Materials`, ...). The rest of the
+document is sent as context, only the chosen part is generated, and the
+new text is spliced back in place; everything else is kept verbatim.
+"""
+import re
+
+from prompts import BLOCK_TEMPLATE
+from syllabus_model import WEEK_HEADING_RE
+from week_parallel import WEEK_MAX_TOKENS
+
+SECTION_MAX_TOKENS = 400
+WEEK_BLOCK_END_RE = re.compile(r"^(?:#{1,3}\s|---\s*$)")
+SECTION_HEADING_RE = re.compile(r"^##\s+(.+?)\s*$")
+SECTION_END_RE = re.compile(r"^#{1,2}\s")
+# The week schedule is regenerated week by week, never as one section
+NON_REGENERABLE_SECTIONS = ("weekly breakdown",)
+PLACEHOLDER = "[... {label}: being rewritten ...]"
+
+
+def _line_offsets(markdown):
+    offsets, position = [], 0
+    for line in markdown.splitlines(keepends=True):
+        offsets.append((position, line.rstrip("\r\n")))
+        position += len(line)
+    return offsets
+
+
+def _week_number(line):
+    match = WEEK_HEADING_RE.match(line.strip())
+    return int(match.group(1)) if match else None
+
+
+def _section_name(line):
+    match = SECTION_HEADING_RE.match(line)
+    if not match or _week_number(line) is not None:
+        return None
+    return match.group(1).strip("* ")
+
+
+def list_blocks(markdown):
+    """
+    List the parts of a syllabus that can be regenerated, in document order
+
+    Returns:
+        list: Labels such as "Week 3" or "Assessment Methods"
+    """
+    labels = []
+    for _, line in _line_offsets(markdown):
+        number = _week_number(line)
+        if number is not None:
+            labels.append(f"Week {number}")
+            continue
+        name = _section_name(line)
+        if name and name.lower() not in NON_REGENERABLE_SECTIONS:
+            labels.append(name)
+    return list(dict.fromkeys(labels))
+
+
+def find_block(markdown, label):
+    """
+    Locate a week block or top-level section
+
+    Args:
+        markdown (str): Syllabus markdown
+        label (str): "Week N" or a section name
+
+    Returns:
+        tuple | None: (start, end) character span of the block without trailing blank lines
+    """
+    week = re.fullmatch(r"\s*Week\s+(\d+)\s*", label, re.IGNORECASE)
+    lines = _line_offsets(markdown)
+    for index, (start, line) in enumerate(lines):
+        if week:
+            if _week_number(line) != int(week.group(1)):
+                continue
+            is_end = WEEK_BLOCK_END_RE.match
+        else:
+            if (_section_name(line) or "").lower() != label.strip().lower():
+                continue
+            is_end = SECTION_END_RE.match
+        end = len(markdown)
+        for next_start, next_line in lines[index + 1:]:
+            if is_end(next_line):
+                end = next_start
+                break
+        return start, start + len(markdown[start:end].rstrip())
+    return None
+
+
+def extract_block(response, label, heading):
+    """Pull the regenerated block out of a model response, adding the heading if it was left out"""
+    text = re.sub(r"^```\w*\s*$", "", response.strip(), flags=re.MULTILINE).strip()
+    span = find_block(text, label)
+    if span is not None:
+        return text[span[0]:span[1]]
+    return f"{heading}\n{text}" if text else ""
+
+
+def build_block_messages(system_prompt, subject, duration, markdown, label, instructions="", template=BLOCK_TEMPLATE):
+    """
+    Build the prompt that rewrites one block with the rest of the syllabus as context
+
+    Args:
+        template (PromptTemplate): BLOCK_TEMPLATE for instructor feedback, REPAIR_TEMPLATE for a problem to fix
+
+    Returns:
+        tuple: (messages: list, max_tokens: int)
+
+    Raises:
+        ValueError: If label is not a block of markdown
+    """
+    span = find_block(markdown, label)
+    if span is None:
+        raise ValueError(f"No '{label}' block in this syllabus")
+    start, end = span
+    current = markdown[start:end]
+    context = markdown[:start] + PLACEHOLDER.format(label=label) + markdown[end:]
+    max_tokens = WEEK_MAX_TOKENS if _week_number(current.splitlines()[0]) is not None else SECTION_MAX_TOKENS
+    content = template.render(subject=subject, duration=duration, part=label, syllabus=context,
+                              current=current, notes=instructions.strip())
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": content},
+    ]
+    return messages, max_tokens
+
+
+def splice(markdown, label, block):
+    """Replace the label block of markdown with block"""
+    span = find_block(markdown, label)
+    if span is None:
+        raise ValueError(f"No '{label}' block in this syllabus")
+    return markdown[:span[0]] + block.strip() + markdown[span[1]:]
+
+
+def regenerate_block(complete, system_prompt, subject, duration, markdown, label, instructions=""):
+    """
+    Regenerate one week or section of a syllabus and splice it back in
+
+    Args:
+        complete (callable): complete(messages, max_tokens) -> (success, content, error_message)
+        system_prompt (str): System message for the call
+        subject (str): The subject for the syllabus
+        duration (str): The duration of the course
+        markdown (str): The current syllabus
+        label (str): Block to regenerate, e.g. "Week 3" or "Assessment Methods"
+        instructions (str): Optional instructor feedback on what to change
+
+    Returns:
+        tuple: (success: bool, content: str, error_message: str) where content is the full updated syllabus
+    """
+    try:
+        messages, max_tokens = build_block_messages(system_prompt, subject, duration, markdown, label, instructions)
+    except ValueError as e:
+        return False, "", str(e)
+
+    success, response, error_message = complete(messages, max_tokens)
+    if not success:
+        return False, "", error_message
+    start, end = find_block(markdown, label)
+    block = extract_block(response, label, markdown[start:end].splitlines()[0].strip())
+    if not block:
+        return False, "", f"No content received for {label}"
+    return True, splice(markdown, label, block), ""
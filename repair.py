@@ -0,0 +1,219 @@
+# repair.py
+"""
+Targeted repair of malformed syllabi.
+
+A generated syllabus is checked with syllabus_model.find_issues. Problems
+with a local fix are fixed in place: weeks are renumbered 1..N in document
+order, weeks past the course duration are dropped and a missing
+`## Weekly Breakdown` heading is restored. Missing weeks and sections,
+empty weeks and assessment percentages that don't add up to 100% are
+regenerated one part at a time with REPAIR_TEMPLATE, the rest of
+the syllabus kept verbatim as context. A few short completions replace a
+full re-generation.
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from prompts import REPAIR_NOTES, REPAIR_TEMPLATE
+from regenerate import build_block_messages, extract_block, find_block, splice
+from syllabus_model import SECTION_ALIASES, WEEK_HEADING_RE, find_issues, parse_duration_weeks, parse_syllabus
+
+# With more broken parts than this, a repair costs about as much as generating again; 0 applies only the local fixes
+DEFAULT_MAX_PARTS = int(os.getenv("SYLLABUS_REPAIR_MAX_PARTS", "4"))
+# Template section order, used to place a missing section
+SECTION_ORDER = tuple(name.title() for name in SECTION_ALIASES)
+WEEK_STUB = "### Week {number}: [Topic Name]"
+
+
+def renumber_weeks(markdown):
+    """
+    Number the week headings 1..N in document order
+
+    Only single-week headings are renumbered; callers skip syllabi with range headings.
+
+    >>> renumber_weeks("### Week 1: A\\n### Week 3: B\\n### Week 3: C\\n")
+    '### Week 1: A\\n### Week 2: B\\n### Week 3: C\\n'
+    """
+    lines = markdown.splitlines(keepends=True)
+    number = 0
+    for index, line in enumerate(lines):
+        match = WEEK_HEADING_RE.match(line.strip())
+        if match:
+            number += 1
+            offset = len(line) - len(line.lstrip())
+            start, end = match.span(1)
+            lines[index] = line[:offset + start] + str(number) + line[offset + end:]
+    return "".join(lines)
+
+
+def remove_block(markdown, label):
+    """Remove a week or section together with the `---` separator that follows it"""
+    start, end = find_block(markdown, label)
+    rest = re.sub(r"^\s*(?:---[ \t]*(?:\n|$))?\s*", "", markdown[end:], count=1)
+    return markdown[:start] + rest if rest else markdown[:start].rstrip() + "\n"
+
+
+def insert_section(markdown, name):
+    """Add an empty `## name` section where the template puts it"""
+    later = SECTION_ORDER[SECTION_ORDER.index(name) + 1:] if name in SECTION_ORDER else ()
+    for other in later:
+        span = find_block(markdown, other)
+        if span is not None:
+            return f"{markdown[:span[0]]}## {name}\n\n{markdown[span[0]:]}"
+    return f"{markdown.rstrip()}\n\n## {name}\n"
+
+
+def covering_week(markdown, number):
+    """Return the "Week N" label of the heading that covers week number (e.g. "Weeks 3-4" for 4), or None"""
+    for week in parse_syllabus(markdown).weeks:
+        if week.number <= number <= week.end:
+            return f"Week {week.number}"
+    return None
+
+
+def insert_weeks(markdown, numbers):
+    """Add empty week headings after the last week, or under the Weekly Breakdown heading"""
+    stubs = "\n\n---\n\n".join(WEEK_STUB.format(number=number) for number in numbers)
+    previous = covering_week(markdown, numbers[0] - 1) if numbers[0] > 1 else None
+    if previous:
+        end = find_block(markdown, previous)[1]
+        return f"{markdown[:end]}\n\n---\n\n{stubs}{markdown[end:]}"
+    if find_block(markdown, "Weekly Breakdown") is None:
+        markdown = insert_section(markdown, "Weekly Breakdown")
+    end = find_block(markdown, "Weekly Breakdown")[1]
+    return f"{markdown[:end]}\n\n{stubs}{markdown[end:]}"
+
+
+def fix_locally(markdown, duration):
+    """
+    Apply the fixes that need no model call
+
+    Returns:
+        tuple: (markdown: str, fixes: list of str)
+
+    Range headings are left alone, and a missing Weekly Breakdown heading goes above them:
+
+    >>> text = "## Weekly Breakdown\\n### Week 1-2: A\\n### Week 3-4: B\\n### Week 5-6: C\\n### Week 7-8: D\\n"
+    >>> fix_locally(text, "8 Weeks") == (text, [])
+    True
+    >>> fixed, fixes = fix_locally("## Course Overview\\nx\\n\\n### Weeks 1-2: A\\n- a\\n\\n### Weeks 3-4: B\\n- b\\n", 4)
+    >>> print(fixed)
+    ## Course Overview
+    x
+    <BLANKLINE>
+    ## Weekly Breakdown
+    <BLANKLINE>
+    ### Weeks 1-2: A
+    - a
+    <BLANKLINE>
+    ### Weeks 3-4: B
+    - b
+    <BLANKLINE>
+    >>> fixes
+    ['Weekly Breakdown heading']
+    """
+    syllabus = parse_syllabus(markdown)
+    issues = find_issues(syllabus, duration)
+    kinds = {issue.kind for issue in issues}
+    fixes = []
+    if any(week.last for week in syllabus.weeks):
+        # Weeks are grouped ("Weeks 1-2"); renumbering or counting them one by one would corrupt them
+        kinds -= {"week_order", "week_count"}
+    if "week_order" in kinds:
+        markdown = renumber_weeks(markdown)
+        fixes.append("week numbers")
+    expected = parse_duration_weeks(duration)
+    if "week_count" in kinds:
+        for number in range(len(syllabus.weeks), expected, -1):
+            markdown = remove_block(markdown, f"Week {number}")
+            fixes.append(f"removed Week {number}")
+    if "missing_section" in kinds and syllabus.weeks and find_block(markdown, "Weekly Breakdown") is None:
+        span = find_block(markdown, f"Week {parse_syllabus(markdown).weeks[0].number}")
+        if span is None:
+            markdown = insert_section(markdown, "Weekly Breakdown")
+        else:
+            markdown = f"{markdown[:span[0]]}## Weekly Breakdown\n\n{markdown[span[0]:]}"
+        fixes.append("Weekly Breakdown heading")
+    return markdown, fixes
+
+
+def broken_parts(markdown, duration):
+    """
+    List the weeks and sections that need generating
+
+    Returns:
+        list: (label, instructions) pairs; labels not yet in markdown are missing parts
+    """
+    syllabus = parse_syllabus(markdown)
+    expected = parse_duration_weeks(duration)
+    has_ranges = any(week.last for week in syllabus.weeks)
+    parts = []
+    for issue in find_issues(syllabus, duration):
+        if issue.kind == "missing_section" and issue.part != "Weekly Breakdown":
+            parts.append((issue.part, REPAIR_NOTES["missing_section"]))
+        elif issue.kind == "week_count" and not has_ranges:
+            parts.extend((f"Week {number}", REPAIR_NOTES["missing_week"])
+                         for number in range(len(syllabus.weeks) + 1, expected + 1))
+        elif issue.kind == "empty_week":
+            parts.append((issue.part, REPAIR_NOTES["empty_week"]))
+        elif issue.kind == "assessment_total":
+            parts.append((issue.part, REPAIR_NOTES["assessment_total"].format(message=issue.message)))
+    return parts
+
+
+def add_stubs(markdown, parts):
+    """Insert empty headings for the parts that are missing, so they can be regenerated in place"""
+    missing_weeks = []
+    for label, _ in parts:
+        if find_block(markdown, label) is not None:
+            continue
+        if label.startswith("Week "):
+            number = int(label.split()[1])
+            # A week inside a range heading ("Weeks 3-4") is not missing
+            if covering_week(markdown, number) is None:
+                missing_weeks.append(number)
+        else:
+            markdown = insert_section(markdown, label)
+    if missing_weeks:
+        markdown = insert_weeks(markdown, missing_weeks)
+    return markdown
+
+
+def repair_syllabus(complete, system_prompt, subject, duration, markdown, max_parts=DEFAULT_MAX_PARTS):
+    """
+    Fix the problems find_issues reports, regenerating only the broken parts
+
+    Args:
+        complete (callable): complete(messages, max_tokens) -> (success, content, error_message)
+        system_prompt (str): System message for the calls
+        subject (str): The subject for the syllabus
+        duration (str): The duration of the course
+        markdown (str): The generated syllabus
+        max_parts (int): Leave the parts alone when more than this many need generating
+
+    Returns:
+        tuple: (content: str, repaired: list of str, remaining: list of Issue) where repaired
+            names what was fixed and remaining lists the problems still present
+    """
+    repaired, fixes = fix_locally(markdown, duration)
+    parts = broken_parts(repaired, duration)
+    if parts and len(parts) <= max_parts:
+        missing = {label for label, _ in parts if find_block(repaired, label) is None}
+        repaired = add_stubs(repaired, parts)
+        parts = [(label, instructions) for label, instructions in parts if find_block(repaired, label) is not None]
+        # Every part is written against the same context; the answers are spliced in afterwards
+        requests = [build_block_messages(system_prompt, subject, duration, repaired, label, instructions,
+                                         REPAIR_TEMPLATE)
+                    for label, instructions in parts]
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            results = list(executor.map(lambda request: complete(*request), requests))
+        for (label, _), (success, response, _) in zip(parts, results):
+            start, end = find_block(repaired, label)
+            block = extract_block(response, label, repaired[start:end].splitlines()[0].strip()) if success else ""
+            if block:
+                repaired = splice(repaired, label, block)
+                fixes.append(label)
+            elif label in missing:
+                repaired = remove_block(repaired, label)
+    return repaired, fixes, find_issues(parse_syllabus(repaired), duration)
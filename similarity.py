@@ -0,0 +1,268 @@
+# similarity.py
+"""
+Near-duplicate lookup for free-text course subjects.
+
+Subjects that were generated before are indexed as character n-gram
+TF-IDF vectors (NumPy, imported on first lookup; no network). A new request whose subject is a
+paraphrase of an indexed one ("Intro to ML" vs "Machine Learning") above
+the confidence threshold is served from that subject's cached syllabus.
+Level and sequence markers (I/II, 1/2, 101/201) must match exactly:
+"Organic Chemistry II" is a different course from "Organic Chemistry I",
+however close the names are. The index is persisted next to the result
+cache.
+"""
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+
+from cache import DEFAULT_CACHE_PATH
+
+DEFAULT_THRESHOLD = float(os.getenv("SYLLABUS_SIMILARITY_THRESHOLD", "0.85"))
+NGRAM_SIZE = 3
+
+ABBREVIATIONS = {
+    "ai": "artificial intelligence",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "dsa": "data structures algorithms",
+    "dbms": "database management systems",
+    "db": "database",
+    "os": "operating systems",
+    "oop": "object oriented programming",
+    "se": "software engineering",
+    "cs": "computer science",
+    "js": "javascript",
+    "stats": "statistics",
+    "chem": "chemistry",
+    "math": "mathematics",
+    "maths": "mathematics",
+}
+# Wording that does not change what the course is about
+FILLER_RE = re.compile(
+    r"\b(?:intro|introduction|introductory|basics?|fundamentals?|foundations?|principles|essentials|"
+    r"overview|beginners?|course|class|to|of|for|and|in|an|a|the|101)\b"
+)
+
+# Roman numerals that mark a course in a sequence ("Calculus II"); compared as numbers
+ROMAN_LEVELS = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8, "ix": 9, "x": 10}
+
+Match = namedtuple("Match", ["subject", "duration", "key", "score"])
+
+
+def normalize_subject(subject):
+    """Lower-case, expand common abbreviations and drop filler words"""
+    words = re.sub(r"[^a-z0-9+#]+", " ", str(subject).lower()).split()
+    text = " ".join(ABBREVIATIONS.get(word, word) for word in words)
+    return " ".join(FILLER_RE.sub(" ", text).split())
+
+
+def level_tokens(subject):
+    """
+    Return the level and sequence markers of subject (I/II/III, 1/2, 101/201, other numbers)
+
+    >>> sorted(level_tokens("Calculus II")), sorted(level_tokens("Calculus 2")), sorted(level_tokens("CHEM 101"))
+    ([2], [2], [101])
+    >>> level_tokens("Organic Chemistry I") == level_tokens("Organic Chemistry II")
+    False
+    """
+    words = re.sub(r"[^a-z0-9+#]+", " ", str(subject).lower()).split()
+    return frozenset(int(word) if word.isdigit() else ROMAN_LEVELS[word]
+                     for word in words if word.isdigit() or word in ROMAN_LEVELS)
+
+
+def char_ngrams(text, n=NGRAM_SIZE):
+    """Return the padded character n-grams of every word in text"""
+    grams = []
+    for word in text.split():
+        word = f" {word} "
+        grams.extend(word[i:i + n] for i in range(max(1, len(word) - n + 1)))
+    return grams
+
+
+class SubjectIndex:
+    """Cosine search over TF-IDF vectors of previously generated subjects"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, threshold=DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._matrix = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS subjects (
+                    key TEXT PRIMARY KEY,
+                    subject TEXT NOT NULL,
+                    duration TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            for key, subject, duration in conn.execute("SELECT key, subject, duration FROM subjects"):
+                self._entries[key] = (subject, duration)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, subject, duration, key):
+        """Index subject/duration as the syllabus stored under cache key"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO subjects (key, subject, duration, created_at) VALUES (?, ?, ?, ?)",
+                (key, subject, duration, time.time()),
+            )
+        with self._lock:
+            self._entries[key] = (subject, duration)
+            self._matrix = None
+
+    def remove(self, key):
+        """Drop an entry, e.g. once its cached syllabus has expired"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM subjects WHERE key = ?", (key,))
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._matrix = None
+
+    def _build(self):
+        # Rebuilt lazily after the entry set changes; cheap for the few thousand subjects we keep
+        import numpy as np
+
+        keys = list(self._entries)
+        docs = [Counter(char_ngrams(normalize_subject(self._entries[key][0]))) for key in keys]
+        document_frequency = Counter(gram for doc in docs for gram in doc)
+        vocabulary = {gram: i for i, gram in enumerate(document_frequency)}
+        idf = np.array([math.log((1 + len(docs)) / (1 + document_frequency[gram])) + 1
+                        for gram in vocabulary])
+        matrix = np.zeros((len(docs), len(vocabulary)))
+        for row, doc in enumerate(docs):
+            for gram, count in doc.items():
+                matrix[row, vocabulary[gram]] = count * idf[vocabulary[gram]]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+        durations = np.array([self._entries[key][1] for key in keys], dtype=object)
+        levels = [level_tokens(self._entries[key][0]) for key in keys]
+        self._matrix = (keys, vocabulary, idf, matrix, durations, levels)
+        return self._matrix
+
+    def nearest(self, subject, duration, match_level=True):
+        """
+        Find the most similar indexed subject with the same duration
+
+        Args:
+            subject (str): Requested course subject
+            duration (str): Requested course duration; only equal durations can match
+            match_level (bool): Only match subjects with the same level_tokens, so a sequel
+                course never matches its predecessor
+
+        Returns:
+            Match | None: Nearest entry and its cosine similarity (0..1), or None if nothing is indexed
+
+        >>> import tempfile
+        >>> index = SubjectIndex(os.path.join(tempfile.mkdtemp(), "cache.db"))
+        >>> index.add("Organic Chemistry I", "12 Weeks", "orgo-1")
+        >>> index.add("Spanish 1", "12 Weeks", "spanish-1")
+        >>> print(index.nearest("Organic Chemistry II", "12 Weeks"))
+        None
+        >>> print(index.nearest("Spanish 2", "12 Weeks"))
+        None
+        >>> index.nearest("Introduction to Organic Chemistry I", "12 Weeks").key
+        'orgo-1'
+        >>> index.nearest("Organic Chemistry II", "12 Weeks", match_level=False).key
+        'orgo-1'
+        """
+        with self._lock:
+            if not self._entries:
+                return None
+            keys, vocabulary, idf, matrix, durations, levels = self._matrix or self._build()
+        import numpy as np
+
+        query = np.zeros(len(vocabulary))
+        # n-grams the index has never seen still count towards the query norm
+        unseen_weight = math.log(1 + len(keys)) + 1
+        unseen = 0.0
+        for gram, count in Counter(char_ngrams(normalize_subject(subject))).items():
+            if gram in vocabulary:
+                query[vocabulary[gram]] = count * idf[vocabulary[gram]]
+            else:
+                unseen += (count * unseen_weight) ** 2
+        norm = math.sqrt(float(query @ query) + unseen)
+        if norm == 0:
+            return None
+        eligible = durations == duration
+        if match_level:
+            wanted = level_tokens(subject)
+            eligible &= np.array([level == wanted for level in levels], dtype=bool)
+        scores = np.where(eligible, matrix @ query / norm, -1.0)
+        best = int(scores.argmax())
+        if scores[best] < 0:
+            return None
+        matched_subject, matched_duration = self._entries.get(keys[best], ("", duration))
+        return Match(matched_subject, matched_duration, keys[best], min(1.0, float(scores[best])))
+
+    def lookup(self, subject, duration, read, threshold=None, match_level=True):
+        """
+        Serve a paraphrased subject from the nearest cached syllabus
+
+        Args:
+            subject (str): Requested course subject
+            duration (str): Requested course duration
+            read (callable): read(match) -> the cached syllabus for match, or None when it expired
+                or is outdated (the entry is then dropped), e.g. lambda match: cache.get(match.key)
+            threshold (float): Minimum similarity; defaults to the index threshold
+            match_level (bool): See nearest
+
+        Returns:
+            tuple: (content: str | None, match: Match | None); content is None below the threshold
+
+        Sequels stay apart at the lower threshold used to shed load (SYLLABUS_SHED_SIMILARITY_THRESHOLD):
+
+        >>> import tempfile
+        >>> index = SubjectIndex(os.path.join(tempfile.mkdtemp(), "cache.db"))
+        >>> for key, subject in (("calc-1", "Calculus I"), ("spanish-1", "Spanish 1")):
+        ...     index.add(subject, "12 Weeks", key)
+        >>> index.lookup("Calculus II", "12 Weeks", lambda match: "cached", threshold=0.8)
+        (None, None)
+        >>> index.lookup("Spanish 2", "12 Weeks", lambda match: "cached", threshold=0.8)
+        (None, None)
+        >>> index.lookup("Intro to Calculus I", "12 Weeks", lambda match: "cached", threshold=0.8)[0]
+        'cached'
+        """
+        match = self.nearest(subject, duration, match_level)
+        if match is None or match.score < (self.threshold if threshold is None else threshold):
+            return None, match
+        content = read(match)
+        if content is None:
+            self.remove(match.key)
+            return None, match
+        return content, match
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_subject_index():
+    """Return the process-wide subject index stored alongside the result cache"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = SubjectIndex()
+        return _default_index
@@ -0,0 +1,76 @@
+# startup_report.py
+"""
+Cold-start import timing for the Streamlit entry point.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and
+prints the slowest top-level imports, the project modules' own cost and
+the total against a budget.
+
+Usage:
+    python startup_report.py --budget-ms 800 --top 15
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = float(os.getenv("SYLLABUS_STARTUP_BUDGET_MS", "1000"))
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(module="app"):
+    """
+    Import module in a fresh interpreter with -X importtime
+
+    Returns:
+        tuple: (wall_ms: float, entries: list of (name, self_us, cumulative_us, depth))
+    """
+    code = ("import time; started = time.perf_counter(); "
+            f"import {module}; print((time.perf_counter() - started) * 1000)")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return float(result.stdout.strip().splitlines()[-1]), entries
+
+
+def project_modules():
+    return {name[:-3] for name in os.listdir(PROJECT_DIR) if name.endswith(".py")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report cold-start import time of the app")
+    parser.add_argument("--module", default="app", help="Module to import (default: app)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Fail above this import time")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    args = parser.parse_args(argv)
+
+    wall_ms, entries = measure(args.module)
+    # importtime prints the imported module at depth 0 and its own imports at depth 1
+    direct = [entry for entry in entries if entry[3] <= 1]
+    print(f"Slowest imports under '{args.module}' (cumulative ms):")
+    for name, _, cumulative_us, depth in sorted(direct, key=lambda entry: -entry[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f}  {'  ' * depth}{name}")
+
+    ours = project_modules()
+    print("\nProject modules (self ms):")
+    for name, self_us, _, _ in sorted((e for e in entries if e[0] in ours), key=lambda entry: -entry[1]):
+        print(f"  {self_us / 1000:9.1f}  {name}")
+
+    status = "OK" if wall_ms <= args.budget_ms else "OVER BUDGET"
+    print(f"\nImport of '{args.module}': {wall_ms:.1f} ms (budget {args.budget_ms:.0f} ms) - {status}")
+    return 0 if wall_ms <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+# styles.py
+"""
+Single precompiled stylesheet for every UI component.
+
+All component CSS is defined here once, minified and hashed on first use,
+and emitted as one <style> block per script run. Components are keyed
+st.container()s, which Streamlit renders with an `st-key-<key>` class, so
+they are styled by class instead of shipping their own CSS payload.
+"""
+import hashlib
+import re
+from functools import lru_cache
+
+import streamlit as st
+
+FONT_IMPORT = "@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');"
+
+GLOBAL_CSS = """
+.stApp {
+    background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+    font-family: 'Inter', sans-serif;
+}
+
+h1, h2, h3 {
+    color: #2c3e50;
+    font-weight: 600;
+}
+
+.stSelectbox select,
+.stTextInput input {
+    border-radius: 15px;
+    padding: 12px 15px;
+    border: 2px solid #e1e8ed;
+    background: white;
+    transition: all 0.3s ease;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+}
+
+.stButton > button {
+    background: linear-gradient(45deg, #4CAF50, #45a049);
+    color: white;
+    border: none;
+    border-radius: 25px;
+    padding: 12px 30px;
+    font-size: 16px;
+    font-weight: 600;
+    box-shadow: 0 4px 15px rgba(76, 175, 80, 0.3);
+}
+
+.stDownloadButton > button {
+    background: linear-gradient(45deg, #2196F3, #1976D2);
+    color: white;
+    border: none;
+    border-radius: 20px;
+    padding: 10px 25px;
+    font-weight: 500;
+}
+
+.stButton > button:hover,
+.stDownloadButton > button:hover {
+    transform: translateY(-2px);
+}
+"""
+
+# Keyed containers: st.container(key=name) is rendered with the class st-key-<name>
+COMPONENT_CSS = {
+    "input-container": """
+        background: white;
+        border-radius: 20px;
+        padding: 25px;
+        box-shadow: 0 5px 20px rgba(0, 0, 0, 0.1);
+        margin-bottom: 2rem;
+    """,
+    "syllabus-container": """
+        background: white;
+        border-radius: 15px;
+        padding: 30px;
+        box-shadow: 0 5px 20px rgba(0, 0, 0, 0.1);
+        margin: 2rem 0;
+        border-left: 4px solid #4CAF50;
+    """,
+    "success-card": """
+        background: linear-gradient(135deg, #d4edda 0%, #c3e6cb 100%);
+        border-radius: 15px;
+        padding: 20px;
+        margin: 1rem 0;
+        border-left: 5px solid #28a745;
+    """,
+    "error-card": """
+        background: linear-gradient(135deg, #f8d7da 0%, #f5c6cb 100%);
+        border-radius: 15px;
+        padding: 20px;
+        margin: 1rem 0;
+        border-left: 5px solid #dc3545;
+    """,
+    "warning-card": """
+        background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%);
+        border-radius: 15px;
+        padding: 20px;
+        margin: 1rem 0;
+        border-left: 5px solid #ffc107;
+    """,
+    "info-card": """
+        background: white;
+        border-radius: 20px;
+        padding: 25px;
+        box-shadow: 0 5px 20px rgba(0, 0, 0, 0.1);
+    """,
+    "feature-1": """
+        background: linear-gradient(135deg, #ff9a9e 0%, #fecfef 100%);
+        border-radius: 15px;
+        padding: 20px;
+        text-align: center;
+        box-shadow: 0 4px 15px rgba(255, 154, 158, 0.3);
+    """,
+    "feature-2": """
+        background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%);
+        border-radius: 15px;
+        padding: 20px;
+        text-align: center;
+        box-shadow: 0 4px 15px rgba(168, 237, 234, 0.3);
+    """,
+    "feature-3": """
+        background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%);
+        border-radius: 15px;
+        padding: 20px;
+        text-align: center;
+        box-shadow: 0 4px 15px rgba(255, 236, 210, 0.3);
+    """,
+}
+
+# Classes used inside the HTML snippets that ui_enhancer renders
+CONTENT_CSS = """
+.sg-title { text-align: center; padding: 2rem 0; }
+.sg-title h1 {
+    font-size: 3rem;
+    background: linear-gradient(45deg, #2c3e50, #4CAF50);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+}
+.sg-title p { color: #7f8c8d; font-size: 1.2rem; }
+.sg-status { display: flex; align-items: center; }
+.sg-status .sg-icon { font-size: 2rem; margin-right: 1rem; }
+.sg-status h4 { margin: 0; }
+.sg-status p { margin: 0.5rem 0 0 0; }
+.sg-success { color: #155724; }
+.sg-error { color: #721c24; }
+.sg-warning { color: #856404; }
+.sg-feature h3 { margin: 0; }
+.sg-feature p { margin: 0.5rem 0 0 0; font-size: 0.9rem; }
+.sg-light, .sg-light h3 { color: white; }
+.sg-dark, .sg-dark h3 { color: #2c3e50; }
+.sg-welcome h3 { color: #4CAF50; }
+.sg-welcome p { color: #333; }
+.sg-loading { text-align: center; padding: 2rem; }
+.sg-spinner {
+    display: inline-block;
+    width: 40px;
+    height: 40px;
+    border: 4px solid #f3f3f3;
+    border-top: 4px solid #4CAF50;
+    border-radius: 50%;
+    animation: sg-spin 1s linear infinite;
+}
+.sg-loading p { margin-top: 1rem; color: #4CAF50; font-weight: 600; }
+@keyframes sg-spin {
+    0% { transform: rotate(0deg); }
+    100% { transform: rotate(360deg); }
+}
+.sg-footer { text-align: center; padding: 1rem; font-size: 0.9rem; color: #888; }
+.sg-footer b { color: #4CAF50; }
+"""
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace from CSS"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+@lru_cache(maxsize=1)
+def build_stylesheet():
+    """
+    Compile the global, component and content CSS into one minified stylesheet
+
+    Returns:
+        tuple: (css: str, digest: str) where digest is a short content hash
+    """
+    components = "".join(f".st-key-{name} {{{css}}}" for name, css in COMPONENT_CSS.items())
+    css = FONT_IMPORT + minify_css(GLOBAL_CSS + components + CONTENT_CSS)
+    return css, hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+
+
+@lru_cache(maxsize=1)
+def style_tag():
+    css, digest = build_stylesheet()
+    return f'<style id="sg-{digest}">{css}</style>'
+
+
+def inject_styles():
+    """Emit the compiled stylesheet for this script run"""
+    # Streamlit removes elements a rerun doesn't re-emit, so the (small, prebuilt) tag is sent once per run
+    st.markdown(style_tag(), unsafe_allow_html=True)
+
+
+def styled_container(name):
+    """Return a container styled by the stylesheet's .st-key-<name> rule"""
+    return st.container(key=name)
@@ -1,35 +1,77 @@
-import google.generativeai as genai
-import os
 from dotenv import load_dotenv
+from cache import get_cache, make_cache_key
+from prompts import PLAN_TEMPLATE
+from providers import get_router
+from token_budget import complete_with_continuation, max_tokens_for, stream_with_continuation
 
-load_dotenv()  # To load your Gemini API key from .env file
+load_dotenv()  # To load your Gemini (and other provider) API keys from .env file
 
-# Configure Gemini
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+ERROR_PREFIX = "❌ Error generating syllabus"
+TEMPERATURE = 0.7
+# This prompt asks for a topic, objectives and one assignment per week, so weeks are shorter than the app's
+WEEK_TOKENS = 110
+SECTION_TOKENS = 200
 
-# Initialize Gemini Pro model
-model = genai.GenerativeModel('gemini-pro')
+def build_messages(course_name, duration, level, custom_goals=None):
+    return PLAN_TEMPLATE.messages(title=course_name, duration=f"{duration} weeks", level=level, goals=custom_goals)
 
-def generate_syllabus(course_name, duration, level, custom_goals=None):
-    prompt = f"""
-You are an expert education planner.
+def _primary_model():
+    primary = get_router().primary
+    return primary.key if primary is not None else ""
 
-Generate a weekly course syllabus for the following:
-- Title: {course_name}
-- Duration: {duration} weeks
-- Student Level: {level}
-{f"- Include these topics or goals: {custom_goals}" if custom_goals else ""}
+def _cache_key(messages):
+    return make_cache_key(messages, model=_primary_model(), template=PLAN_TEMPLATE.tag)
 
-Include:
-1. Weekly topic breakdown (Week 1 to Week {duration})
-2. Learning objectives per week
-3. One assignment idea per week
+def _max_tokens(messages, duration):
+    return max_tokens_for(messages, int(duration), week_tokens=WEEK_TOKENS, section_tokens=SECTION_TOKENS)
 
-Return the output in clear markdown format.
-    """
+def generate_syllabus(course_name, duration, level, custom_goals=None, use_cache=True):
+    messages = build_messages(course_name, duration, level, custom_goals)
+    cache_key = _cache_key(messages)
+    if use_cache:
+        cached = get_cache().get(cache_key)
+        if cached is not None:
+            return cached
 
+    # Gemini is preferred, but the router moves to a faster or healthier provider when one is configured
+    info = {}
+    success, content, error_message = complete_with_continuation(
+        lambda request, limit, info: get_router().complete(request, limit, TEMPERATURE, info),
+        messages, _max_tokens(messages, duration), tag=f"{duration} weeks", info=info
+    )
+    if not success:
+        return f"{ERROR_PREFIX}: {error_message}"
+    # The key names the primary model; output from another provider is returned but not cached
+    if use_cache and info.get("providers") == [_primary_model()]:
+        get_cache().set(cache_key, content)
+    return content
+
+def stream_syllabus(course_name, duration, level, custom_goals=None, use_cache=True):
+    """Yield the syllabus text in chunks as the provider generates it"""
+    messages = build_messages(course_name, duration, level, custom_goals)
+    cache_key = _cache_key(messages)
+    if use_cache:
+        cached = get_cache().get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    info = {}
+    success, chunks, error_message = stream_with_continuation(
+        lambda request, limit, info: get_router().stream(request, limit, TEMPERATURE, info),
+        messages, _max_tokens(messages, duration), tag=f"{duration} weeks", info=info
+    )
+    if not success:
+        yield f"{ERROR_PREFIX}: {error_message}"
+        return
+
+    parts = []
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
     except Exception as e:
-        return f"❌ Error generating syllabus: {str(e)}"
+        yield f"{ERROR_PREFIX}: {str(e)}"
+        return
+    if use_cache and parts and info.get("providers") == [_primary_model()]:
+        get_cache().set(cache_key, "".join(parts))
@@ -0,0 +1,331 @@
+# syllabus_model.py
+"""
+Typed syllabus representation and a single-pass markdown parser.
+
+The parser follows the template the app asks the model for
+(`# Title`, `## Course Overview`, `### Week N: ...`, `## Assessment Methods`, ...)
+and can be fed the text incrementally while it streams in.
+"""
+import re
+from dataclasses import asdict, dataclass, field
+
+# A week heading; groups are (number, last, title), last set only for a heading that covers
+# several weeks, e.g. "### Weeks 3-4: Sorting"
+WEEK_HEADING_RE = re.compile(r"^#{2,4}\s*Weeks?\s+(\d+)(?:\s*(?:[-–—]|to)\s*(\d+)\b)?\s*[:\-–—]?\s*(.*?)\s*$",
+                             re.IGNORECASE)
+BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)$")
+LABEL_RE = re.compile(r"^\*\*(.+?):?\*\*:?\s*(.*)$")
+PERCENT_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*%\s*(?:[-–—:]\s*)?(.*)$")
+
+SECTION_ALIASES = {
+    "course overview": "overview",
+    "course objectives": "objectives",
+    "learning outcomes": "outcomes",
+    "weekly breakdown": "weeks",
+    "assessment methods": "assessment_methods",
+    "required materials": "required_materials",
+    "recommended resources": "recommended_resources",
+    "course policies": "policies",
+}
+
+REQUIRED_SECTIONS = ("Course Overview", "Weekly Breakdown", "Assessment Methods")
+
+WEEK_FIELDS = {
+    "learning objectives": "learning_objectives",
+    "topics covered": "topics",
+    "topics": "topics",
+    "activities": "activities",
+    "assessment": "assessment",
+}
+
+
+def parse_duration_weeks(duration):
+    """Return the number of weeks in values like '12 Weeks' or 12"""
+    match = re.search(r"\d+", str(duration))
+    if not match:
+        raise ValueError(f"Invalid duration: {duration!r}")
+    return int(match.group())
+
+
+@dataclass(slots=True)
+class Issue:
+    """One problem found by find_issues; part names the week or section to fix, if any"""
+    kind: str
+    message: str
+    part: str = ""
+
+
+@dataclass(slots=True)
+class AssessmentItem:
+    name: str
+    percentage: float
+    description: str = ""
+
+
+@dataclass(slots=True)
+class Week:
+    number: int
+    title: str
+    learning_objectives: list = field(default_factory=list)
+    topics: list = field(default_factory=list)
+    activities: list = field(default_factory=list)
+    assessment: str = ""
+    # Last week of a heading that covers a range of weeks; 0 for a single week
+    last: int = 0
+
+    @property
+    def end(self):
+        return max(self.number, self.last)
+
+    def to_markdown(self):
+        """Render this week in the app's template format"""
+        numbers = f"{self.number}-{self.last}" if self.last > self.number else str(self.number)
+        lines = [f"### Week {numbers}: {self.title}"]
+        for label, items in (("Learning Objectives", self.learning_objectives),
+                             ("Topics Covered", self.topics),
+                             ("Activities", self.activities)):
+            if items:
+                lines.append(f"**{label}:**")
+                lines.extend(f"- {item}" for item in items)
+                lines.append("")
+        if self.assessment:
+            lines.append(f"**Assessment:** {self.assessment}")
+        return "\n".join(lines).rstrip()
+
+
+@dataclass(slots=True)
+class Syllabus:
+    title: str = ""
+    overview: str = ""
+    objectives: list = field(default_factory=list)
+    outcomes: list = field(default_factory=list)
+    weeks: list = field(default_factory=list)
+    assessment_methods: list = field(default_factory=list)
+    required_materials: list = field(default_factory=list)
+    recommended_resources: list = field(default_factory=list)
+    policies: dict = field(default_factory=dict)
+    extra_sections: dict = field(default_factory=dict)
+    sections_seen: list = field(default_factory=list)
+
+    @property
+    def assessment_total(self):
+        return sum(item.percentage for item in self.assessment_methods)
+
+    def to_dict(self):
+        """Return a JSON-serializable dict"""
+        data = asdict(self)
+        data.pop("sections_seen")
+        return data
+
+    def to_markdown(self):
+        """Render the syllabus back into the app's template format"""
+        out = []
+        if self.title:
+            out.append(f"# {self.title}\n")
+        if self.overview:
+            out.append(f"## Course Overview\n{self.overview}\n")
+        if self.objectives:
+            out.append("## Course Objectives\n" + "\n".join(f"- {item}" for item in self.objectives) + "\n")
+        if self.outcomes:
+            out.append("## Learning Outcomes\nBy the end of this course, students will be able to:\n"
+                       + "\n".join(f"- {item}" for item in self.outcomes) + "\n")
+        if self.weeks:
+            out.append("## Weekly Breakdown\n\n" + "\n\n---\n\n".join(week.to_markdown() for week in self.weeks)
+                       + "\n\n---\n")
+        if self.assessment_methods:
+            out.append("## Assessment Methods\n" + "\n".join(
+                f"- **{item.name}:** {item.percentage:g}% - {item.description}".rstrip(" -")
+                for item in self.assessment_methods) + "\n")
+        if self.required_materials:
+            out.append("## Required Materials\n" + "\n".join(f"- {item}" for item in self.required_materials) + "\n")
+        if self.recommended_resources:
+            out.append("## Recommended Resources\n"
+                       + "\n".join(f"- {item}" for item in self.recommended_resources) + "\n")
+        if self.policies:
+            out.append("## Course Policies\n"
+                       + "\n".join(f"- **{name}:** {text}" for name, text in self.policies.items()) + "\n")
+        for name, text in self.extra_sections.items():
+            out.append(f"## {name}\n{text}\n")
+        return "\n".join(out).rstrip() + "\n"
+
+
+class SyllabusParser:
+    """Incremental one-pass parser; feed() text chunks, then close() for the Syllabus"""
+
+    def __init__(self):
+        self.syllabus = Syllabus()
+        self._buffer = ""
+        self._section = None
+        self._extra_name = None
+        self._week = None
+        self._week_field = None
+
+    def feed(self, chunk):
+        """Consume a chunk of markdown, parsing every complete line"""
+        self._buffer += chunk
+        if "\n" not in self._buffer:
+            return
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self._parse_line(line.rstrip())
+
+    def close(self):
+        """Parse any trailing partial line and return the Syllabus"""
+        if self._buffer:
+            self._parse_line(self._buffer.rstrip())
+            self._buffer = ""
+        syllabus = self.syllabus
+        syllabus.overview = syllabus.overview.strip()
+        for name, text in syllabus.extra_sections.items():
+            syllabus.extra_sections[name] = text.strip()
+        return syllabus
+
+    def _parse_line(self, line):
+        stripped = line.strip()
+        if not stripped or stripped == "---":
+            return
+        if stripped[0] == "#":
+            if self._parse_heading(stripped):
+                return
+        if self._week is not None:
+            self._parse_week_line(stripped)
+            return
+        self._parse_section_line(stripped)
+
+    def _parse_heading(self, stripped):
+        match = WEEK_HEADING_RE.match(stripped)
+        if match:
+            self._week = Week(number=int(match.group(1)), title=match.group(3).strip("* "),
+                              last=int(match.group(2) or 0))
+            self._week_field = None
+            self.syllabus.weeks.append(self._week)
+            return True
+        level = len(stripped) - len(stripped.lstrip("#"))
+        text = stripped[level:].strip()
+        if level == 1 and not self.syllabus.title:
+            self.syllabus.title = text
+            return True
+        if level == 2:
+            self._week = None
+            self._section = SECTION_ALIASES.get(text.lower(), "extra")
+            self.syllabus.sections_seen.append(text)
+            if self._section == "extra":
+                self._extra_name = text
+                self.syllabus.extra_sections[text] = ""
+            return True
+        return False
+
+    def _parse_week_line(self, stripped):
+        week = self._week
+        label = LABEL_RE.match(stripped)
+        if label:
+            name = WEEK_FIELDS.get(label.group(1).strip().lower())
+            if name:
+                self._week_field = name
+                if name == "assessment":
+                    week.assessment = label.group(2).strip()
+                return
+        bullet = BULLET_RE.match(stripped)
+        if bullet and self._week_field and self._week_field != "assessment":
+            getattr(week, self._week_field).append(bullet.group(1).strip())
+        elif self._week_field == "assessment":
+            week.assessment = f"{week.assessment} {stripped}".strip()
+
+    def _parse_section_line(self, stripped):
+        section = self._section
+        syllabus = self.syllabus
+        if section == "overview":
+            syllabus.overview += stripped + "\n"
+        elif section == "extra":
+            syllabus.extra_sections[self._extra_name] += stripped + "\n"
+        elif section in ("objectives", "outcomes", "required_materials", "recommended_resources"):
+            bullet = BULLET_RE.match(stripped)
+            if bullet:
+                getattr(syllabus, section).append(bullet.group(1).strip())
+        elif section == "assessment_methods":
+            bullet = BULLET_RE.match(stripped)
+            label = LABEL_RE.match(bullet.group(1)) if bullet else None
+            if label:
+                percent = PERCENT_RE.match(label.group(2).strip())
+                if percent:
+                    syllabus.assessment_methods.append(
+                        AssessmentItem(label.group(1).strip(), float(percent.group(1)), percent.group(2).strip())
+                    )
+        elif section == "policies":
+            bullet = BULLET_RE.match(stripped)
+            label = LABEL_RE.match(bullet.group(1)) if bullet else None
+            if label:
+                syllabus.policies[label.group(1).strip()] = label.group(2).strip()
+
+
+def parse_syllabus(markdown):
+    """
+    Parse syllabus markdown into a Syllabus
+
+    Args:
+        markdown (str | iterable of str): Full text, or text chunks as they stream in
+
+    Returns:
+        Syllabus: The structured syllabus
+    """
+    parser = SyllabusParser()
+    if isinstance(markdown, str):
+        parser.feed(markdown)
+    else:
+        for chunk in markdown:
+            parser.feed(chunk)
+    return parser.close()
+
+
+def find_issues(syllabus, duration=None):
+    """
+    Check a parsed syllabus against the template
+
+    Args:
+        syllabus (Syllabus): Parsed syllabus
+        duration (str | int): Selected course duration, e.g. "8 Weeks"
+
+    Returns:
+        list: Issue per problem (kind is missing_section, week_count, week_order, empty_week
+            or assessment_total); empty when the syllabus is valid
+    """
+    issues = []
+    seen = {name.lower() for name in syllabus.sections_seen}
+    for name in REQUIRED_SECTIONS:
+        if name.lower() not in seen:
+            issues.append(Issue("missing_section", f"Missing section: {name}", name))
+
+    # Range headings ("Weeks 3-4") count for every week they cover
+    covered = sum(week.end - week.number + 1 for week in syllabus.weeks)
+    if duration is not None:
+        expected = parse_duration_weeks(duration)
+        if covered != expected:
+            issues.append(Issue("week_count", f"Expected {expected} weeks but found {covered}"))
+    starts = [week.number for week in syllabus.weeks]
+    expected_starts = [1 + sum(week.end - week.number + 1 for week in syllabus.weeks[:index])
+                       for index in range(len(starts))]
+    if starts != expected_starts:
+        issues.append(Issue("week_order", f"Weeks are not numbered 1..{covered} in order"))
+    for week in syllabus.weeks:
+        if not week.topics and not week.learning_objectives:
+            issues.append(Issue("empty_week", f"Week {week.number} has no topics", f"Week {week.number}"))
+
+    if syllabus.assessment_methods and abs(syllabus.assessment_total - 100) > 0.01:
+        issues.append(Issue("assessment_total",
+                            f"Assessment percentages sum to {syllabus.assessment_total:g}%, not 100%",
+                            "Assessment Methods"))
+    return issues
+
+
+def validate_syllabus(syllabus, duration=None):
+    """
+    Check a parsed syllabus against the template
+
+    Args:
+        syllabus (Syllabus): Parsed syllabus
+        duration (str | int): Selected course duration, e.g. "8 Weeks"
+
+    Returns:
+        list: Human-readable problems; empty when the syllabus is valid
+    """
+    return [issue.message for issue in find_issues(syllabus, duration)]
@@ -0,0 +1,108 @@
+# syllabus_view.py
+"""
+Incremental rendering of long syllabi.
+
+A syllabus is split once per content hash into parts (front matter, each
+top-level section and each week), and every part is rendered as its own
+element. Weeks sit in collapsible panels whose content is only sent to the
+browser while they are open, and the view is a fragment, so opening or
+closing a week reruns the view alone instead of the whole app.
+"""
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+import streamlit as st
+
+from documents import get_document_store
+from syllabus_model import WEEK_HEADING_RE
+
+SECTION_HEADING_RE = re.compile(r"^#{1,2}\s")
+RULE_RE = re.compile(r"^\s*---\s*$")
+# Courses up to this many weeks open every week panel by default
+EXPAND_WEEKS_UP_TO = 6
+MAX_CACHED_DOCUMENTS = 64
+
+# kind is "front", "section" or "week"; label is the panel title for weeks
+Part = namedtuple("Part", ["kind", "label", "markdown"])
+
+_parts_cache = OrderedDict()
+_parts_lock = threading.Lock()
+
+
+def split_parts(markdown):
+    """
+    Split syllabus markdown into front matter, top-level sections and week blocks
+
+    Returns:
+        tuple: Part tuples in document order; joined back they cover the whole text
+            except week headings (used as labels) and `---` separators between weeks
+    """
+    parts = []
+    kind, label, lines = "front", "", []
+
+    def flush():
+        text = "\n".join(lines).strip()
+        if text or kind == "week":
+            parts.append(Part(kind, label, text))
+
+    for line in markdown.splitlines():
+        week = WEEK_HEADING_RE.match(line.strip())
+        if week:
+            flush()
+            number = f"{week.group(1)}-{week.group(2)}" if week.group(2) else week.group(1)
+            title = week.group(3).strip("* ")
+            kind, label, lines = "week", f"Week {number}: {title}" if title else f"Week {number}", []
+        elif SECTION_HEADING_RE.match(line):
+            flush()
+            kind, label, lines = ("front" if line.startswith("# ") else "section"), "", [line]
+        elif kind == "week" and RULE_RE.match(line):
+            continue
+        else:
+            lines.append(line)
+    flush()
+    return tuple(parts)
+
+
+def get_parts(digest, markdown):
+    """Return split_parts(markdown), memoized by the document's content hash"""
+    with _parts_lock:
+        parts = _parts_cache.get(digest)
+        if parts is not None:
+            _parts_cache.move_to_end(digest)
+            return parts
+    parts = split_parts(markdown)
+    with _parts_lock:
+        _parts_cache[digest] = parts
+        while len(_parts_cache) > MAX_CACHED_DOCUMENTS:
+            _parts_cache.popitem(last=False)
+    return parts
+
+
+@st.fragment
+def show_syllabus(digest, heading=None):
+    """
+    Render the syllabus stored under digest part by part
+
+    Args:
+        digest (str): Content hash of the syllabus in the document store
+        heading (str): Optional markdown heading shown above the syllabus
+    """
+    markdown = get_document_store().get(digest)
+    if markdown is None:
+        return
+    parts = get_parts(digest, markdown)
+    week_count = sum(1 for part in parts if part.kind == "week")
+    if heading:
+        st.markdown(heading)
+    for index, part in enumerate(parts):
+        if part.kind != "week":
+            st.markdown(part.markdown)
+            continue
+        # Keyed by document so a new syllabus starts with fresh panel state
+        panel = st.expander(part.label, expanded=week_count <= EXPAND_WEEKS_UP_TO,
+                            key=f"week-{digest[:12]}-{index}", on_change="rerun")
+        if panel.open:
+            with panel:
+                st.markdown(part.markdown)
+
@@ -0,0 +1,257 @@
+# token_budget.py
+"""
+Token accounting for syllabus requests.
+
+Estimates prompt and completion sizes locally (tiktoken when installed,
+otherwise a word/punctuation heuristic), sizes max_tokens from the week
+count, continues a completion that stopped on the token limit instead
+of restarting it, and logs prompt/completion tokens per request.
+"""
+import logging
+import math
+import os
+import re
+import time
+from functools import lru_cache
+
+# Output size of the syllabus template: front/closing sections plus one block per week
+SECTION_TOKENS = int(os.getenv("SYLLABUS_SECTION_TOKENS", "450"))
+WEEK_TOKENS = int(os.getenv("SYLLABUS_WEEK_TOKENS", "160"))
+HEADROOM = float(os.getenv("SYLLABUS_TOKEN_HEADROOM", "1.25"))
+MIN_COMPLETION_TOKENS = 256
+MAX_COMPLETION_TOKENS = int(os.getenv("SYLLABUS_MAX_COMPLETION_TOKENS", "4096"))
+CONTEXT_WINDOW = int(os.getenv("SYLLABUS_CONTEXT_WINDOW", "16385"))
+MAX_CONTINUATIONS = int(os.getenv("SYLLABUS_MAX_CONTINUATIONS", "2"))
+MESSAGE_OVERHEAD_TOKENS = 4
+OVERLAP_SEARCH_CHARS = 200
+
+CONTINUE_PROMPT = ("Your previous reply was cut off by the length limit. Continue exactly where it stopped, "
+                   "without repeating anything already written and without any preamble.")
+
+WORD_RE = re.compile(r"[A-Za-z]+|\d+|[^\w\s]+|\n")
+
+logger = logging.getLogger("syllabus.tokens")
+
+
+@lru_cache(maxsize=1)
+def _encoder():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def estimate_tokens(text):
+    """Estimate the BPE token count of text"""
+    if not text:
+        return 0
+    encoder = _encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    total = 0
+    for piece in WORD_RE.findall(text):
+        if piece.isalpha():
+            # Common words are one token; long or rare ones split roughly every 8 letters
+            total += 1 + (len(piece) - 1) // 8
+        else:
+            # Digits and punctuation runs (markdown "**", "###") merge about three characters per token
+            total += math.ceil(len(piece) / 3)
+    return total
+
+
+def messages_tokens(messages):
+    """Estimate the prompt tokens of a chat message list"""
+    return sum(estimate_tokens(m.get("content", "")) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def expected_completion_tokens(weeks, week_tokens=WEEK_TOKENS, section_tokens=SECTION_TOKENS):
+    """Expected output tokens of a syllabus with the given number of weeks"""
+    return section_tokens + weeks * week_tokens
+
+
+def max_tokens_for(messages, weeks, week_tokens=WEEK_TOKENS, section_tokens=SECTION_TOKENS):
+    """
+    Size max_tokens for a syllabus request
+
+    Args:
+        messages (list): Chat messages that will be sent
+        weeks (int): Number of weeks the syllabus covers
+        week_tokens (int): Expected tokens per week block of this prompt's template
+        section_tokens (int): Expected tokens of everything outside the weekly breakdown
+
+    Returns:
+        int: Completion token limit with headroom, bounded by the model's context window
+    """
+    budget = math.ceil(expected_completion_tokens(weeks, week_tokens, section_tokens) * HEADROOM)
+    available = CONTEXT_WINDOW - messages_tokens(messages)
+    return max(MIN_COMPLETION_TOKENS, min(budget, MAX_COMPLETION_TOKENS, available))
+
+
+def join_continuation(previous, continuation):
+    """Append continuation to previous, dropping any text the model repeated at the seam"""
+    tail = previous[-OVERLAP_SEARCH_CHARS:]
+    for size in range(min(len(tail), len(continuation)), 0, -1):
+        if size >= 8 and continuation.startswith(tail[-size:]):
+            return previous + continuation[size:]
+    return previous + continuation
+
+
+def continuation_messages(messages, partial):
+    """Messages asking the model to carry on from partial output"""
+    return [*messages, {"role": "assistant", "content": partial}, {"role": "user", "content": CONTINUE_PROMPT}]
+
+
+class UsageTally:
+    """Prompt/completion tokens summed over a request's calls, reported by the API or estimated"""
+
+    def __init__(self, tag, max_tokens):
+        self.tag = tag
+        self.max_tokens = max_tokens
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+        self.estimated = False
+        self.finish_reason = None
+        self.calls_info = []
+        self.started = time.perf_counter()
+
+    def add(self, messages, content, info):
+        usage = info.get("usage") or {}
+        if usage.get("completion_tokens") is None:
+            self.estimated = True
+        self.prompt_tokens += usage.get("prompt_tokens") or messages_tokens(messages)
+        self.completion_tokens += usage.get("completion_tokens") or estimate_tokens(content)
+        self.finish_reason = info.get("finish_reason") or "unknown"
+        self.calls_info.append(info)
+        self.calls += 1
+
+    def summary(self):
+        """Totals over every call plus the first call's connect/ttft and the last call's provider/status"""
+        first, last = self.calls_info[0], self.calls_info[-1]
+        return {
+            "provider": last.get("provider"),
+            "providers": sorted({call["provider"] for call in self.calls_info if call.get("provider")}),
+            "http_status": last.get("http_status"),
+            "connect": first.get("connect"),
+            "ttft": first.get("ttft"),
+            "finish_reason": self.finish_reason,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_estimated": self.estimated,
+            "calls": self.calls,
+        }
+
+    def log(self):
+        """Log one line per request so cost and latency can be traced to the duration"""
+        logger.info(
+            "tokens tag=%r prompt=%d completion=%d source=%s max_tokens=%d finish=%s calls=%d seconds=%.2f",
+            self.tag, self.prompt_tokens, self.completion_tokens, "estimated" if self.estimated else "reported",
+            self.max_tokens, self.finish_reason, self.calls, time.perf_counter() - self.started,
+        )
+
+
+def complete_with_continuation(complete, messages, max_tokens, max_continuations=MAX_CONTINUATIONS, tag="",
+                               info=None):
+    """
+    Run a completion and continue it from the cut point while it stops on the length limit
+
+    Args:
+        complete (callable): complete(messages, max_tokens, info) -> (success, content, error_message);
+            fills info["finish_reason"] and, when known, info["usage"]
+        messages (list): Chat messages to send
+        max_tokens (int): Completion token limit per call
+        max_continuations (int): Follow-up calls allowed after a truncated reply
+        tag (str): Label for the usage log line, e.g. the course duration
+        info (dict): Optional; receives UsageTally.summary() for the whole request
+
+    Returns:
+        tuple: (success: bool, content: str, error_message: str)
+    """
+    tally = UsageTally(tag, max_tokens)
+    request_info = info
+    info = {}
+    success, content, error_message = complete(messages, max_tokens, info)
+    if not success:
+        if request_info is not None:
+            request_info.update(info)
+        return False, "", error_message
+    tally.add(messages, content, info)
+    while info.get("finish_reason") == "length" and tally.calls <= max_continuations:
+        request = continuation_messages(messages, content)
+        info = {}
+        ok, more, _ = complete(request, max_tokens, info)
+        if not ok:
+            # Keep what we have; validation flags the missing part and it can be regenerated
+            break
+        tally.add(request, more, info)
+        content = join_continuation(content, more)
+    tally.log()
+    if request_info is not None:
+        request_info.update(tally.summary())
+    return True, content, ""
+
+
+def stream_with_continuation(stream, messages, max_tokens, max_continuations=MAX_CONTINUATIONS, tag="",
+                             info=None):
+    """
+    Stream a completion, transparently continuing it if it stops on the length limit
+
+    Args:
+        stream (callable): stream(messages, max_tokens, info) -> (success, chunks, error_message);
+            fills info once chunks is exhausted
+        messages (list): Chat messages to send
+        max_tokens (int): Completion token limit per call
+        max_continuations (int): Follow-up calls allowed after a truncated reply
+        tag (str): Label for the usage log line
+        info (dict): Optional; receives UsageTally.summary() once chunks is exhausted
+
+    Returns:
+        tuple: (success: bool, chunks: iterator of str, error_message: str)
+    """
+    tally = UsageTally(tag, max_tokens)
+    request_info = info
+    info = {}
+    success, first_chunks, error_message = stream(messages, max_tokens, info)
+    if not success:
+        if request_info is not None:
+            request_info.update(info)
+        return False, iter(()), error_message
+
+    def chunks():
+        nonlocal info
+        parts = []
+        for chunk in first_chunks:
+            parts.append(chunk)
+            yield chunk
+        tally.add(messages, "".join(parts), info)
+        while info.get("finish_reason") == "length" and tally.calls <= max_continuations:
+            content = "".join(parts)
+            request = continuation_messages(messages, content)
+            info = {}
+            ok, more, _ = stream(request, max_tokens, info)
+            if not ok:
+                break
+            # Hold back the start of the continuation until any repeated overlap can be trimmed
+            head, received = "", []
+            for chunk in more:
+                received.append(chunk)
+                if head is None:
+                    parts.append(chunk)
+                    yield chunk
+                    continue
+                head += chunk
+                if len(head) >= OVERLAP_SEARCH_CHARS:
+                    added, head = join_continuation(content, head)[len(content):], None
+                    parts.append(added)
+                    yield added
+            if head:
+                added = join_continuation(content, head)[len(content):]
+                parts.append(added)
+                yield added
+            tally.add(request, "".join(received), info)
+        tally.log()
+        if request_info is not None:
+            request_info.update(tally.summary())
+
+    return True, chunks(), ""
@@ -0,0 +1,148 @@
+# warmup.py
+"""
+Pre-warm the result cache with every predefined subject and duration.
+
+Generates each (subject, duration) pair the UI offers into the cache the
+app reads, with bounded concurrency. Pairs whose cached copy is older than
+the refresh age are regenerated, fresh ones are skipped, and a coverage
+report is printed before and after.
+
+Usage:
+    python warmup.py --concurrency 4            # one pass, e.g. from cron before opening hours
+    python warmup.py --every 3600               # keep running and re-warm hourly
+    python warmup.py --report                   # coverage only, no generation
+"""
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from batch import RateLimiter
+
+FRESH = "fresh"
+STALE = "stale"
+MISSING = "missing"
+
+
+def _load_app():
+    import app
+
+    # Cached resources are used outside a Streamlit script run; silence that warning
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    return app
+
+
+def coverage(app, catalog, refresh_after):
+    """
+    Classify every catalog pair by the age of its cached syllabus
+
+    Returns:
+        dict: {(subject, duration): "fresh" | "stale" | "missing"}
+    """
+    cache = app.get_cache()
+    states = {}
+    for subject, duration in catalog:
+        age = cache.get_entry_age(app.generation_cache_key(subject, duration))
+        if age is None or (cache.ttl_seconds and age > cache.ttl_seconds):
+            states[(subject, duration)] = MISSING
+        elif age > refresh_after:
+            states[(subject, duration)] = STALE
+        else:
+            states[(subject, duration)] = FRESH
+    return states
+
+
+def print_report(states, durations, out=sys.stdout):
+    """Print overall and per-duration coverage"""
+    total = len(states)
+    counts = {state: sum(1 for value in states.values() if value == state) for state in (FRESH, STALE, MISSING)}
+    covered = counts[FRESH] + counts[STALE]
+    print(f"Coverage: {covered}/{total} cached ({covered / total:.0%}) - "
+          f"{counts[FRESH]} fresh, {counts[STALE]} stale, {counts[MISSING]} missing", file=out)
+    for duration in durations:
+        row = [state for (_, d), state in states.items() if d == duration]
+        fresh = sum(1 for state in row if state == FRESH)
+        stale = sum(1 for state in row if state == STALE)
+        print(f"  {duration:>9}: {fresh + stale:3d}/{len(row)} cached ({stale} stale)", file=out)
+    missing = sorted(pair for pair, state in states.items() if state == MISSING)
+    if missing and len(missing) <= 20:
+        for subject, duration in missing:
+            print(f"  missing: {subject} ({duration})", file=out)
+
+
+def warm(app, catalog, concurrency=4, rate_per_second=None, refresh_after=None, force=False, progress=None):
+    """
+    Generate missing and stale catalog entries into the cache
+
+    Args:
+        app (module): The Streamlit app module providing the generation functions
+        catalog (list): (subject, duration) pairs to cover
+        concurrency (int): Maximum concurrent generations
+        rate_per_second (float): Maximum generation starts per second, or None
+        refresh_after (float): Age in seconds after which an entry is regenerated
+        force (bool): Regenerate every pair regardless of age
+        progress (callable): Called with (done, total, subject, duration, ok, detail)
+
+    Returns:
+        dict: Counts of ok, error and skipped pairs
+    """
+    refresh_after = app.CACHE_REFRESH_SECONDS if refresh_after is None else refresh_after
+    states = coverage(app, catalog, refresh_after)
+    pending = [pair for pair in catalog if force or states[pair] != FRESH]
+    summary = {"ok": 0, "error": 0, "skipped": len(catalog) - len(pending)}
+    limiter = RateLimiter(rate_per_second)
+
+    def run(subject, duration):
+        limiter.acquire()
+        started = time.perf_counter()
+        success, _, error_message = app.refresh_syllabus(subject, duration, app.uses_week_parallel(duration))
+        return success, error_message, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {executor.submit(run, *pair): pair for pair in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            subject, duration = futures[future]
+            success, error_message, elapsed = future.result()
+            summary["ok" if success else "error"] += 1
+            if progress:
+                progress(done, len(pending), subject, duration, success, error_message or f"{elapsed:.1f}s")
+    return summary
+
+
+def _print_progress(done, total, subject, duration, ok, detail):
+    status = f"ok ({detail})" if ok else f"error: {detail}"
+    print(f"[{done}/{total}] {subject} ({duration}) - {status}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate every predefined subject and duration into the cache")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Maximum concurrent generations")
+    parser.add_argument("-r", "--rate", type=float, default=None, help="Maximum generation starts per second")
+    parser.add_argument("--refresh-after", type=float, default=None,
+                        help="Regenerate entries older than this many seconds (default: SYLLABUS_CACHE_REFRESH_SECONDS)")
+    parser.add_argument("--force", action="store_true", help="Regenerate every pair, even fresh ones")
+    parser.add_argument("--report", action="store_true", help="Only print coverage")
+    parser.add_argument("--every", type=float, default=None, help="Repeat the warmup every N seconds")
+    args = parser.parse_args(argv)
+
+    app = _load_app()
+    catalog = app.get_catalog()
+    refresh_after = app.CACHE_REFRESH_SECONDS if args.refresh_after is None else args.refresh_after
+    print_report(coverage(app, catalog, refresh_after), app.DURATION_OPTIONS)
+    if args.report:
+        return 0
+
+    while True:
+        summary = warm(app, catalog, args.concurrency, args.rate, refresh_after, args.force, _print_progress)
+        print(f"Warmup: {summary['ok']} generated, {summary['error']} failed, {summary['skipped']} already fresh")
+        print_report(coverage(app, catalog, refresh_after), app.DURATION_OPTIONS)
+        if args.every is None:
+            return 1 if summary["error"] else 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# week_parallel.py
+"""
+Two-phase syllabus generation for long courses.
+
+One short completion produces the outline (front matter, week titles and
+closing sections); every week's details are then generated concurrently
+and spliced back into the outline in order.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from prompts import OUTLINE_TEMPLATE, WEEK_FORMAT, WEEK_TEMPLATE
+from syllabus_model import parse_duration_weeks
+
+OUTLINE_MAX_TOKENS = 900
+WEEK_MAX_TOKENS = 450
+DEFAULT_MAX_WORKERS = 8
+
+WEEK_HEADING_RE = re.compile(r"^###\s*Week\s+(\d+)\s*:\s*(.+?)\s*$", re.MULTILINE)
+WEEKLY_SECTION_RE = re.compile(r"^## Weekly Breakdown\s*$(.*?)(?=^## |\Z)", re.MULTILINE | re.DOTALL)
+
+
+def _messages(system_prompt, template, **values):
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": template.render(**values)},
+    ]
+
+
+def build_outline_messages(system_prompt, subject, duration, weeks):
+    """Build the phase-one prompt that asks only for the outline and week titles"""
+    return _messages(system_prompt, OUTLINE_TEMPLATE, subject=subject, duration=duration, weeks=weeks)
+
+
+def week_format(week_number, week_title):
+    """Return the markdown template of one week block"""
+    return WEEK_FORMAT.format(number=week_number, title=week_title)
+
+
+def build_week_messages(system_prompt, subject, duration, week_number, week_title, week_titles):
+    """
+    Build the phase-two prompt for a single week's details
+
+    A week the outline gave no title (week_title empty) is written with a title the model picks.
+    """
+    schedule = "\n".join(f"- Week {n}: {title}" for n, title in sorted(week_titles.items()))
+    week = f"Week {week_number}: {week_title}" if week_title else f"Week {week_number}"
+    return _messages(system_prompt, WEEK_TEMPLATE, subject=subject, duration=duration, week=week, schedule=schedule)
+
+
+def parse_week_titles(outline):
+    """Return {week_number: title} for every '### Week N: Title' line in outline"""
+    return {int(number): title for number, title in WEEK_HEADING_RE.findall(outline)}
+
+
+def stitch(outline, week_blocks):
+    """Replace the outline's Weekly Breakdown section with the generated week blocks"""
+    weekly = "## Weekly Breakdown\n\n" + "\n\n---\n\n".join(block.strip() for block in week_blocks) + "\n\n---\n\n"
+    if WEEKLY_SECTION_RE.search(outline):
+        return WEEKLY_SECTION_RE.sub(lambda _: weekly, outline, count=1)
+    marker = outline.find("## Assessment Methods")
+    if marker == -1:
+        return outline.rstrip() + "\n\n" + weekly
+    return outline[:marker] + weekly + outline[marker:]
+
+
+def generate_syllabus_by_week(complete, system_prompt, subject, duration, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Generate a syllabus as an outline call followed by concurrent per-week calls
+
+    Args:
+        complete (callable): complete(messages, max_tokens) -> (success, content, error_message)
+        system_prompt (str): System message shared by every call
+        subject (str): The subject for the syllabus
+        duration (str): The duration of the course, e.g. "12 Weeks"
+        max_workers (int): Maximum concurrent week generations
+
+    Returns:
+        tuple: (success: bool, content: str, error_message: str)
+    """
+    weeks = parse_duration_weeks(duration)
+    success, outline, error_message = complete(
+        build_outline_messages(system_prompt, subject, duration, weeks), OUTLINE_MAX_TOKENS
+    )
+    if not success:
+        return False, "", error_message
+
+    titles = {n: title for n, title in parse_week_titles(outline).items() if n <= weeks}
+
+    def run(week_number):
+        messages = build_week_messages(system_prompt, subject, duration, week_number,
+                                       titles.get(week_number), titles)
+        return complete(messages, WEEK_MAX_TOKENS)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, weeks))) as executor:
+        results = list(executor.map(run, range(1, weeks + 1)))
+
+    for week_number, (week_success, _, week_error) in enumerate(results, start=1):
+        if not week_success:
+            return False, "", f"Week {week_number}: {week_error}"
+    return True, stitch(outline, [content for _, content, _ in results]), ""